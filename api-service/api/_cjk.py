@@ -0,0 +1,187 @@
+"""
+Dictionary-based segmentation of Chinese (Han) text.
+
+Words are stored in a compact trie of three flat arrays. Nodes are numbered
+breadth-first, so the children of node n are the contiguous run
+first[n]..first[n + 1] - 1, sorted by their character in labels, and a
+transition is one bisect over that run, done in C; weight holds the log
+probability of each node that ends a word. A run of Han characters is split
+into the word sequence with the highest unigram probability, as jieba
+does, and characters the dictionary lacks become single-character words.
+
+The dictionary is cjk_dict.txt next to this file ("word freq" per line,
+the jieba format) unless TEXT_CJK_DICT names another one, either text or
+compiled by tools/build_cjk_dict.py. It is loaded once per process, on
+first use.
+"""
+import math
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left
+
+MAGIC = b"CJK1"
+# Han ideographs: unified, extension A, compatibility and extension B-F
+HAN = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0002ebef'
+DICT_PATH = os.environ.get("TEXT_CJK_DICT",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "cjk_dict.txt"))
+# Weight of a node that does not end a word; log probabilities are < 0
+NOT_A_WORD = 1.0
+_HEADER = struct.Struct("<4sId")
+
+class LazyPatterns:
+    """
+    Regexes compiled on first attribute access. Classes over the Han
+    ranges take milliseconds each to compile, too much for every cold start
+    of a handler that mostly sees ASCII.
+    """
+
+    def __init__(self, **sources):
+        self._sources = sources
+
+    def __getattr__(self, name):
+        try:
+            source = self._sources[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        pattern = re.compile(source)
+        setattr(self, name, pattern)
+        return pattern
+
+patterns = LazyPatterns(han=f'[{HAN}]', han_run=f'[{HAN}]+')
+
+def is_han(ch: str) -> bool:
+    return ('\u4e00' <= ch <= '\u9fff' or '\u3400' <= ch <= '\u4dbf' or '\uf900' <= ch <= '\ufaff'
+            or '\U00020000' <= ch <= '\U0002ebef')
+
+class CompactTrie:
+    """Breadth-first array trie over code points; node 0 is the root."""
+
+    def __init__(self, labels: array, first: array, weight: array, unknown: float):
+        self.labels = labels
+        self.first = first
+        self.weight = weight
+        # Score of a character the dictionary does not have
+        self.unknown = unknown
+        # Every segmentation step starts at the root, whose children are
+        # most of the characters; a dict finds them faster than bisect
+        self.root = {labels[node]: node for node in range(first[0], first[1])}
+
+    @classmethod
+    def build(cls, frequencies: dict) -> "CompactTrie":
+        """Build from {word: frequency}; weights are log(freq / total)."""
+        words = sorted(w for w, f in frequencies.items() if w and f > 0)
+        total = sum(frequencies[w] for w in words) or 1
+        labels = array('i', [0])
+        first = array('i')
+        weight = array('f', [NOT_A_WORD])
+        # Node n covers the sorted words sharing its prefix. Visiting nodes
+        # in number order and appending their children keeps each node's
+        # children contiguous, and sorted words give them in label order.
+        nodes = [(0, len(words), 0)]
+        for node, (lo, hi, depth) in enumerate(nodes):
+            first.append(len(labels))
+            i = lo
+            while i < hi:
+                word = words[i]
+                if len(word) == depth:
+                    weight[node] = math.log(frequencies[word] / total)
+                    i += 1
+                    continue
+                ch = word[depth]
+                j = i + 1
+                while j < hi and words[j][depth] == ch:
+                    j += 1
+                labels.append(ord(ch))
+                weight.append(NOT_A_WORD)
+                nodes.append((i, j, depth + 1))
+                i = j
+        first.append(len(labels))
+        return cls(labels, first, weight, math.log(1 / total))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactTrie":
+        magic, size, unknown = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("not a compiled CJK dictionary")
+        offset = _HEADER.size
+        arrays = []
+        for typecode, count in (('i', size), ('i', size + 1), ('f', size)):
+            values = array(typecode)
+            values.frombytes(data[offset:offset + 4 * count])
+            arrays.append(values)
+            offset += 4 * count
+        return cls(*arrays, unknown)
+
+    def to_bytes(self) -> bytes:
+        return b''.join((_HEADER.pack(MAGIC, len(self.labels), self.unknown),
+                         self.labels.tobytes(), self.first.tobytes(), self.weight.tobytes()))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def segment(self, run: str) -> list:
+        """Split a run of Han characters into its most probable words."""
+        n = len(run)
+        if n == 1:
+            return [run]
+        labels, first, weight, unknown = self.labels, self.first, self.weight, self.unknown
+        codes = list(map(ord, run))
+        root = self.root
+        # Best score of run[i:] and where its first word ends, right to left
+        score = [0.0] * (n + 1)
+        end = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            top = unknown + score[i + 1]
+            top_end = i + 1
+            node = root.get(codes[i])
+            j = i + 1
+            while node is not None:
+                w = weight[node]
+                if w != NOT_A_WORD and w + score[j] > top:
+                    top = w + score[j]
+                    top_end = j
+                lo, hi = first[node], first[node + 1]
+                if lo == hi or j == n:
+                    break
+                code = codes[j]
+                node = bisect_left(labels, code, lo, hi)
+                if node == hi or labels[node] != code:
+                    break
+                j += 1
+            score[i] = top
+            end[i] = top_end
+        words = []
+        i = 0
+        while i < n:
+            words.append(run[i:end[i]])
+            i = end[i]
+        return words
+
+def read_frequencies(path: str) -> dict:
+    """{word: freq} from a jieba-format dictionary ("word [freq [tag]]" lines)."""
+    frequencies = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            frequencies[parts[0]] = int(parts[1]) if len(parts) > 1 else 1
+    return frequencies
+
+def load(path: str) -> CompactTrie:
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            f.seek(0)
+            return CompactTrie.from_bytes(f.read())
+    return CompactTrie.build(read_frequencies(path))
+
+_segmenter = None
+
+def segmenter() -> CompactTrie:
+    """The process-wide dictionary trie, loaded on first use."""
+    global _segmenter
+    if _segmenter is None:
+        _segmenter = load(DICT_PATH)
+    return _segmenter
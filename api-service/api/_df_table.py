@@ -0,0 +1,104 @@
+"""
+Memory-mapped document-frequency table for keyword ranking.
+
+The table is a single little-endian binary file written by
+tools/build_df_table.py:
+
+    header   magic "DFT1", doc_count u32, avg_doc_len f64, term_count u32, bucket_count u32
+    buckets  bucket_count x u32   term index or EMPTY; open addressing on crc32(term)
+    offsets  (term_count + 1) x u32   term i is blob[offsets[i]:offsets[i + 1]]
+    dfs      term_count x u32
+    blob     UTF-8 terms, concatenated
+
+Opening it maps the file and reads the header only; lookups touch a few
+bytes each, so the OS page cache is the only copy in memory and worker
+processes share it.
+"""
+import mmap
+import os
+import struct
+import zlib
+
+MAGIC = b"DFT1"
+EMPTY = 0xFFFFFFFF
+_HEADER = struct.Struct("<4sIdII")
+_U32 = struct.Struct("<I")
+_U32_PAIR = struct.Struct("<II")
+
+class DFTable:
+    """Read-only view of a document-frequency table file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self._invalid(path)
+        magic, self.doc_count, self.avg_doc_len, self.term_count, buckets = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or buckets == 0 or buckets & (buckets - 1):
+            self._invalid(path)
+        self._mask = buckets - 1
+        self._buckets = _HEADER.size
+        self._offsets = self._buckets + 4 * buckets
+        self._dfs = self._offsets + 4 * (self.term_count + 1)
+        self._blob = self._dfs + 4 * self.term_count
+        # A truncated file would make df() read past the end
+        if len(self._map) < self._blob or len(self._map) < self._blob + self._offset(self.term_count):
+            self._invalid(path)
+        self.path = path
+        # Identifies the table contents for cache keys and ETags
+        self.digest = "%08x" % zlib.crc32(self._map[:self._blob])
+
+    def _invalid(self, path: str):
+        self._map.close()
+        raise ValueError(f"{path} is not a document-frequency table")
+
+    def _offset(self, index: int) -> int:
+        return _U32.unpack_from(self._map, self._offsets + 4 * index)[0]
+
+    def df(self, term: str) -> int:
+        """Number of corpus documents containing term (0 when unknown)."""
+        key = term.encode("utf-8", "surrogatepass")
+        data = self._map
+        slot = zlib.crc32(key) & self._mask
+        # At most one pass over the buckets: a foreign file may have no EMPTY
+        # bucket, or bucket entries past the last term
+        for _ in range(self._mask + 1):
+            index = _U32.unpack_from(data, self._buckets + 4 * slot)[0]
+            if index == EMPTY or index >= self.term_count:
+                return 0
+            start, end = _U32_PAIR.unpack_from(data, self._offsets + 4 * index)
+            if data[self._blob + start:self._blob + end] == key:
+                return _U32.unpack_from(data, self._dfs + 4 * index)[0]
+            slot = (slot + 1) & self._mask
+        return 0
+
+    def close(self) -> None:
+        self._map.close()
+
+def write_table(path: str, doc_count: int, avg_doc_len: float, dfs: dict) -> int:
+    """Write {term: df} as a table file; returns its size in bytes."""
+    terms = sorted(dfs)
+    encoded = [term.encode("utf-8", "surrogatepass") for term in terms]
+    buckets = 1
+    while buckets < 2 * max(1, len(terms)):   # load factor <= 0.5 keeps probes short
+        buckets *= 2
+    table = [EMPTY] * buckets
+    for index, key in enumerate(encoded):
+        slot = zlib.crc32(key) & (buckets - 1)
+        while table[slot] != EMPTY:
+            slot = (slot + 1) & (buckets - 1)
+        table[slot] = index
+    offsets = [0]
+    for key in encoded:
+        offsets.append(offsets[-1] + len(key))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, doc_count, avg_doc_len, len(terms), buckets))
+        f.write(struct.pack(f"<{buckets}I", *table))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(struct.pack(f"<{len(terms)}I", *(dfs[term] for term in terms)))
+        for key in encoded:
+            f.write(key)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
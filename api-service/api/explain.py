@@ -1,149 +1,98 @@
 from http.server import BaseHTTPRequestHandler
-import json
-import ast
-from typing import Dict, Any, List
+import os
+import sys
+import time
+from urllib.parse import urlparse, parse_qs
+
+# The analyzer ships next to this handler as a vendored copy of core/analyzer.py
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _http import (IMMUTABLE, BodyError, StreamWriter, content_hash, dumps, etag_matches, query_flag,
+                   read_json, send_cache_miss, send_json, send_not_modified)
+from core_analyzer import (ANALYZER_VERSION, Timings, analyze, analyze_code_cached, default_cache, default_histograms,
+                           iter_parallel)
+
+# Record phase timings for every request (into the histograms) even when not asked for
+ALWAYS_TIME = os.environ.get("ANALYZER_TIMINGS", "").lower() in ("1", "true", "yes")
+
+# Largest accepted request body; batches carry many files
+MAX_BODY_BYTES = int(os.environ.get("EXPLAIN_MAX_BODY_BYTES", str(8 * 1024 * 1024)))
+
+# Batch mode: {"items": [{"id", "code", "language"}, ...]}
+BATCH_MAX_ITEMS = int(os.environ.get("EXPLAIN_BATCH_MAX_ITEMS", "1000"))
+BATCH_WORKERS = int(os.environ.get("EXPLAIN_BATCH_WORKERS", "0")) or os.cpu_count() or 1
+BATCH_CHUNK_SIZE = 8
+NOT_PYTHON = {"info": "Deep analysis currently only supported for Python"}
+HEX_DIGITS = frozenset('0123456789abcdef')
+
+def detect_language(code: str, language: str) -> str:
+    if language == 'python' or (language == 'auto' and ('def ' in code or 'import ' in code)):
+        return "python"
+    return language
 
 # ============================================================
-# Core Analyzer (inlined for Vercel serverless compatibility)
+# Batch processing
 # ============================================================
 
-class AdvancedComplexityVisitor(ast.NodeVisitor):
-    def __init__(self):
-        self.complexity = 1
-        self.functions = []
-
-    def visit_FunctionDef(self, node):
-        func_visitor = AdvancedComplexityVisitor()
-        for child in node.body:
-            func_visitor.visit(child)
-        self.functions.append({
-            "name": node.name,
-            "lineno": node.lineno,
-            "complexity": func_visitor.complexity,
-            "args": [arg.arg for arg in node.args.args]
-        })
-        self.generic_visit(node)
-
-    def visit_AsyncFunctionDef(self, node):
-        self.visit_FunctionDef(node)
-
-    def visit_ClassDef(self, node):
-        self.generic_visit(node)
-
-    def visit_If(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_For(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_AsyncFor(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_While(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_ExceptHandler(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_Assert(self, node): self.complexity += 1; self.generic_visit(node)
-
-    def visit_BoolOp(self, node):
-        self.complexity += len(node.values) - 1
-        self.generic_visit(node)
-
-
-class SecurityVisitor(ast.NodeVisitor):
-    def __init__(self):
-        self.issues = []
-
-    def visit_Call(self, node):
-        if isinstance(node.func, ast.Name):
-            if node.func.id in ['eval', 'exec']:
-                self.issues.append({
-                    "severity": "CRITICAL",
-                    "type": "Code Injection",
-                    "message": f"Use of '{node.func.id}' detected. This is a major security risk.",
-                    "lineno": node.lineno
-                })
-        self.generic_visit(node)
-
-    def visit_Import(self, node):
-        for name in node.names:
-            if name.name in ['subprocess', 'os', 'sys']:
-                self.issues.append({
-                    "severity": "WARNING",
-                    "type": "Dangerous Import",
-                    "message": f"Import of '{name.name}' detected. Ensure inputs are sanitized.",
-                    "lineno": node.lineno
-                })
-        self.generic_visit(node)
-
-    def visit_ImportFrom(self, node):
-        if node.module in ['subprocess', 'os', 'sys']:
-            self.issues.append({
-                "severity": "WARNING",
-                "type": "Dangerous Import",
-                "message": f"Import from '{node.module}' detected.",
-                "lineno": node.lineno
-            })
-        self.generic_visit(node)
-
-
-class StructureVisitor(ast.NodeVisitor):
-    def __init__(self):
-        self.stats = {
-            "classes": [],
-            "imports": [],
-        }
+def _analyze_chunk(chunk: list) -> list:
+    """Worker: (item_id, cache_key, analysis, error) for each (item_id, cache_key, code)."""
+    results = []
+    for item_id, key, code in chunk:
+        try:
+            results.append((item_id, key, analyze(code).to_dict(), None))
+        except Exception as e:
+            results.append((item_id, key, None, str(e)))
+    return results
 
-    def visit_ClassDef(self, node):
-        self.stats["classes"].append({
-            "name": node.name,
-            "lineno": node.lineno,
-            "bases": [base.id for base in node.bases if isinstance(base, ast.Name)]
-        })
-        self.generic_visit(node)
-
-    def visit_Import(self, node):
-        for alias in node.names:
-            self.stats["imports"].append(alias.name)
-        self.generic_visit(node)
-
-    def visit_ImportFrom(self, node):
-        if node.module:
-            self.stats["imports"].append(node.module)
-        self.generic_visit(node)
-
-
-def analyze_code(code: str) -> Dict[str, Any]:
-    try:
-        tree = ast.parse(code)
-
-        complexity_visitor = AdvancedComplexityVisitor()
-        complexity_visitor.visit(tree)
-
-        security_visitor = SecurityVisitor()
-        security_visitor.visit(tree)
-
-        structure_visitor = StructureVisitor()
-        structure_visitor.visit(tree)
-
-        total_complexity = complexity_visitor.complexity
-        functions = complexity_visitor.functions
-
-        lines = len(code.splitlines())
-        maintainability = max(0, 100 - (total_complexity * 1.5) - (lines * 0.05))
-
-        return {
-            "metrics": {
-                "complexity": total_complexity,
-                "maintainability_index": round(maintainability, 2),
-                "loc": lines
-            },
-            "security": {
-                "issues": security_visitor.issues,
-                "score": 100 - (len(security_visitor.issues) * 10)
-            },
-            "structure": {
-                "functions": functions,
-                "classes": structure_visitor.stats["classes"],
-                "imports": structure_visitor.stats["imports"]
-            }
-        }
-    except SyntaxError as e:
-        return {"error": f"Syntax error at line {e.lineno}: {e.msg}"}
-    except Exception as e:
-        return {"error": str(e)}
+def _pooled(pending: list, workers: int):
+    # Small batches are cheaper inline than forking a pool
+    if workers > 1 and len(pending) > BATCH_CHUNK_SIZE:
+        try:
+            yield from iter_parallel(_analyze_chunk, pending, workers, BATCH_CHUNK_SIZE)
+            return
+        except (OSError, NotImplementedError):
+            # No process pool on this runtime (e.g. no /dev/shm for its semaphores);
+            # the pool fails before producing anything, so nothing is repeated
+            pass
+    yield from _analyze_chunk(pending)
+
+def iter_batch(items: list, workers: int = BATCH_WORKERS):
+    """
+    Yield one result line (dict) per item as it completes, then a summary.
+
+    Invalid items and analysis failures become per-item error lines. Cache
+    hits and non-Python items are answered before the rest is fanned out to
+    worker processes; fresh results are put into the cache afterwards.
+    """
+    cache = default_cache()
+    counts = {"items": len(items), "errors": 0, "cache_hits": 0}
+    pending = []
+    for index, item in enumerate(items):
+        item_id = item.get('id', index) if isinstance(item, dict) else index
+        code = item.get('code') if isinstance(item, dict) else None
+        if not isinstance(code, str) or not code:
+            counts["errors"] += 1
+            yield {"type": "item", "id": item_id, "error": "Missing 'code' parameter"}
+            continue
+        language = detect_language(code, str(item.get('language') or 'auto').lower())
+        if language != "python":
+            yield {"type": "item", "id": item_id, "language": language, "analysis": NOT_PYTHON}
+            continue
+        key = cache.key_for(code)
+        analysis = cache.get(key)
+        if analysis is None:
+            pending.append((item_id, key, code))
+            continue
+        counts["cache_hits"] += 1
+        yield {"type": "item", "id": item_id, "language": "python", "analysis": analysis}
+
+    for item_id, key, analysis, error in _pooled(pending, workers):
+        if error is not None:
+            counts["errors"] += 1
+            yield {"type": "item", "id": item_id, "error": error}
+            continue
+        cache.put(key, analysis)
+        yield {"type": "item", "id": item_id, "language": "python", "analysis": analysis}
+    yield {"type": "summary", **counts}
 
 # ============================================================
 # Vercel Serverless Handler
@@ -152,37 +101,86 @@ def analyze_code(code: str) -> Dict[str, Any]:
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            data = json.loads(body)
+            # Timings are opt-in per request: {"timings": true} or ?timings=1
+            query = parse_qs(urlparse(self.path).query)
+            start = time.perf_counter()
+            data = read_json(self, MAX_BODY_BYTES)
+            if isinstance(data, list) or (isinstance(data, dict) and 'items' in data):
+                self._send_batch(data if isinstance(data, list) else data['items'])
+                return
+            wants_timings = bool(data.get('timings')) or query.get('timings', ['0'])[0] in ('1', 'true')
+            timings = Timings() if wants_timings or ALWAYS_TIME else None
+            if timings is not None:
+                timings.record("read", time.perf_counter() - start)
 
             code = data.get('code', '')
             language = data.get('language', 'auto').lower()
 
-            result = {
-                "original_code": code,
-                "analysis": {},
-            }
+            # Lean mode ({"lean": true} or ?lean=1) does not echo the source back
+            lean = query_flag(self, 'lean', data)
+            pretty = query_flag(self, 'pretty')
+            result = {} if lean else {"original_code": code}
+            result["analysis"] = {}
 
             if not code:
                  self._send_error(400, "Missing 'code' parameter")
                  return
 
-            if language == 'python' or (language == 'auto' and ('def ' in code or 'import ' in code)):
-                result["language"] = "python"
-                result["analysis"] = analyze_code(code)
+            result["language"] = detect_language(code, language)
+            headers = {}
+            etag = None
+            if result["language"] == "python":
+                # The cache key covers analyzer version and source; GET ?h=<key>
+                # serves the same analysis where a CDN can cache it
+                key = default_cache().key_for(code)
+                location = f"{urlparse(self.path).path}?h={key}"
+                # That response is the lean shape, so it only is this body's location when lean
+                if lean:
+                    headers['Content-Location'] = location
+                else:
+                    headers['Link'] = f'<{location}>; rel="alternate"'
+                if not wants_timings:
+                    etag = content_hash('explain', key, result["language"], lean, pretty)
+            elif not wants_timings:
+                etag = content_hash('explain', ANALYZER_VERSION, result["language"], lean, pretty, code)
+            if etag is not None and etag_matches(self, etag):
+                send_not_modified(self, etag, headers)
+                return
+
+            if result["language"] == "python":
+                result["analysis"] = analyze_code_cached(code, timings)
             else:
-                 result["language"] = language
-                 result["analysis"] = {"info": "Deep analysis currently only supported for Python"}
-
-            self._send_json(200, result)
-
-        except json.JSONDecodeError:
-            self._send_error(400, "Invalid JSON")
+                result["analysis"] = NOT_PYTHON
+
+            if timings is None:
+                self._send_json(200, result, headers, etag=etag)
+                return
+            start = time.perf_counter()
+            payload = dumps(result, pretty)
+            timings.record("serialize", time.perf_counter() - start, response_bytes=len(payload))
+            default_histograms().observe(timings)
+            if wants_timings:
+                # Serialized a second time so the block can include serialize itself
+                result["timings"] = timings.to_dict()
+                payload = dumps(result, pretty)
+            headers['Server-Timing'] = timings.server_timing()
+            self._send_json(200, payload, headers, etag=etag)
+
+        except BodyError as e:
+            self._send_error(e.status, str(e))
         except Exception as e:
             self._send_error(500, str(e))
 
     def do_GET(self):
+        query = parse_qs(urlparse(self.path).query, keep_blank_values=True)
+        if 'h' in query:
+            self._send_by_hash(query['h'][-1])
+            return
+        if 'metrics' in query:
+            # Prometheus text exposition of the aggregated phase histograms
+            body = default_histograms().to_prometheus().encode('utf-8')
+            send_json(self, 200, body, content_type='text/plain; version=0.0.4; charset=utf-8')
+            return
         info = {
             "name": "Code Explainer API (Enhanced)",
             "version": "2.0.0",
@@ -190,17 +188,57 @@ class handler(BaseHTTPRequestHandler):
                 "Python AST Analysis",
                 "Complexity Calculation",
                 "Security Scanning",
-                "Structure Extraction (Functions, Classes, Imports)"
-            ]
+                "Structure Extraction (Functions, Classes, Imports)",
+                "Per-phase Timings (?timings=1, GET ?metrics)",
+                "Batch Mode ({\"items\": [...]} -> NDJSON stream)",
+                "Lean Responses (?lean=1), gzip/br Content-Encoding, ?pretty=1",
+                "ETag / If-None-Match, cacheable GET ?h=<hash>"
+            ],
+            "cache": default_cache().snapshot()
         }
         self._send_json(200, info)
 
-    def _send_json(self, status: int, data: dict):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(data, indent=2).encode('utf-8'))
+    def _send_by_hash(self, key: str):
+        """Cacheable GET of a previous POST's analysis, in the lean shape."""
+        if len(key) != 64 or any(c not in HEX_DIGITS for c in key):
+            self._send_error(400, "'h' must be the hash from a Content-Location or Link header")
+            return
+        # Looked up first: only an analysis this server holds can be not modified
+        analysis = default_cache().get(key)
+        if analysis is None:
+            send_cache_miss(self, "POST the code instead")
+            return
+        # Content-addressed: a client holding this tag is always up to date
+        etag = content_hash('explain', key, 'python', True, query_flag(self, 'pretty'))
+        if etag_matches(self, etag):
+            send_not_modified(self, etag, {'Cache-Control': IMMUTABLE})
+            return
+        self._send_json(200, {"analysis": analysis, "language": "python"},
+                  {'Cache-Control': IMMUTABLE}, etag=etag)
+
+    def _send_batch(self, items):
+        if not isinstance(items, list):
+            self._send_error(400, "'items' must be an array")
+            return
+        if len(items) > BATCH_MAX_ITEMS:
+            self._send_error(400, f"Too many items (max {BATCH_MAX_ITEMS})")
+            return
+        stream = StreamWriter(self)
+        # Headers are out, so errors from here on can only be reported in-stream
+        try:
+            try:
+                for line in iter_batch(items):
+                    stream.write(dumps(line) + b"\n")
+            except Exception as e:
+                if isinstance(e, (BrokenPipeError, ConnectionResetError)):
+                    raise
+                stream.write(dumps({"type": "error", "error": str(e)}) + b"\n")
+            stream.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_json(self, status: int, data, headers: dict = None, etag: str = None):
+        send_json(self, status, data, headers, etag=etag)
 
     def _send_error(self, status: int, message: str):
         self._send_json(status, {"error": message})
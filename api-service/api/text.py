@@ -1,12 +1,33 @@
 from http.server import BaseHTTPRequestHandler
-import json
+import os
 import re
 import math
+import itertools
+import sys
 from collections import Counter
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _cjk import HAN, LazyPatterns, is_han, patterns as cjk_patterns, segmenter
+from _http import (IMMUTABLE, BodyError, ResultCache, StreamWriter, content_hash, etag_matches,
+                   iter_body, query_flag, read_json, send_cache_miss, send_json, send_not_modified)
+from urllib.parse import urlparse, parse_qs
+
+# Bump whenever an action's output changes; it is part of every ETag
+TEXT_VERSION = "1.1.0"
+# Largest accepted request body
+MAX_BODY_BYTES = int(os.environ.get("TEXT_MAX_BODY_BYTES", str(1024 * 1024)))
+# Recent results, served by GET ?h=<hash>; larger inputs are not kept.
+# TEXT_CACHE_DB (a SQLite path) shares them between processes and restarts.
+RESULT_CACHE_MAX_INPUT = 64 * 1024
+results = ResultCache(256, os.environ.get("TEXT_CACHE_DB") or None)
+HEX_DIGITS = frozenset('0123456789abcdef')
+# Document-frequency table for tfidf/bm25 keyword ranking, built by tools/build_df_table.py
+DF_TABLE_PATH = os.environ.get("TEXT_DF_TABLE",
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), "df_table.bin"))
+
 def text_stats(text: str) -> dict:
-    words = re.findall(r'\b\w+\b', text)
-    sentences = re.split(r'[.!?]+', text)
+    words = tokenize(text)
+    sentences = re.split(r'[.!?。！？]+', text)
     sentences = [s for s in sentences if s.strip()]
     
     word_count = len(words)
@@ -26,13 +47,13 @@ def text_stats(text: str) -> dict:
         "reading_time_seconds": reading_time_seconds
     }
 
-def extract_keywords(text: str, top_n: int = 5) -> list:
-    # 简单停用词表 (仅示例，实际生产应更全面)
-    stopwords = set(['the', 'is', 'at', 'which', 'on', 'and', 'a', 'an', 'in', 'to', 'of', 'for', 'it', 'that', 'with', 'as', 'by'])
-    words = re.findall(r'\b\w+\b', text.lower())
+def extract_keywords(text: str, top_n: int = 5, ranking: str = 'tf') -> list:
+    if ranking != 'tf':
+        return TextAnalysis(text).keywords(top_n, ranking)
+    words = tokenize(text.lower())
     
     # 过滤停用词和短词
-    meaningful_words = [w for w in words if w not in stopwords and len(w) > 2]
+    meaningful_words = [w for w in words if is_keyword_candidate(w)]
     
     counter = Counter(meaningful_words)
     return [word for word, count in counter.most_common(top_n)]
@@ -46,18 +67,426 @@ def clean_text(text: str) -> str:
 
 def generate_slug(text: str) -> str:
     text = text.lower()
-    # Remove non-alphanumeric chars (except spaces)
-    text = re.sub(r'[^a-z0-9\s-]', '', text)
+    # Chinese words become separate slug words
+    text = _spaced_han(text)
+    # Remove non-alphanumeric chars (except spaces and Chinese)
+    text = _patterns.slug_drop.sub('', text)
     # Replace spaces with hyphens
     text = re.sub(r'\s+', '-', text)
     return text.strip('-')
 
+# ============================================================
+# Combined actions
+# ============================================================
+
+TEXT_ACTIONS = ('stats', 'keywords', 'clean', 'slug')
+KEYWORD_STOPWORDS = frozenset(['the', 'is', 'at', 'which', 'on', 'and', 'a', 'an', 'in', 'to', 'of',
+                               'for', 'it', 'that', 'with', 'as', 'by',
+                               '我们', '你们', '他们', '她们', '它们', '自己', '这个', '那个', '这些',
+                               '那些', '这样', '那样', '这里', '那里', '这种', '什么', '怎么', '因为',
+                               '所以', '但是', '而且', '然后', '如果', '虽然', '因此', '并且', '或者',
+                               '以及', '还是', '就是', '不是', '没有', '已经', '可以', '可能', '应该',
+                               '一个', '一些', '一样', '一直', '一起', '非常', '其中', '其他', '之后',
+                               '之前', '时候', '现在', '进行', '通过', '对于', '关于', '还有', '只是',
+                               '不过'])
+_WORD_RE = re.compile(r'\w+')
+_TAG_RE = re.compile(r'<[^>]+>')
+_patterns = LazyPatterns(
+    # A run of Chinese or a \w+ word without Chinese in it
+    token=rf'[{HAN}]+|[^\W{HAN}]+',
+    slug_drop=rf'[^a-z0-9\s{HAN}-]+',
+    # A non-blank stretch between sentence terminators, and a terminator
+    sentence=r'[^.!?。！？\S]*[^.!?。！？\s][^.!?。！？]*',
+    terminator=r'[.!?。！？]',
+)
+# ASCII bytes generate_slug() removes: everything but a-z, 0-9, '-' and whitespace
+_SLUG_DROP_ASCII = bytes(c for c in range(128)
+                         if not (chr(c) in 'abcdefghijklmnopqrstuvwxyz0123456789-' or chr(c).isspace()))
+
+# ============================================================
+# Keyword ranking
+# ============================================================
+
+KEYWORD_RANKINGS = ('tf', 'tfidf', 'bm25')
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_df_table = None
+_df_table_loaded = False
+
+def df_table():
+    """The mapped document-frequency table, or None when there is none."""
+    global _df_table, _df_table_loaded
+    if not _df_table_loaded:
+        # Imported here: mmap, struct and zlib are only needed once a table is used
+        from _df_table import DFTable
+        try:
+            _df_table = DFTable(DF_TABLE_PATH)
+        except (OSError, ValueError):
+            _df_table = None
+        _df_table_loaded = True
+    return _df_table
+
+def default_ranking() -> str:
+    return 'bm25' if df_table() is not None else 'tf'
+
+def is_keyword_candidate(word: str) -> bool:
+    if word in KEYWORD_STOPWORDS:
+        return False
+    # Two Chinese characters make a full word; two letters rarely do
+    return len(word) > 2 or (len(word) == 2 and is_han(word[0]))
+
+def tokenize(text: str, segment=None) -> list:
+    """Words as \\w+ finds them, with each run of Chinese split into dictionary words."""
+    if text.isascii() or not cjk_patterns.han.search(text):
+        return _WORD_RE.findall(text)
+    segment = segment or segmenter().segment
+    words = []
+    for token in _patterns.token.findall(text):
+        if is_han(token[0]):
+            words.extend(segment(token))
+        else:
+            words.append(token)
+    return words
+
+def _spaced_han(text: str, segment=None) -> str:
+    """text with every Chinese word set off by spaces."""
+    if text.isascii() or not cjk_patterns.han.search(text):
+        return text
+    segment = segment or segmenter().segment
+    return cjk_patterns.han_run.sub(lambda m: f" {' '.join(segment(m.group()))} ", text)
+
+def _tfidf_scorer(counter: Counter, table):
+    """tf * smoothed idf; words the corpus never saw get the highest idf."""
+    n = table.doc_count
+    log = math.log
+    def score(word):
+        return counter[word] * (log((1 + n) / (1 + table.df(word))) + 1)
+    return score
+
+def _bm25_scorer(counter: Counter, length: int, table):
+    """Okapi BM25 of each word with the text as the document."""
+    n = table.doc_count
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (table.avg_doc_len or 1))
+    log = math.log
+    def score(word):
+        df = table.df(word)
+        tf = counter[word]
+        return log(1 + (n - df + 0.5) / (df + 0.5)) * tf * (BM25_K1 + 1) / (tf + norm)
+    return score
+
+def top_keywords(counter: Counter, length: int, top_n: int = 5, ranking: str = 'tf') -> list:
+    """
+    The top_n keywords of a text from the count of its terms (length in
+    all). Non-candidates are removed from counter.
+    """
+    # Filtering distinct words keeps most_common()'s first-seen tie order
+    for word in [w for w in counter if not is_keyword_candidate(w)]:
+        del counter[word]
+    if ranking == 'tf':
+        return [word for word, count in counter.most_common(top_n)]
+    table = df_table()
+    if table is None:
+        raise ValueError(f"Ranking '{ranking}' needs a document-frequency table ({DF_TABLE_PATH})")
+    score = _bm25_scorer(counter, length, table) if ranking == 'bm25' else _tfidf_scorer(counter, table)
+    from heapq import nlargest
+    # nlargest() is sorted(..., reverse=True)[:n] without sorting every
+    # word, and like it keeps first-seen order among equal scores
+    return nlargest(top_n, counter, key=score)
+
+class TextAnalysis:
+    """
+    Several actions over one text, sharing the scans they have in common.
+
+    The word list is tokenized once and feeds stats and keywords; the
+    lowercased text is built once and feeds keywords and slug. Every result
+    is identical to the matching standalone function's. tools/build_df_table.py
+    counts document frequencies over the same terms.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._words = None
+        self._lowered = None
+        self._terms = None
+        self._segments = {}
+
+    @property
+    def words(self) -> list:
+        if self._words is None:
+            self._words = tokenize(self.text, self._segment)
+        return self._words
+
+    def _segment(self, run: str) -> list:
+        # Lowercasing leaves Chinese alone, so words, terms and slug see the
+        # same runs; each is segmented once
+        words = self._segments.get(run)
+        if words is None:
+            words = self._segments[run] = segmenter().segment(run)
+        return words
+
+    @property
+    def lowered(self) -> str:
+        if self._lowered is None:
+            self._lowered = self.text.lower()
+        return self._lowered
+
+    def stats(self) -> dict:
+        words = self.words
+        word_count = len(words)
+        avg_word_len = sum(map(len, words)) / word_count if word_count > 0 else 0
+        return {
+            "words": word_count,
+            # Non-blank stretches between terminators, as re.split(r'[.!?。！？]+') counts them
+            "sentences": sum(1 for _ in _patterns.sentence.finditer(self.text)),
+            "characters": len(self.text),
+            "avg_word_length": round(avg_word_len, 2),
+            "reading_time_seconds": math.ceil(word_count / 200 * 60),
+        }
+
+    @property
+    def terms(self) -> list:
+        """Lowercased words, the tokens keywords are counted and ranked over."""
+        if self._terms is None:
+            if self.text.isascii():
+                self._terms = list(map(str.lower, self.words))
+            else:
+                # Lowercasing can split a word (e.g. U+0130), so tokenize the lowered text
+                self._terms = tokenize(self.lowered, self._segment)
+        return self._terms
+
+    def keywords(self, top_n: int = 5, ranking: str = 'tf') -> list:
+        return top_keywords(Counter(self.terms), len(self.terms), top_n, ranking)
+
+    # str.split() breaks on the same whitespace runs as re.sub(r'\s+', ...)
+    # and drops the ends like strip(), in a fraction of the time
+    def clean(self) -> str:
+        return ' '.join(_TAG_RE.sub('', self.text).split())
+
+    def slug(self) -> str:
+        if self.text.isascii():
+            kept = self.lowered.encode('ascii').translate(None, _SLUG_DROP_ASCII).decode('ascii')
+        else:
+            kept = _patterns.slug_drop.sub('', _spaced_han(self.lowered, self._segment))
+        return '-'.join(kept.split()).strip('-')
+
+    def run(self, actions, top_n: int = 5, ranking: str = 'tf') -> dict:
+        result = {}
+        for action in actions:
+            if action == 'stats':
+                result["stats"] = self.stats()
+            elif action == 'keywords':
+                result["keywords"] = self.keywords(top_n, ranking)
+            elif action == 'clean':
+                result["cleaned_text"] = self.clean()
+            elif action == 'slug':
+                result["slug"] = self.slug()
+        return result
+
+# ============================================================
+# Streaming
+# ============================================================
+
+# Actions a stream can run; clean streams its output, the others report at the end
+STREAM_ACTIONS = ('stats', 'keywords', 'clean')
+# A body of this type, or any body with ?stream=1, is raw text for streaming.
+# text/plain is not enough: browsers send JSON bodies as text/plain by default.
+STREAM_CONTENT_TYPE = 'application/octet-stream'
+# Largest request body in streaming mode
+STREAM_MAX_BODY_BYTES = int(os.environ.get("TEXT_STREAM_MAX_BODY_BYTES", str(1024 * 1024 * 1024)))
+# Longest text held back at a chunk boundary: a word or tag longer than
+# this is cut there and may then count differently than in one piece
+STREAM_MAX_CARRY = 1024 * 1024
+
+def _chunk_cut(text: str) -> int:
+    """
+    Where to stop processing text whose continuation is still to come:
+    after its last whitespace when that is near the end (lower() looks
+    past punctuation, but not whitespace, to tell a final sigma), else
+    after its last non-word character.
+    """
+    cut = max(text.rfind(' '), text.rfind('\n'), text.rfind('\t')) + 1
+    if cut and len(text) - cut <= 4096:
+        return cut
+    i = len(text)
+    limit = max(0, i - STREAM_MAX_CARRY)
+    # isalnum() or '_' is exactly what \w matches in str patterns
+    while i > limit and (text[i - 1].isalnum() or text[i - 1] == '_'):
+        i -= 1
+    # A word longer than the carry limit is cut rather than held back
+    return len(text) if i == limit > 0 else i
+
+class TextStream:
+    """
+    Stats, keywords and clean text of a document fed in chunks, in memory
+    bounded by the chunk size and the number of distinct words.
+
+    Each chunk is processed up to its last whitespace or non-word character
+    and the rest carried into the next, so words (and runs of Chinese) are
+    never split;
+    a sentence that spans chunks is counted once, and a tag cut by a chunk
+    boundary is held back until it closes. Results are identical to
+    TextAnalysis on the whole text, except for single words or tags longer
+    than STREAM_MAX_CARRY and a Greek final sigma at a boundary with no
+    whitespace in the 4 KiB before it.
+    """
+
+    def __init__(self, clean: bool = False):
+        self.characters = 0
+        self.words = 0
+        self.word_chars = 0
+        self.sentences = 0
+        self.terms = Counter()
+        self.term_count = 0
+        self._carry = ''
+        self._open_sentence = False
+        self._clean = clean
+        self._tag_carry = ''
+        self._space = False
+        self._emitted = False
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; returns the next piece of clean text ('' unless clean)."""
+        self.characters += len(chunk)
+        text = self._carry + chunk
+        cut = _chunk_cut(text)
+        self._carry = text[cut:]
+        self._count(text[:cut])
+        return self._clean_piece(chunk, False) if self._clean else ''
+
+    def close(self) -> str:
+        """Process what is held back; returns the last piece of clean text."""
+        self._count(self._carry)
+        self._carry = ''
+        return self._clean_piece('', True) if self._clean else ''
+
+    def _count(self, text: str) -> None:
+        if not text:
+            return
+        analysis = TextAnalysis(text)
+        words = analysis.words
+        self.words += len(words)
+        self.word_chars += sum(map(len, words))
+        terms = analysis.terms
+        self.terms.update(terms)
+        self.term_count += len(terms)
+        sentences = list(_patterns.sentence.finditer(text))
+        if sentences:
+            self.sentences += len(sentences)
+            # The first stretch continues one left open by the previous text
+            if self._open_sentence and not _patterns.terminator.search(text, 0, sentences[0].start()):
+                self.sentences -= 1
+            self._open_sentence = sentences[-1].end() == len(text)
+        elif _patterns.terminator.search(text):
+            self._open_sentence = False
+
+    def _clean_piece(self, chunk: str, final: bool) -> str:
+        text = self._tag_carry + chunk
+        self._tag_carry = ''
+        if not final:
+            # A '<' after the last '>' may open a tag that closes later
+            start = text.find('<', text.rfind('>') + 1)
+            if start != -1 and len(text) - start <= STREAM_MAX_CARRY:
+                text, self._tag_carry = text[:start], text[start:]
+        text = _TAG_RE.sub('', text)
+        words = text.split()
+        if not words:
+            self._space = self._space or bool(text)
+            return ''
+        lead = ' ' if self._emitted and (self._space or text[0].isspace()) else ''
+        self._space = text[-1].isspace()
+        self._emitted = True
+        return lead + ' '.join(words)
+
+    def stats(self) -> dict:
+        return {
+            "words": self.words,
+            "sentences": self.sentences,
+            "characters": self.characters,
+            "avg_word_length": round(self.word_chars / self.words, 2) if self.words > 0 else 0,
+            "reading_time_seconds": math.ceil(self.words / 200 * 60),
+        }
+
+    def keywords(self, top_n: int = 5, ranking: str = 'tf') -> list:
+        return top_keywords(Counter(self.terms), self.term_count, top_n, ranking)
+
+def iter_text(source, chunk_size: int = 64 * 1024):
+    """
+    str chunks from an iterable of str or UTF-8 bytes chunks, or from a
+    text or binary file object. Characters split across bytes chunks are
+    decoded whole; invalid bytes become U+FFFD.
+    """
+    if hasattr(source, 'read'):
+        read = source.read
+        source = iter(lambda: read(chunk_size), read(0))
+    decoder = None
+    for chunk in source:
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        if decoder is None:
+            import codecs
+            decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        yield decoder.decode(chunk)
+    if decoder is not None:
+        yield decoder.decode(b'', True)
+
+def stream_text(source, actions=('stats',), top_n: int = 5, ranking: str = 'tf') -> dict:
+    """
+    Run streaming actions over source (see iter_text()); the result has the
+    shape of TextAnalysis.run(). Prefer TextStream to consume clean text
+    piece by piece instead of collecting it here.
+    """
+    stream = TextStream(clean='clean' in actions)
+    pieces = []
+    for chunk in iter_text(source):
+        pieces.append(stream.feed(chunk))
+    pieces.append(stream.close())
+    result = {}
+    if 'stats' in actions:
+        result["stats"] = stream.stats()
+    if 'keywords' in actions:
+        result["keywords"] = stream.keywords(top_n, ranking)
+    if 'clean' in actions:
+        result["cleaned_text"] = ''.join(pieces)
+    return result
+
+def parse_top(value) -> int:
+    """The 'top' option from a JSON body or the query string; ValueError unless it is an integer."""
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    raise ValueError("'top' must be an integer")
+
+def parse_actions(data: dict):
+    """
+    Actions requested by a body: ["stats", ...] from "actions", every action
+    for action "all", or None for a single action.
+    """
+    actions = data.get('actions')
+    if actions is None:
+        return list(TEXT_ACTIONS) if data.get('action') == 'all' else None
+    if isinstance(actions, str):
+        actions = actions.split(',')
+    if not isinstance(actions, list) or not actions:
+        raise ValueError("'actions' must be a non-empty list")
+    unknown = [a for a in actions if a not in TEXT_ACTIONS]
+    if unknown:
+        raise ValueError(f"Unknown action: {unknown[0]}")
+    # Canonical order, so equivalent requests share an ETag
+    return [a for a in TEXT_ACTIONS if a in actions]
+
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type == STREAM_CONTENT_TYPE or query_flag(self, 'stream'):
+            self._post_stream()
+            return
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            data = json.loads(body)
+            data = read_json(self, MAX_BODY_BYTES)
             
             action = data.get('action', 'stats')
             text = data.get('text', '')
@@ -66,13 +495,45 @@ class handler(BaseHTTPRequestHandler):
                 self._send_error(400, "Missing 'text' parameter")
                 return
             
+            try:
+                actions = parse_actions(data)
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            if actions is not None:
+                action = ','.join(actions)
+            wants_top = action == 'keywords' or (actions is not None and 'keywords' in actions)
+            try:
+                top = parse_top(data.get('top', 5)) if wants_top else None
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            ranking = data.get('ranking') or default_ranking() if wants_top else None
+            if ranking is not None and ranking not in KEYWORD_RANKINGS:
+                self._send_error(400, f"Unknown ranking: {ranking}")
+                return
+            if ranking in ('tfidf', 'bm25') and df_table() is None:
+                self._send_error(400, f"Ranking '{ranking}' is not available: no document-frequency table")
+                return
+            table = df_table().digest if ranking in ('tfidf', 'bm25') else None
+            # Results are a pure function of these, so the hash names the response
+            key = content_hash('text', TEXT_VERSION, action, top, ranking, table, text)
+            etag = content_hash(key, query_flag(self, 'pretty'))
+            # Larger inputs are not kept, so GET ?h= could never serve them
+            cached = len(text) <= RESULT_CACHE_MAX_INPUT
+            headers = {'Content-Location': f"{urlparse(self.path).path}?h={key}"} if cached else {}
+            if etag_matches(self, etag):
+                send_not_modified(self, etag, headers)
+                return
+
             result = {}
             
-            if action == 'stats':
+            if actions is not None:
+                result = TextAnalysis(text).run(actions, top, ranking)
+            elif action == 'stats':
                 result = text_stats(text)
             elif action == 'keywords':
-                top = int(data.get('top', 5))
-                result = {"keywords": extract_keywords(text, top)}
+                result = {"keywords": extract_keywords(text, top, ranking)}
             elif action == 'clean':
                 result = {"cleaned_text": clean_text(text)}
             elif action == 'slug':
@@ -81,32 +542,121 @@ class handler(BaseHTTPRequestHandler):
                 self._send_error(400, f"Unknown action: {action}")
                 return
 
-            self._send_json(200, result)
+            if cached:
+                results.put(key, result)
+            self._send_json(200, result, headers, etag)
             
-        except json.JSONDecodeError:
-            self._send_error(400, "Invalid JSON")
+        except BodyError as e:
+            self._send_error(e.status, str(e))
         except Exception as e:
             self._send_error(500, str(e))
 
+    def _post_stream(self):
+        """
+        Streaming mode: the body is the raw text (Content-Length or chunked)
+        and options come from the query string. Only taken when asked for
+        (?stream=1 or STREAM_CONTENT_TYPE). clean writes the cleaned
+        text as it is produced; stats and keywords answer with JSON once
+        the body has been read.
+        """
+        query = parse_qs(urlparse(self.path).query)
+        action = query.get('action', ['stats'])[-1]
+        actions = ['stats', 'keywords'] if action == 'all' else action.split(',')
+        if not actions or any(a not in STREAM_ACTIONS for a in actions):
+            self._send_error(400, f"Unknown action: {action}")
+            return
+        if 'clean' in actions and len(actions) > 1:
+            self._send_error(400, "clean streams its output and cannot be combined with other actions")
+            return
+        try:
+            top = parse_top(query.get('top', ['5'])[-1])
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+        ranking = query.get('ranking', [default_ranking()])[-1]
+        if ranking not in KEYWORD_RANKINGS or (ranking != 'tf' and df_table() is None):
+            self._send_error(400, f"Unknown or unavailable ranking: {ranking}")
+            return
+
+        stream = TextStream(clean='clean' in actions)
+        chunks = iter_text(iter_body(self, STREAM_MAX_BODY_BYTES))
+        try:
+            if 'clean' in actions:
+                self._stream_clean(stream, chunks)
+                return
+            for chunk in chunks:
+                stream.feed(chunk)
+            stream.close()
+        except BodyError as e:
+            self._send_error(e.status, str(e))
+            return
+        result = {}
+        if 'stats' in actions:
+            result["stats"] = stream.stats()
+        if 'keywords' in actions:
+            result["keywords"] = stream.keywords(top, ranking)
+        self._send_json(200, result["stats"] if actions == ['stats'] else result)
+
+    def _stream_clean(self, stream: TextStream, chunks) -> None:
+        # The first piece is read before answering, so an oversized or
+        # malformed body is still refused with a status
+        pending = [next(chunks, '')]
+        writer = StreamWriter(self, 'text/plain; charset=utf-8')
+        try:
+            for chunk in itertools.chain(pending, chunks):
+                piece = stream.feed(chunk)
+                if piece:
+                    writer.write(piece.encode('utf-8', 'surrogatepass'))
+            piece = stream.close()
+            if piece:
+                writer.write(piece.encode('utf-8', 'surrogatepass'))
+        except BodyError:
+            # Too late for a status: cut the response short instead
+            self.close_connection = True
+            return
+        writer.close()
+
     def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        if 'h' in query:
+            # Cacheable GET of a previous POST's result, keyed by its content hash
+            key = query['h'][-1]
+            if len(key) != 32 or any(c not in HEX_DIGITS for c in key):
+                self._send_error(400, "'h' must be the hash from a Content-Location header")
+                return
+            # Looked up first: only a result this server holds can be not modified
+            result = results.get(key)
+            if result is None:
+                send_cache_miss(self, "POST the text instead")
+                return
+            etag = content_hash(key, query_flag(self, 'pretty'))
+            if etag_matches(self, etag):
+                send_not_modified(self, etag, {'Cache-Control': IMMUTABLE})
+                return
+            self._send_json(200, result, {'Cache-Control': IMMUTABLE}, etag)
+            return
         info = {
             "name": "Text Toolkit API",
-            "version": "1.0.0",
+            "version": TEXT_VERSION,
             "actions": [
                 "stats (Word/Char count, Reading time)",
-                "keywords (Simple extraction)",
+                "keywords (Top N; \"ranking\": tf, tfidf or bm25)",
                 "clean (Remove HTML, normalize stats)",
-                "slug (Generate URL slug)"
-            ]
+                "slug (Generate URL slug)",
+                "all, or \"actions\": [...] (several actions from one shared scan)",
+                "?stream=1 (or Content-Type: application/octet-stream) with a raw text body "
+                "(chunked allowed) and ?action=stats|keywords|clean|all streams documents of any size"
+            ],
+            "ranking": default_ranking(),
         }
+        table = df_table()
+        if table is not None:
+            info["df_table"] = {"documents": table.doc_count, "terms": table.term_count,
+                                "digest": table.digest}
         self._send_json(200, info)
 
-    def _send_json(self, status: int, data: dict):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(data, indent=2).encode('utf-8'))
+    def _send_json(self, status: int, data: dict, headers: dict = None, etag: str = None):
+        send_json(self, status, data, headers, etag=etag)
 
     def _send_error(self, status: int, message: str):
         self._send_json(status, {"error": message})
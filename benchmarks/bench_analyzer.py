@@ -0,0 +1,241 @@
+"""
+Throughput benchmark for core/analyzer.analyze_code.
+
+Runs the analyzer over a reproducible corpus and reports lines/sec,
+nodes/sec, p50/p99 per-file latency, peak traced memory per file and the
+memory retained by keeping every result of a set alive (what batch jobs
+do). Results can be saved as JSON and compared against a previous run.
+
+--api selects the entry point: "model" (analyze, slotted records, the
+default) or "dict" (analyze_code, the public JSON shape).
+
+Corpus sets:
+    stdlib  - every .py file of the running interpreter's standard library
+    deep    - synthetic modules with deeply nested functions and branches
+    flat    - synthetic huge modules made of flat top-level statements
+    many    - synthetic modules with thousands of small functions
+
+Usage:
+    python benchmarks/bench_analyzer.py --output before.json
+    python benchmarks/bench_analyzer.py --compare before.json --threshold 0.10
+    python benchmarks/bench_analyzer.py --api dict --corpus many
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "core"))
+from analyzer import ANALYZER_VERSION, analyze, analyze_code  # noqa: E402
+
+CORPUS_SETS = ("stdlib", "deep", "flat", "many")
+APIS = {"model": analyze, "dict": analyze_code}
+
+# Metric name -> True when a larger value is better
+METRICS = {
+    "lines_per_sec": True,
+    "nodes_per_sec": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "peak_kib": False,
+    "retained_kib": False,
+}
+
+
+def stdlib_corpus(limit=None):
+    root = Path(os.__file__).parent
+    paths = sorted(p for p in root.rglob("*.py") if "site-packages" not in p.parts)
+    count = 0
+    for path in paths:
+        try:
+            code = path.read_text(encoding="utf-8")
+            ast.parse(code)
+        except (OSError, UnicodeDecodeError, SyntaxError, ValueError):
+            continue
+        yield str(path.relative_to(root)), code
+        count += 1
+        if limit and count >= limit:
+            return
+
+
+def deep_corpus(files=20):
+    for n in range(files):
+        depth = 10 + n * 2
+        lines = []
+        for level in range(depth):
+            pad = "    " * level
+            lines.append(f"{pad}def level_{level}(a, b):")
+            lines.append(f"{pad}    if a and b or level_{level}:")
+            lines.append(f"{pad}        a = [x for x in range(b) if x]")
+            lines.append(f"{pad}    while b > {level}:")
+            lines.append(f"{pad}        b -= 1")
+        yield f"deep_{depth}.py", "\n".join(lines) + "\n"
+
+
+def flat_corpus(files=5, statements=20000):
+    for n in range(files):
+        lines = ["import os", "import json"]
+        for i in range(statements):
+            if i % 3 == 0:
+                lines.append(f"value_{i} = {{'key': {i}, 'items': [{i}, {i + 1}]}}")
+            elif i % 3 == 1:
+                lines.append(f"os.path.join('a', str(value_{i - 1}))")
+            else:
+                lines.append(f"result_{i} = value_{i - 2} if {i} % 2 else None")
+        yield f"flat_{n}.py", "\n".join(lines) + "\n"
+
+
+def many_corpus(files=5, functions=3000):
+    for n in range(files):
+        lines = []
+        for i in range(functions):
+            lines.append(f"def func_{i}(x, y=None):")
+            lines.append("    for item in x:")
+            lines.append("        if item is None or item == y:")
+            lines.append("            continue")
+            lines.append("    return x")
+            if i % 50 == 0:
+                lines.append(f"class Holder{i}(object):")
+                lines.append("    def method(self):")
+                lines.append("        return eval('1')")
+        yield f"many_{n}.py", "\n".join(lines) + "\n"
+
+
+def load_corpus(name, stdlib_limit=None):
+    if name == "stdlib":
+        return list(stdlib_corpus(stdlib_limit))
+    return list({"deep": deep_corpus, "flat": flat_corpus, "many": many_corpus}[name]())
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_set(files, repeat, run=analyze):
+    lines = nodes = 0
+    latencies = []
+    for _, code in files:
+        lines += len(code.splitlines())
+        nodes += sum(1 for _ in ast.walk(ast.parse(code)))
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(code)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        latencies.append(best)
+
+    # Peak memory is measured in a separate pass: tracemalloc slows
+    # allocation-heavy code down too much to time it at the same time.
+    peak = 0
+    kept = []
+    tracemalloc.start()
+    try:
+        start_memory = tracemalloc.get_traced_memory()[0]
+        for _, code in files:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            kept.append(run(code))
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+        retained = tracemalloc.get_traced_memory()[0] - start_memory
+    finally:
+        tracemalloc.stop()
+    del kept
+
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        "files": len(files),
+        "lines": lines,
+        "nodes": nodes,
+        "seconds": round(total, 4),
+        "lines_per_sec": round(lines / total, 1) if total else 0.0,
+        "nodes_per_sec": round(nodes / total, 1) if total else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3) if latencies else 0.0,
+        "peak_kib": round(peak / 1024, 1),
+        "retained_kib": round(retained / 1024, 1),
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return a list of human readable regressions beyond threshold."""
+    regressions = []
+    for name, result in current["sets"].items():
+        before = baseline.get("sets", {}).get(name)
+        if not before:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark core/analyzer.analyze_code")
+    parser.add_argument("--corpus", default=",".join(CORPUS_SETS),
+                        help="comma separated corpus sets (default: all)")
+    parser.add_argument("--stdlib-limit", type=int, default=None,
+                        help="only use the first N stdlib files")
+    parser.add_argument("--api", choices=sorted(APIS), default="model",
+                        help="analyzer entry point to measure (default: model)")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per file (best is kept)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed relative regression before failing (default: 0.10)")
+    args = parser.parse_args()
+
+    results = {
+        "analyzer_version": ANALYZER_VERSION,
+        "api": args.api,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sets": {},
+    }
+    print(f"{'set':<8} {'files':>6} {'lines/s':>12} {'nodes/s':>12} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'peak KiB':>10} {'kept KiB':>10}")
+    for name in [n.strip() for n in args.corpus.split(",") if n.strip()]:
+        if name not in CORPUS_SETS:
+            parser.error(f"unknown corpus set: {name}")
+        stats = run_set(load_corpus(name, args.stdlib_limit), args.repeat, APIS[args.api])
+        results["sets"][name] = stats
+        print(f"{name:<8} {stats['files']:>6} {stats['lines_per_sec']:>12.0f} {stats['nodes_per_sec']:>12.0f} "
+              f"{stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['peak_kib']:>10.1f} "
+              f"{stats['retained_kib']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
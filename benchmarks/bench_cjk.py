@@ -0,0 +1,99 @@
+"""
+Throughput of the Chinese segmenter behind /api/text, in characters/sec.
+
+Generates Chinese text from the built-in dictionary's words (with
+punctuation, characters it does not know and a little embedded English)
+and times:
+
+    load      building the trie from a text dictionary, or reading a
+              compiled one
+    segment   CompactTrie.segment() over the Han runs alone
+    tokenize  text.tokenize(), the word split stats/keywords use
+    all       TextAnalysis.run() with every action
+
+Usage:
+    python benchmarks/bench_cjk.py
+    python benchmarks/bench_cjk.py --size 2000000 --dict dict.txt
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent.parent / "api-service" / "api"
+sys.path.insert(0, str(API_DIR))
+
+
+def chinese_text(words, size, rng):
+    unknown = [chr(c) for c in range(0x4e00, 0x9fa5, 97)]
+    parts = []
+    total = 0
+    while total < size:
+        sentence = "".join(rng.choice(words) if rng.random() < 0.95 else rng.choice(unknown)
+                           for _ in range(rng.randint(4, 25)))
+        if rng.random() < 0.1:
+            sentence += rng.choice((" Python ", " API 3.0 ", " GPT-4 "))
+        sentence += rng.choice(("。", "！", "？", "，", "；")) + ("\n" if rng.random() < 0.1 else "")
+        parts.append(sentence)
+        total += len(sentence)
+    return "".join(parts)[:size]
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Chinese segmentation throughput")
+    parser.add_argument("--size", type=int, default=500_000, help="characters of generated text (default: 500000)")
+    parser.add_argument("--dict", help="dictionary to use instead of the built-in one (text or compiled)")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs (best is kept)")
+    args = parser.parse_args()
+    if args.dict:
+        os.environ["TEXT_CJK_DICT"] = os.path.abspath(args.dict)
+
+    import _cjk
+    from text import TEXT_ACTIONS, TextAnalysis, tokenize
+
+    start = time.perf_counter()
+    trie = _cjk.load(_cjk.DICT_PATH)
+    loaded = time.perf_counter() - start
+    _cjk._segmenter = trie
+    print(f"dictionary: {_cjk.DICT_PATH}")
+    print(f"  {len(trie)} trie nodes, "
+          f"{len(trie.to_bytes()) / 1024:.1f} KiB compiled, loaded in {loaded * 1000:.1f} ms")
+
+    # Generated from the built-in vocabulary whichever dictionary is measured
+    words = list(_cjk.read_frequencies(str(API_DIR / "cjk_dict.txt")))
+    text = chinese_text(words, args.size, random.Random(42))
+    runs = _cjk.patterns.han_run.findall(text)
+    han = sum(map(len, runs))
+
+    def segment_all():
+        segment = trie.segment
+        for run in runs:
+            segment(run)
+
+    print(f"{'phase':<10} {'chars':>9} {'ms':>9} {'chars/sec':>12}")
+    for name, count, func in (
+        ("segment", han, segment_all),
+        ("tokenize", len(text), lambda: tokenize(text)),
+        ("all", len(text), lambda: TextAnalysis(text).run(TEXT_ACTIONS)),
+    ):
+        elapsed = best_of(args.repeat, func)
+        print(f"{name:<10} {count:>9} {elapsed * 1000:>9.1f} {count / elapsed:>12,.0f}")
+    sample = TextAnalysis(text[:200])
+    print(f"sample: {' / '.join(sample.words[:12])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Linearity benchmark for core/analyzer.analyze_code.
+
+Generates modules that grow either wider (more top-level functions) or
+deeper (more nested function levels) and reports the analysis cost per
+AST node. A single-pass analyzer keeps ns/node flat in both series; the
+old per-function sub-visitor re-walked each node once per enclosing
+function, O(nodes x depth), so its ns/node grew linearly with nesting depth.
+
+Usage:
+    python benchmarks/bench_linear.py [--repeat 5]
+"""
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "core"))
+from analyzer import analyze_code  # noqa: E402
+
+BODY = [
+    "if x > 0 and y > 0:",
+    "    x -= 1",
+    "for i in range(x):",
+    "    assert i >= 0",
+    "while y:",
+    "    y -= 1",
+]
+
+
+def wide_module(functions: int) -> str:
+    lines = []
+    for n in range(functions):
+        lines.append(f"def f{n}(x, y):")
+        lines.extend("    " + line for line in BODY)
+        lines.append("    return x")
+    return "\n".join(lines) + "\n"
+
+
+def deep_module(depth: int, width: int = 8) -> str:
+    lines = []
+    for level in range(depth):
+        pad = "    " * level
+        lines.append(f"{pad}def f{level}(x, y):")
+        for _ in range(width):
+            lines.extend(pad + "    " + line for line in BODY)
+    return "\n".join(lines) + "\n"
+
+
+def measure(code: str, repeat: int):
+    nodes = sum(1 for _ in ast.walk(ast.parse(code)))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        analyze_code(code)
+        samples.append(time.perf_counter() - start)
+    best = min(samples)
+    return nodes, best, best / nodes * 1e9
+
+
+def run_series(name, sizes, build, repeat):
+    print(f"\n[{name}]")
+    print(f"{'size':>8} {'nodes':>10} {'ms':>10} {'ns/node':>10}")
+    per_node = []
+    for size in sizes:
+        nodes, seconds, ns = measure(build(size), repeat)
+        per_node.append(ns)
+        print(f"{size:>8} {nodes:>10} {seconds * 1000:>10.2f} {ns:>10.1f}")
+    spread = max(per_node) / min(per_node)
+    print(f"ns/node spread (max/min): {spread:.2f}x")
+    return spread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run_series("wide: top-level functions", [50, 200, 800, 3200], wide_module, args.repeat)
+    run_series("deep: nesting levels", [5, 10, 20, 40, 80], deep_module, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
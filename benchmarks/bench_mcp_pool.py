@@ -0,0 +1,109 @@
+"""
+MCP tool throughput under concurrent calls: inline on the event loop vs on
+the worker process pool.
+
+Drives the MCP server in-process through a connected client session (the
+real protocol path, minus stdio) with --concurrency analyze_code calls in
+flight at once, each on a distinct variant of the source so neither the
+cache nor incremental analysis can answer it. A small analyze_text call is
+issued alongside every tenth call; its latency shows how long other calls
+stall behind a large analysis.
+
+Needs the mcp package (pip install "mcp>=1.10,<2").
+
+Usage:
+    python benchmarks/bench_mcp_pool.py
+    python benchmarks/bench_mcp_pool.py --calls 200 --concurrency 16 --workers 1,2,4
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "mcp-server"))
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] if ordered else 0.0
+
+
+async def run_calls(session, source, calls, concurrency):
+    import anyio
+    limiter = anyio.Semaphore(concurrency)
+    probes = []
+
+    async def one(i):
+        async with limiter:
+            # Renaming `self` changes nearly every definition, so incremental
+            # analysis cannot reuse segments from earlier calls either
+            code = source.replace("self", f"self_{i}")
+            result = await session.call_tool("analyze_code", {"code": code, "fields": ["metrics"]})
+            assert not result.isError, result.content[0].text
+
+    async def probe():
+        start = time.perf_counter()
+        await session.call_tool("analyze_text", {"text": "The quick brown fox.", "action": "stats"})
+        probes.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as group:
+        for i in range(calls):
+            group.start_soon(one, i)
+            if i % 10 == 0:
+                group.start_soon(probe)
+    return time.perf_counter() - start, probes
+
+
+def measure(workers, source, calls, concurrency):
+    import anyio
+    from mcp.shared.memory import create_connected_server_and_client_session
+    import pool
+    import server
+
+    # workers=0: everything inline, as before the pool existed
+    server.INLINE_MAX_CHARS = sys.maxsize if workers == 0 else 0
+    pool._default_pool = pool.ToolPool(workers=max(1, workers))
+    if workers:
+        pool._default_pool.warm()
+
+    async def main():
+        async with create_connected_server_and_client_session(server.mcp._mcp_server) as session:
+            return await run_calls(session, source, calls, concurrency)
+
+    try:
+        elapsed, probes = anyio.run(main)
+    finally:
+        pool._default_pool.shutdown()
+    return elapsed, probes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP tool calls inline vs on the process pool")
+    parser.add_argument("--calls", type=int, default=60, help="analyze_code calls per run (default: 60)")
+    parser.add_argument("--concurrency", type=int, default=8, help="calls in flight (default: 8)")
+    parser.add_argument("--workers", default=f"0,{os.cpu_count() or 1}",
+                        help="comma-separated pool sizes; 0 runs inline (default: 0,<CPU count>)")
+    parser.add_argument("--source", default=str(ROOT / "core" / "analyzer.py"),
+                        help="Python file analyzed by every call (default: core/analyzer.py)")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+    with open(args.source, encoding="utf-8") as f:
+        source = f.read()
+    print(f"{args.calls} calls x {len(source):,} chars, {args.concurrency} concurrent")
+    print(f"{'mode':<10} {'calls/sec':>10} {'probe p50 ms':>13} {'probe p99 ms':>13}")
+    for workers in (int(w) for w in args.workers.split(",")):
+        elapsed, probes = measure(workers, source, args.calls, args.concurrency)
+        mode = "inline" if workers == 0 else f"pool x{workers}"
+        print(f"{mode:<10} {args.calls / elapsed:>10.1f} "
+              f"{statistics.median(probes) * 1000:>13.1f} {percentile(probes, 99) * 1000:>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+MCP server startup latency: process start to the first tools/list response.
+
+Spawns mcp-server/server.py over stdio the way an agent host does, sends
+initialize, the initialized notification and tools/list, and times each
+response from the moment the process was started. The first analyze_code
+call (on core/analyzer.py, large enough to go to the worker pool) is timed
+too: lazily loaded tools pay their imports there, and without
+MCP_WARMUP=1 it also waits for the pool to start.
+
+Usage:
+    python benchmarks/bench_mcp_startup.py
+    python benchmarks/bench_mcp_startup.py --runs 9 --warmup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVER = ROOT / "mcp-server" / "server.py"
+
+
+def rpc(request_id, method, params=None):
+    message = {"jsonrpc": "2.0", "method": method}
+    if request_id is not None:
+        message["id"] = request_id
+    if params is not None:
+        message["params"] = params
+    return (json.dumps(message) + "\n").encode()
+
+
+def read_response(proc, request_id):
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"server exited: {proc.stderr.read().decode(errors='replace')[-2000:]}")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            if "error" in message:
+                raise RuntimeError(message["error"])
+            return message["result"]
+
+
+def start_once(warmup, code):
+    env = dict(os.environ)
+    if warmup:
+        env["MCP_WARMUP"] = "1"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, str(SERVER)], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, env=env)
+    marks = {}
+    try:
+        proc.stdin.write(rpc(1, "initialize", {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "bench_mcp_startup", "version": "1"},
+        }))
+        proc.stdin.flush()
+        read_response(proc, 1)
+        marks["initialize"] = time.perf_counter() - start
+        proc.stdin.write(rpc(None, "notifications/initialized"))
+        proc.stdin.write(rpc(2, "tools/list"))
+        proc.stdin.flush()
+        tools = read_response(proc, 2)["tools"]
+        marks["tools/list"] = time.perf_counter() - start
+        call_start = time.perf_counter()
+        proc.stdin.write(rpc(3, "tools/call", {"name": "analyze_code", "arguments": {"code": code,
+                                                                       "fields": ["metrics"]}}))
+        proc.stdin.flush()
+        read_response(proc, 3)
+        marks["first call"] = time.perf_counter() - call_start
+    finally:
+        proc.stdin.close()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    return marks, len(tools)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time MCP server startup to the first tools/list response")
+    parser.add_argument("--runs", type=int, default=5, help="server starts to time (default: 5)")
+    parser.add_argument("--warmup", action="store_true", help="start with MCP_WARMUP=1 (pre-forked pool)")
+    args = parser.parse_args()
+
+    code = (ROOT / "core" / "analyzer.py").read_text(encoding="utf-8")
+    runs = []
+    for _ in range(args.runs):
+        marks, tool_count = start_once(args.warmup, code)
+        runs.append(marks)
+    print(f"{SERVER.relative_to(ROOT)}: {tool_count} tools, {args.runs} runs"
+          f"{', MCP_WARMUP=1' if args.warmup else ''}")
+    print(f"{'phase':<12} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for phase in ("initialize", "tools/list", "first call"):
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<12} {statistics.median(values):>10.1f} {min(values):>10.1f} {max(values):>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
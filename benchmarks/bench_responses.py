@@ -0,0 +1,115 @@
+"""
+Response size and serialization cost of the JSON handlers.
+
+Builds /api/explain and /api/text (stats and clean) response bodies for a
+corpus and measures, per encoding variant, the total and mean body size and
+the p50/p99 time to serialize (and compress) one response:
+
+    pretty        json.dumps(indent=2), the previous default
+    compact       compact separators, UTF-8 (the new default)
+    lean          compact without the echoed input (?lean=1)
+    lean+gzip     lean, gzip at the handler's level
+    lean+br       lean, brotli (only when the brotli module is installed)
+    compact+gzip  compact with the echoed input, gzip
+
+Usage:
+    python benchmarks/bench_responses.py
+    python benchmarks/bench_responses.py --stdlib-limit 100 --output sizes.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+sys.path.insert(0, str(HERE.parent / "api-service" / "api"))
+from bench_analyzer import percentile, stdlib_corpus  # noqa: E402
+from _http import _load_brotli, compress, dumps  # noqa: E402
+from core_analyzer import analyze_code  # noqa: E402
+from text import clean_text, text_stats  # noqa: E402
+
+
+def explain_responses(files):
+    for _, code in files:
+        yield {"original_code": code, "analysis": analyze_code(code), "language": "python"}, "original_code"
+
+
+def text_responses(files):
+    # /api/text echoes nothing, so its lean variants equal the plain ones
+    for _, code in files:
+        yield text_stats(code), None
+        yield {"cleaned_text": clean_text(code)}, None
+
+
+def variants():
+    found = {
+        "pretty": (False, lambda data: json.dumps(data, indent=2).encode("utf-8")),
+        "compact": (False, dumps),
+        "lean": (True, dumps),
+        "lean+gzip": (True, lambda data: compress(dumps(data), "gzip")),
+    }
+    if _load_brotli() is not None:
+        found["lean+br"] = (True, lambda data: compress(dumps(data), "br"))
+    found["compact+gzip"] = (False, lambda data: compress(dumps(data), "gzip"))
+    return found
+
+
+def run_set(responses, repeat):
+    results = {}
+    for name, (lean, encode) in variants().items():
+        sizes = []
+        latencies = []
+        for body, echoed in responses:
+            if lean:
+                body = {k: v for k, v in body.items() if k != echoed}
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                payload = encode(body)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            sizes.append(len(payload))
+            latencies.append(best)
+        latencies.sort()
+        results[name] = {
+            "total_kib": round(sum(sizes) / 1024, 1),
+            "mean_bytes": round(statistics.mean(sizes)) if sizes else 0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON response sizes and serialization time")
+    parser.add_argument("--stdlib-limit", type=int, default=300, help="stdlib files in the corpus (default: 300)")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per response (best is kept)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    files = list(stdlib_corpus(args.stdlib_limit))
+    sets = {
+        "explain": list(explain_responses(files)),
+        "text": list(text_responses(files)),
+    }
+    results = {"files": len(files), "brotli": _load_brotli() is not None, "sets": {}}
+    print(f"{'set':<8} {'variant':<13} {'total KiB':>10} {'mean B':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for set_name, responses in sets.items():
+        stats = run_set(responses, args.repeat)
+        results["sets"][set_name] = stats
+        for variant, row in stats.items():
+            print(f"{set_name:<8} {variant:<13} {row['total_kib']:>10.1f} {row['mean_bytes']:>9} "
+                  f"{row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
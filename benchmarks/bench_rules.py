@@ -0,0 +1,85 @@
+"""
+Security rule engine microbenchmark.
+
+Analyzes a fixed synthetic module with rule tables of growing size and
+reports the cost per AST node. Name based rules are dispatched through
+one dict lookup per node type and one per subject, so ns/node should stay
+flat from the 3 default rules to thousands.
+
+Usage:
+    python benchmarks/bench_rules.py [--repeat 5] [--functions 400]
+"""
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "core"))
+from analyzer import SECURITY_RULES, AnalysisVisitor, SecurityRule, compile_rules  # noqa: E402
+
+RULE_COUNTS = [0, 10, 100, 1000, 5000]
+
+
+def sample_module(functions):
+    lines = ["import os", "import json", "from subprocess import run"]
+    for i in range(functions):
+        lines.append(f"def handler_{i}(request, data=None):")
+        lines.append(f"    value = json.loads(request.body_{i})")
+        lines.append("    if value and data:")
+        lines.append(f"        os.path.join(str(value), helper_{i % 7}(data))")
+        lines.append(f"    return module_{i % 5}.call_{i % 11}(value)")
+    return "\n".join(lines) + "\n"
+
+
+def synthetic_rules(count):
+    """Extra rules split across calls, imports and from-imports."""
+    rules = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            rules.append(SecurityRule(ast.Call, "WARNING", "Synthetic Call",
+                                      "Call of '{name}' detected.", names=[f"danger_{i}", f"pkg.danger_{i}"]))
+        elif kind == 1:
+            rules.append(SecurityRule(ast.Import, "WARNING", "Synthetic Import",
+                                      "Import of '{name}' detected.", names=[f"module_{i}"]))
+        else:
+            rules.append(SecurityRule(ast.ImportFrom, "WARNING", "Synthetic Import",
+                                      "Import from '{name}' detected.", names=[f"package_{i}"]))
+    return rules
+
+
+def measure(tree, nodes, rule_map, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        AnalysisVisitor(rule_map).visit(tree)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / nodes * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the security rule dispatch")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--functions", type=int, default=400)
+    args = parser.parse_args()
+
+    tree = ast.parse(sample_module(args.functions))
+    nodes = sum(1 for _ in ast.walk(tree))
+    print(f"module: {nodes} AST nodes (visitor only, parse excluded)")
+    print(f"{'rules':>8} {'compile ms':>11} {'ns/node':>10}")
+    per_node = []
+    for count in RULE_COUNTS:
+        rules = SECURITY_RULES + synthetic_rules(count)
+        start = time.perf_counter()
+        rule_map = compile_rules(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+        ns = measure(tree, nodes, rule_map, args.repeat)
+        per_node.append(ns)
+        print(f"{len(rules):>8} {compile_ms:>11.2f} {ns:>10.1f}")
+    print(f"ns/node spread (max/min): {max(per_node) / min(per_node):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Cold-start import budget for the Vercel handler modules.
+
+Each handler is imported in a fresh interpreter under -X importtime and the
+module's cumulative import time is compared against its budget. The
+serverless runtime has already imported http.server and json by the time it
+loads a handler, so those are preloaded and not charged to the handler
+(--no-preload charges them too). Bytecode is compiled into a temporary
+pycache prefix first, like a deployed function; --source-only measures
+compiling from source on every start instead.
+
+Exits with status 1 when any handler's median exceeds its budget.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget explain=25 --runs 9
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (handler file, budget in ms for its cumulative import time)
+HANDLERS = {
+    "explain": (ROOT / "api-service" / "api" / "explain.py", 25.0),
+    "text": (ROOT / "api-service" / "api" / "text.py", 10.0),
+    "summarize": (ROOT / "youtube-summarizer" / "api" / "summarize.py", 10.0),
+}
+PRELOAD = ("http.server", "json")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def parse_importtime(stderr, module):
+    """
+    Return (cumulative_us, [(self_us, name), ...]) for module's import and
+    everything it pulled in, from -X importtime output.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((int(self_us), int(cumulative_us), len(indent), name))
+    # Children are printed before their parent, so the module's own imports
+    # are the deeper entries directly above its top-level line.
+    for index in range(len(entries) - 1, -1, -1):
+        self_us, cumulative_us, depth, name = entries[index]
+        if name == module and depth == 1:
+            children = []
+            for child in reversed(entries[:index]):
+                if child[2] <= depth:
+                    break
+                children.append((child[0], child[3]))
+            return cumulative_us, children
+    raise ValueError(f"{module} not found in -X importtime output")
+
+
+def measure(path, preload, env):
+    module = path.stem
+    statement = "".join(f"import {name}; " for name in preload) + f"import {module}"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          cwd=path.parent, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return parse_importtime(proc.stderr, module)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check handler import time against budgets")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per handler (median is kept)")
+    parser.add_argument("--budget", action="append", default=[], metavar="NAME=MS",
+                        help="override a handler budget, e.g. explain=25")
+    parser.add_argument("--only", help="comma separated handler names")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="also charge http.server and json to the handler")
+    parser.add_argument("--source-only", action="store_true",
+                        help="never use cached bytecode (compile from source on every start)")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports to list per handler")
+    args = parser.parse_args()
+
+    budgets = {name: budget for name, (_, budget) in HANDLERS.items()}
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        if name not in HANDLERS or not value:
+            parser.error(f"bad --budget {item!r}")
+        budgets[name] = float(value)
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(HANDLERS)
+    preload = () if args.no_preload else PRELOAD
+
+    failed = False
+    with tempfile.TemporaryDirectory() as pycache:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache)
+        if args.source_only:
+            env["PYTHONDONTWRITEBYTECODE"] = "1"
+        else:
+            env.pop("PYTHONDONTWRITEBYTECODE", None)
+        print(f"{'handler':<10} {'median ms':>10} {'min ms':>8} {'budget':>8}  status")
+        for name in names:
+            path, _ = HANDLERS[name]
+            try:
+                if not args.source_only:
+                    measure(path, preload, env)  # warm-up run writes the bytecode
+                samples = [measure(path, preload, env) for _ in range(args.runs)]
+            except (RuntimeError, ValueError) as e:
+                print(f"{name:<10} {'-':>10} {'-':>8} {budgets[name]:>8.1f}  ERROR {e}")
+                failed = True
+                continue
+            times = [cumulative / 1000 for cumulative, _ in samples]
+            median = statistics.median_low(times)
+            over = median > budgets[name]
+            failed = failed or over
+            print(f"{name:<10} {median:>10.2f} {min(times):>8.2f} {budgets[name]:>8.1f}  "
+                  f"{'OVER BUDGET' if over else 'ok'}")
+            heaviest = sorted(samples[times.index(median)][1], reverse=True)[:args.top]
+            for self_us, module in heaviest:
+                print(f"{'':<10} {self_us / 1000:>10.2f}   {module}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
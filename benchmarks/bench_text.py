@@ -0,0 +1,119 @@
+"""
+Combined text actions against calling each action separately.
+
+For ~1 MB inputs, times the four standalone functions of api/text.py one
+after another (what a client asking for all four used to cost, minus three
+round trips) against TextAnalysis.run() with the same actions, and checks
+that both give identical results.
+
+Inputs:
+    prose   - synthetic English prose with punctuation and inline HTML
+    source  - concatenated standard library modules
+    mixed   - prose interleaved with non-ASCII (accented and CJK) text
+
+Usage:
+    python benchmarks/bench_text.py
+    python benchmarks/bench_text.py --size 4000000 --actions stats,keywords
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api-service" / "api"))
+from text import (TEXT_ACTIONS, TextAnalysis, clean_text, extract_keywords,  # noqa: E402
+                  generate_slug, text_stats)
+
+WORDS = ("the quick brown fox jumps over lazy dog analysis server request response cache "
+         "python token keyword sentence paragraph value result system people time year "
+         "work world information data model performance latency throughput memory").split()
+
+
+def prose(size, rng, extra=()):
+    vocabulary = WORDS + list(extra)
+    parts = []
+    total = 0
+    while total < size:
+        sentence = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(5, 20)))
+        if rng.random() < 0.1:
+            sentence = f"<p class=\"x\">{sentence}</p>"
+        sentence = sentence.capitalize() + rng.choice((".", "!", "?", "...")) + rng.choice((" ", "\n", "\n\n"))
+        parts.append(sentence)
+        total += len(sentence)
+    return "".join(parts)[:size]
+
+
+def source(size):
+    root = Path(os.__file__).parent
+    parts = []
+    total = 0
+    for path in sorted(root.glob("*.py")):
+        text = path.read_text(encoding="utf-8", errors="replace")
+        parts.append(text)
+        total += len(text)
+        if total >= size:
+            break
+    return "".join(parts)[:size]
+
+
+def inputs(size):
+    rng = random.Random(42)
+    return {
+        "prose": prose(size, rng),
+        "source": source(size),
+        "mixed": prose(size, rng, ["café", "naïve", "Straße", "数据", "分析", "服务器", "İstanbul"]),
+    }
+
+
+def separately(text, actions, top_n):
+    result = {}
+    for action in actions:
+        if action == "stats":
+            result["stats"] = text_stats(text)
+        elif action == "keywords":
+            result["keywords"] = extract_keywords(text, top_n)
+        elif action == "clean":
+            result["cleaned_text"] = clean_text(text)
+        elif action == "slug":
+            result["slug"] = generate_slug(text)
+    return result
+
+
+def best_of(repeat, func, *args):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark combined text actions")
+    parser.add_argument("--size", type=int, default=1_000_000, help="characters per input (default: 1000000)")
+    parser.add_argument("--actions", default=",".join(TEXT_ACTIONS), help="comma separated actions")
+    parser.add_argument("--top", type=int, default=5, help="keywords to return")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs (best is kept)")
+    args = parser.parse_args()
+
+    actions = [a for a in TEXT_ACTIONS if a in args.actions.split(",")]
+    print(f"actions: {','.join(actions)}")
+    print(f"{'input':<8} {'chars':>9} {'separate ms':>12} {'combined ms':>12} {'speedup':>8}")
+    status = 0
+    for name, text in inputs(args.size).items():
+        separate, expected = best_of(args.repeat, separately, text, actions, args.top)
+        combined, got = best_of(args.repeat, lambda: TextAnalysis(text).run(actions, args.top))
+        if got != expected:
+            print(f"{name}: combined result differs from the standalone functions")
+            status = 1
+        print(f"{name:<8} {len(text):>9} {separate * 1000:>12.1f} {combined * 1000:>12.1f} "
+              f"{separate / combined:>7.2f}x")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Load test for serve.py: requests/sec and latency percentiles under concurrency.
+
+Each client thread keeps one HTTP/1.1 connection open and sends requests
+back to back (closed loop), reconnecting only when the server closes the
+connection. Latency is measured per request from send to last body byte.
+
+Workloads:
+    text      POST /api/text, action=all on a paragraph of English
+    explain   POST /api/explain on a ~60 line module
+    mixed     alternates the two
+    health    GET /healthz, the server's own overhead
+
+Usage:
+    python benchmarks/load_test.py --spawn --concurrency 16 --duration 10
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --workload explain --requests 5000
+    python benchmarks/load_test.py --spawn --server-args="--processes 4 --threads 8"
+"""
+import argparse
+import http.client
+import json
+import shlex
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TEXT = ("Serverless functions start cold, so every import and every compiled pattern is paid "
+        "on the first request. A long-running server pays it once. Keep-alive connections skip "
+        "the TCP handshake; a worker pool bounds how many requests run at the same time. ") * 4
+CODE = "\n".join(
+    f"def handler_{i}(request, retries=3):\n"
+    f"    for attempt in range(retries):\n"
+    f"        if request.get('id') == {i} and attempt:\n"
+    f"            return {{'ok': True, 'attempt': attempt}}\n"
+    f"    return None\n"
+    for i in range(12)
+)
+
+
+def workload(name):
+    """[(method, path, body bytes or None)], cycled by every client."""
+    text = ("POST", "/api/text", json.dumps({"action": "all", "text": TEXT}).encode())
+    explain = ("POST", "/api/explain", json.dumps({"code": CODE}).encode())
+    return {
+        "text": [text],
+        "explain": [explain],
+        "mixed": [text, explain],
+        "health": [("GET", "/healthz", None)],
+    }[name]
+
+
+class Client(threading.Thread):
+    def __init__(self, host, port, requests, stop, budget):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.requests = requests
+        self.stop = stop
+        self.budget = budget
+        self.latencies = []
+        self.errors = {}
+        self.connects = 0
+
+    def _error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def run(self):
+        conn = None
+        i = 0
+        while not self.stop.is_set() and self.budget():
+            method, path, body = self.requests[i % len(self.requests)]
+            i += 1
+            if conn is None:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+                self.connects += 1
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                self._error(type(exc).__name__)
+                conn.close()
+                conn = None
+                continue
+            self.latencies.append(time.perf_counter() - start)
+            if response.status >= 400:
+                self._error(f"HTTP {response.status}")
+            if response.will_close:
+                conn.close()
+                conn = None
+        if conn is not None:
+            conn.close()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def wait_for_port(host, port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_clients(host, port, requests, concurrency, duration, limit):
+    stop = threading.Event()
+    issued = [0]
+    lock = threading.Lock()
+
+    def budget():
+        if limit is None:
+            return True
+        with lock:
+            if issued[0] >= limit:
+                return False
+            issued[0] += 1
+            return True
+
+    clients = [Client(host, port, requests, stop, budget) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    if limit is None:
+        stop.wait(duration)
+        stop.set()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for c in clients for l in c.latencies)
+    errors = {}
+    for client in clients:
+        for kind, count in client.errors.items():
+            errors[kind] = errors.get(kind, 0) + count
+    ms = [l * 1000 for l in latencies]
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "connections": sum(c.connects for c in clients),
+        "latency_ms": {
+            "mean": round(statistics.fmean(ms), 3) if ms else 0.0,
+            "p50": round(percentile(ms, 50), 3),
+            "p90": round(percentile(ms, 90), 3),
+            "p99": round(percentile(ms, 99), 3),
+            "max": round(ms[-1], 3) if ms else 0.0,
+        },
+        "errors": errors,
+    }
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the self-hosted API server")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="server to test (default: %(default)s)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="start serve.py on a free port for the run and stop it afterwards")
+    parser.add_argument("--server-args", default="", help="extra serve.py arguments with --spawn")
+    parser.add_argument("--workload", choices=("text", "explain", "mixed", "health"), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=8, help="client connections (default: 8)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run (default: 10)")
+    parser.add_argument("--requests", type=int, help="stop after this many requests instead of --duration")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds of unmeasured warm-up (default: 1)")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        host, port = "127.0.0.1", free_port()
+        server = subprocess.Popen([sys.executable, str(ROOT / "serve.py"), "--port", str(port),
+                                   *shlex.split(args.server_args)], stderr=subprocess.DEVNULL)
+    else:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    try:
+        if not wait_for_port(host, port):
+            print(f"nothing listening on {host}:{port}", file=sys.stderr)
+            return 1
+        requests = workload(args.workload)
+        if args.warmup > 0:
+            run_clients(host, port, requests, args.concurrency, args.warmup, None)
+        result = run_clients(host, port, requests, args.concurrency, args.duration, args.requests)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=60)
+
+    result.update(workload=args.workload, concurrency=args.concurrency)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['workload']}: {result['requests']} requests in {result['seconds']:.2f}s "
+              f"over {result['concurrency']} connections ({result['connections']} opened)")
+        print(f"  {result['rps']:,.1f} req/s")
+        print("  latency ms: " + "  ".join(f"{k} {result['latency_ms'][k]:.2f}"
+                                         for k in ("mean", "p50", "p90", "p99", "max")))
+        if result["errors"]:
+            print(f"  errors: {result['errors']}")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
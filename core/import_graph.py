@@ -0,0 +1,417 @@
+"""
+Persistent module import graph for a repository.
+
+The index stores, per .py file, its mtime/size/content hash and the imports
+extracted from it. Updating walks the tree and only re-reads files whose
+mtime or size changed, and only re-parses those whose content hash changed,
+so refreshing an unchanged repository costs one stat() per file. Edges are
+resolved from the stored imports when the index is loaded, which makes
+reverse dependency, cycle and transitive closure queries a matter of
+milliseconds without touching any source file.
+
+Usage:
+    python core/import_graph.py <root> update
+    python core/import_graph.py <root> deps <module-or-path> [--transitive]
+    python core/import_graph.py <root> rdeps <module-or-path> [--transitive]
+    python core/import_graph.py <root> cycles
+"""
+import ast
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from analyzer import MAX_AST_SOURCE_SIZE, analyze_tokens, iter_parallel, iter_python_files
+
+# Bump whenever the stored per-file record changes so old indexes are rebuilt
+INDEX_VERSION = 1
+DEFAULT_INDEX_NAME = ".import_graph.json"
+
+
+# ============================================================
+# Import extraction
+# ============================================================
+
+def extract_imports(code: str) -> List[list]:
+    """
+    Return [module, level, names] for every import statement in source order.
+
+    module is "" for "from . import x"; names is [] for plain "import a.b".
+    Sources the AST cannot take are handed to the analyzer's tokenize scanner,
+    which only recovers absolute module names.
+    """
+    if len(code) <= MAX_AST_SOURCE_SIZE:
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError, RecursionError, MemoryError):
+            pass
+        else:
+            imports = []
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    imports.extend((node.lineno, [alias.name, 0, []]) for alias in node.names)
+                elif isinstance(node, ast.ImportFrom):
+                    imports.append((node.lineno, [node.module or "", node.level,
+                                                  [alias.name for alias in node.names if alias.name != "*"]]))
+            imports.sort(key=lambda item: item[0])
+            return [item for _, item in imports]
+    return [[name, 0, []] for name in analyze_tokens(io.StringIO(code).readline).imports]
+
+def _read_record(path: str) -> dict:
+    with open(path, "rb") as f:
+        data = f.read()
+        stat = os.fstat(f.fileno())
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": hashlib.blake2b(data, digest_size=16).hexdigest(),
+        "data": data,
+    }
+
+def _parse_record(record: dict) -> dict:
+    data = record.pop("data")
+    try:
+        import tokenize
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        record["imports"] = extract_imports(data.decode(encoding))
+    except (SyntaxError, UnicodeDecodeError, LookupError):
+        record["imports"] = []
+    return record
+
+def _scan_files(paths: list) -> List[tuple]:
+    """Worker: (path, record) for each path, parsed from scratch."""
+    results = []
+    for path in paths:
+        try:
+            results.append((path, _parse_record(_read_record(path))))
+        except OSError:
+            continue
+    return results
+
+
+# ============================================================
+# Graph
+# ============================================================
+
+def module_name(relpath: str, packages: Set[str]) -> tuple:
+    """
+    Return (source_root, dotted module name) for a repository relative path.
+
+    The module name starts at the topmost directory that is still a package
+    (has an __init__.py), which is how the file is imported when its source
+    root is on sys.path.
+    """
+    parts = relpath.split("/")
+    stem = parts[-1][:-3]
+    dirs = parts[:-1]
+    start = len(dirs)
+    while start > 0 and "/".join(dirs[:start]) in packages:
+        start -= 1
+    names = dirs[start:] + ([] if stem == "__init__" else [stem])
+    return "/".join(dirs[:start]), ".".join(names)
+
+class ImportGraph:
+    """
+    File-level import graph. Nodes are repository relative paths; imports
+    that resolve to no file in the repository are kept as external names.
+    """
+
+    def __init__(self, records: Dict[str, dict]):
+        self.records = records
+        packages = {path.rsplit("/", 1)[0] if "/" in path else ""
+                    for path in records if path.rsplit("/", 1)[-1] == "__init__.py"}
+        self.modules = {}
+        self.roots = {}
+        by_name = {}
+        for path in sorted(records):
+            root, name = module_name(path, packages)
+            self.modules[path] = name
+            self.roots[path] = root
+            by_name.setdefault(name, []).append(path)
+        self.by_name = by_name
+
+        self.edges = {path: set() for path in records}
+        self.external = {path: set() for path in records}
+        for path, record in records.items():
+            for module, level, names in record.get("imports", ()):
+                self._add_import(path, module, level, names)
+        self.reverse = {path: set() for path in records}
+        for path, targets in self.edges.items():
+            for target in targets:
+                self.reverse[target].add(path)
+
+    def _lookup(self, name: str, importer: str) -> Optional[str]:
+        """Path of module name, preferring the importer's own source root."""
+        candidates = self.by_name.get(name)
+        if not candidates:
+            return None
+        root = self.roots[importer]
+        for candidate in candidates:
+            if self.roots[candidate] == root:
+                return candidate
+        return candidates[0]
+
+    def _add_import(self, path: str, module: str, level: int, names: list) -> None:
+        if level:
+            package = self.modules[path]
+            if not path.endswith("__init__.py"):
+                package = package.rpartition(".")[0]
+            parts = package.split(".") if package else []
+            if level - 1 > len(parts):
+                return
+            base = ".".join(parts[:len(parts) - (level - 1)])
+            module = ".".join(part for part in (base, module) if part)
+            if not module and not names:
+                return
+
+        resolved = False
+        for name in names:
+            target = self._lookup(f"{module}.{name}" if module else name, path)
+            if target is not None:
+                self.edges[path].add(target)
+                resolved = True
+        if resolved:
+            return
+        # "import a.b.c" may name an attribute path: use the longest module prefix
+        candidate = module
+        while candidate:
+            target = self._lookup(candidate, path)
+            if target is not None:
+                self.edges[path].add(target)
+                return
+            candidate = candidate.rpartition(".")[0]
+        if not level:
+            self.external[path].add(module)
+
+    def resolve(self, target: str) -> List[str]:
+        """Paths matching a repository relative path or a dotted module name."""
+        target = target.replace(os.sep, "/")
+        if target in self.records:
+            return [target]
+        return list(self.by_name.get(target, ()))
+
+    def dependencies(self, paths: Iterable[str], transitive: bool = False) -> List[str]:
+        return self._walk(paths, self.edges, transitive)
+
+    def dependents(self, target: str, transitive: bool = False) -> List[str]:
+        """
+        Files importing target. An unknown target is treated as an external
+        module name, so dependents("requests") lists every file using requests.
+        """
+        paths = self.resolve(target)
+        if paths:
+            return self._walk(paths, self.reverse, transitive)
+        prefix = target + "."
+        return sorted(path for path, names in self.external.items()
+                      if any(name == target or name.startswith(prefix) for name in names))
+
+    def _walk(self, start: Iterable[str], adjacency: Dict[str, set], transitive: bool) -> List[str]:
+        seen = set()
+        frontier = list(start)
+        while frontier:
+            step = []
+            for path in frontier:
+                for neighbour in adjacency.get(path, ()):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        step.append(neighbour)
+            frontier = step if transitive else []
+        return sorted(seen)
+
+    def cycles(self) -> List[List[str]]:
+        """Strongly connected components with more than one file, or a self-import."""
+        # Iterative Tarjan: deep import chains must not hit the recursion limit
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+        for root in sorted(self.edges):
+            if root in index:
+                continue
+            work = [(root, iter(sorted(self.edges[root])))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+                if child is not None:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.edges[child]))))
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.edges[node]:
+                        components.append(sorted(component))
+        return sorted(components)
+
+
+# ============================================================
+# On-disk index
+# ============================================================
+
+class ImportGraphIndex:
+    """
+    Import records for every .py file under root, persisted as JSON.
+
+    update() refreshes the records incrementally; graph() builds the
+    ImportGraph from them (cached until the next change).
+    """
+
+    def __init__(self, root: str, index_path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path or os.path.join(self.root, DEFAULT_INDEX_NAME)
+        self.records = {}
+        self.stats = {"unchanged": 0, "touched": 0, "parsed": 0, "removed": 0}
+        self._graph = None
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION and data.get("root") == self.root:
+            self.records = data.get("files", {})
+
+    def save(self) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "root": self.root, "files": self.records},
+                      f, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _relpath(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def update(self, workers: Optional[int] = 1, chunk_size: int = 64) -> bool:
+        """
+        Bring the records in line with the tree. Files whose mtime and size
+        match are skipped without being opened; files whose content hash
+        matches only get their stat fields refreshed. Returns True if
+        anything changed.
+        """
+        stats = {"unchanged": 0, "touched": 0, "parsed": 0, "removed": 0}
+        changed = False
+        seen = set()
+        stale = []
+        for path in iter_python_files(self.root):
+            relpath = self._relpath(path)
+            seen.add(relpath)
+            record = self.records.get(relpath)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if record and record["mtime_ns"] == stat.st_mtime_ns and record["size"] == stat.st_size:
+                stats["unchanged"] += 1
+                continue
+            if record:
+                try:
+                    fresh = _read_record(path)
+                except OSError:
+                    continue
+                if fresh["hash"] == record["hash"]:
+                    record["mtime_ns"], record["size"] = fresh["mtime_ns"], fresh["size"]
+                    stats["touched"] += 1
+                    changed = True
+                    continue
+            stale.append(path)
+
+        for path, record in iter_parallel(_scan_files, stale, workers, chunk_size):
+            self.records[self._relpath(path)] = record
+            stats["parsed"] += 1
+            changed = True
+
+        for relpath in [relpath for relpath in self.records if relpath not in seen]:
+            del self.records[relpath]
+            stats["removed"] += 1
+            changed = True
+
+        self.stats = stats
+        if changed:
+            self._graph = None
+        return changed
+
+    def graph(self) -> ImportGraph:
+        if self._graph is None:
+            self._graph = ImportGraph(self.records)
+        return self._graph
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Query a persistent module import graph.")
+    parser.add_argument("root", help="repository root")
+    parser.add_argument("command", choices=["update", "deps", "rdeps", "cycles"])
+    parser.add_argument("target", nargs="?", help="module name or repository relative path")
+    parser.add_argument("-t", "--transitive", action="store_true",
+                        help="follow edges transitively (deps/rdeps)")
+    parser.add_argument("--index", help=f"index file (default: <root>/{DEFAULT_INDEX_NAME})")
+    parser.add_argument("--no-update", action="store_true",
+                        help="query the stored index without checking the tree")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes for parsing changed files (default: CPU count)")
+    args = parser.parse_args(argv)
+    if args.command in ("deps", "rdeps") and not args.target:
+        parser.error(f"{args.command} needs a target")
+
+    index = ImportGraphIndex(args.root, args.index)
+    output = {"command": args.command}
+    if not args.no_update:
+        start = time.perf_counter()
+        if index.update(args.workers) or not os.path.exists(index.index_path):
+            index.save()
+        output["update"] = dict(index.stats, elapsed_ms=round((time.perf_counter() - start) * 1000, 2))
+
+    start = time.perf_counter()
+    graph = index.graph()
+    output["graph_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    start = time.perf_counter()
+    if args.command == "update":
+        output["files"] = len(graph.records)
+        output["edges"] = sum(len(targets) for targets in graph.edges.values())
+    elif args.command == "deps":
+        paths = graph.resolve(args.target)
+        output["target"] = paths
+        output["result"] = graph.dependencies(paths, args.transitive)
+        output["external"] = sorted(set().union(*(graph.external[path] for path in paths)))
+    elif args.command == "rdeps":
+        output["target"] = graph.resolve(args.target)
+        output["result"] = graph.dependents(args.target, args.transitive)
+    else:
+        output["result"] = graph.cycles()
+    output["query_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    sys.stdout.write(json.dumps(output, indent=2))
+    sys.stdout.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
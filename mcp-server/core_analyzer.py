@@ -1,147 +1,1238 @@
+from __future__ import annotations
+
 import ast
+import io
+import json
+import os
 import re
-from typing import Dict, Any, List
+import sys
+import threading
+import time
+from collections import OrderedDict
 
-class AdvancedComplexityVisitor(ast.NodeVisitor):
-    def __init__(self):
+# Annotations are never evaluated at runtime, and importing typing is a
+# noticeable share of a serverless cold start, so it is only imported for
+# type checkers. Likewise hashlib, sqlite3, tokenize and the process pool are
+# imported where they are first needed.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
+
+# Bump whenever analyze_code output changes so cached results are invalidated
+ANALYZER_VERSION = "1.2.1"
+
+# Sources larger than this (in characters) skip ast.parse and go straight to
+# the bounded-memory tokenize scanner
+MAX_AST_SOURCE_SIZE = int(os.environ.get("ANALYZER_MAX_AST_SOURCE_SIZE", str(2 * 1024 * 1024)))
+
+DANGEROUS_CALLS = ['eval', 'exec']
+DANGEROUS_MODULES = ['subprocess', 'os', 'sys']
+
+# ============================================================
+# Result model
+# ============================================================
+# Batch jobs keep hundreds of thousands of these alive, so records are
+# slotted objects and only become dicts (the public JSON shape) in to_dict().
+
+class FunctionInfo:
+    __slots__ = ("name", "lineno", "complexity", "args")
+
+    def __init__(self, name: str, lineno: int, complexity: int, args: tuple):
+        self.name = name
+        self.lineno = lineno
+        self.complexity = complexity
+        self.args = args
+
+    def shifted(self, offset: int) -> "FunctionInfo":
+        return FunctionInfo(self.name, self.lineno + offset, self.complexity, self.args)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "lineno": self.lineno, "complexity": self.complexity,
+                "args": list(self.args)}
+
+class ClassInfo:
+    __slots__ = ("name", "lineno", "bases")
+
+    def __init__(self, name: str, lineno: int, bases: tuple):
+        self.name = name
+        self.lineno = lineno
+        self.bases = bases
+
+    def shifted(self, offset: int) -> "ClassInfo":
+        return ClassInfo(self.name, self.lineno + offset, self.bases)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "lineno": self.lineno, "bases": list(self.bases)}
+
+class Issue:
+    # The message is rendered from a shared template on serialization
+    # instead of storing one formatted string per finding.
+    __slots__ = ("severity", "type", "template", "subject", "lineno")
+
+    def __init__(self, severity: str, type: str, template: str, subject: str, lineno: int):
+        self.severity = severity
+        self.type = type
+        self.template = template
+        self.subject = subject
+        self.lineno = lineno
+
+    @property
+    def message(self) -> str:
+        return self.template.format(name=self.subject)
+
+    def shifted(self, offset: int) -> "Issue":
+        return Issue(self.severity, self.type, self.template, self.subject, self.lineno + offset)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"severity": self.severity, "type": self.type, "message": self.message,
+                "lineno": self.lineno}
+
+class AnalysisResult:
+    __slots__ = ("complexity", "loc", "issues", "functions", "classes", "imports", "error",
+                 "mode", "syntax_error")
+
+    def __init__(self, complexity: int = 1, loc: int = 0, issues: list = None, functions: list = None,
+                 classes: list = None, imports: list = None, error: Optional[str] = None,
+                 mode: str = "ast", syntax_error: Optional[str] = None):
+        self.complexity = complexity
+        self.loc = loc
+        self.issues = issues if issues is not None else []
+        self.functions = functions if functions is not None else []
+        self.classes = classes if classes is not None else []
+        self.imports = imports if imports is not None else []
+        self.error = error
+        # "ast" for a full parse, "tokenize" for the approximate fallback
+        self.mode = mode
+        self.syntax_error = syntax_error
+
+    @property
+    def maintainability_index(self) -> float:
+        # Calculate Maintainability (Simple Heuristic for now)
+        # 100 base, minus complexity * 2, len * 0.1
+        return round(max(0, 100 - (self.complexity * 1.5) - (self.loc * 0.05)), 2)
+
+    @property
+    def security_score(self) -> int:
+        return 100 - (len(self.issues) * 10)
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.error is not None:
+            return {"error": self.error}
+        result = {
+            "mode": self.mode,
+            "metrics": {
+                "complexity": self.complexity,
+                "maintainability_index": self.maintainability_index,
+                "loc": self.loc
+            },
+            "security": {
+                "issues": [issue.to_dict() for issue in self.issues],
+                "score": self.security_score
+            },
+            "structure": {
+                "functions": [function.to_dict() for function in self.functions],
+                "classes": [cls.to_dict() for cls in self.classes],
+                "imports": list(self.imports)
+            }
+        }
+        if self.syntax_error is not None:
+            result["syntax_error"] = self.syntax_error
+        return result
+
+    def to_json(self, **kwargs) -> str:
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(self.to_dict(), **kwargs)
+
+# ============================================================
+# Security rules
+# ============================================================
+# Rules are data. compile_rules() turns the table into a map from AST node
+# type to a _RuleSet, so the visitor does one dict lookup per node and name
+# based rules one set lookup per subject, however many rules there are.
+
+class SecurityRule:
+    """
+    One security check.
+
+    node_type: AST class the rule applies to (ast.Call, ast.Import, ...).
+    names:     subjects that trigger the rule, matched in O(1) against what
+               SUBJECT_EXTRACTORS pulls out of the node (callee name, imported
+               module, ...).
+    matcher:   alternatively, a callable(node) -> iterable of subjects for
+               checks that cannot be expressed as a name lookup.
+    message:   template formatted with {name} = the matched subject.
+    """
+    __slots__ = ("node_type", "names", "matcher", "severity", "type", "message")
+
+    def __init__(self, node_type: type, severity: str, type: str, message: str,
+                 names: Iterable[str] = (), matcher: Optional[Callable[[ast.AST], Iterable[str]]] = None):
+        if not names and matcher is None:
+            raise ValueError("SecurityRule needs names or a matcher")
+        self.node_type = node_type
+        self.names = frozenset(names)
+        self.matcher = matcher
+        self.severity = severity
+        self.type = type
+        self.message = message
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+def _call_subjects(node: ast.Call) -> Iterable[str]:
+    name = _dotted_name(node.func)
+    return (name,) if name else ()
+
+def _import_subjects(node: ast.Import) -> Iterable[str]:
+    return [alias.name for alias in node.names]
+
+def _import_from_subjects(node: ast.ImportFrom) -> Iterable[str]:
+    return (node.module,) if node.module else ()
+
+# How name based rules find their subjects for each node type
+SUBJECT_EXTRACTORS = {
+    ast.Call: _call_subjects,
+    ast.Import: _import_subjects,
+    ast.ImportFrom: _import_from_subjects,
+}
+
+SECURITY_RULES = [
+    SecurityRule(ast.Call, "CRITICAL", "Code Injection",
+                 "Use of '{name}' detected. This is a major security risk.",
+                 names=DANGEROUS_CALLS),
+    SecurityRule(ast.Import, "WARNING", "Dangerous Import",
+                 "Import of '{name}' detected. Ensure inputs are sanitized.",
+                 names=DANGEROUS_MODULES),
+    SecurityRule(ast.ImportFrom, "WARNING", "Dangerous Import",
+                 "Import from '{name}' detected.",
+                 names=DANGEROUS_MODULES),
+]
+
+class _RuleSet:
+    __slots__ = ("extract", "by_name", "matchers")
+
+    def __init__(self, extract):
+        self.extract = extract
+        self.by_name = {}
+        self.matchers = []
+
+def compile_rules(rules: Iterable[SecurityRule]) -> Dict[type, _RuleSet]:
+    """Build the node-type dispatch map used by AnalysisVisitor."""
+    compiled = {}
+    for rule in rules:
+        ruleset = compiled.get(rule.node_type)
+        if ruleset is None:
+            ruleset = compiled[rule.node_type] = _RuleSet(SUBJECT_EXTRACTORS.get(rule.node_type))
+        if rule.names:
+            if ruleset.extract is None:
+                raise ValueError(f"No subject extractor for {rule.node_type.__name__}; use a matcher")
+            for name in rule.names:
+                ruleset.by_name.setdefault(name, []).append(rule)
+        if rule.matcher is not None:
+            ruleset.matchers.append(rule)
+    return compiled
+
+DEFAULT_RULES = compile_rules(SECURITY_RULES)
+
+# ============================================================
+# Analysis
+# ============================================================
+
+class AnalysisVisitor(ast.NodeVisitor):
+    """Collects complexity, security findings and structure in one traversal."""
+
+    def __init__(self, rules: Optional[Dict[type, _RuleSet]] = None):
+        self.rules = DEFAULT_RULES if rules is None else rules
         self.complexity = 1  # Base complexity is 1
         self.functions = []
+        self.classes = []
+        self.imports = []
+        self.issues = []
+        # Decision points seen so far in each enclosing function body
+        self._frames = []
+
+    def visit(self, node):
+        ruleset = self.rules.get(node.__class__)
+        if ruleset is not None:
+            self._check_rules(node, ruleset)
+        return getattr(self, 'visit_' + node.__class__.__name__, self.generic_visit)(node)
+
+    def _check_rules(self, node, ruleset):
+        # Some node types (ast.arguments, ast.comprehension, ...) carry no position
+        lineno = getattr(node, "lineno", 0)
+        if ruleset.by_name:
+            for subject in ruleset.extract(node):
+                for rule in ruleset.by_name.get(subject, ()):
+                    self.issues.append(Issue(rule.severity, rule.type, rule.message, subject, lineno))
+        for rule in ruleset.matchers:
+            for subject in rule.matcher(node):
+                self.issues.append(Issue(rule.severity, rule.type, rule.message, subject, lineno))
+
+    def _branch(self, amount=1):
+        self.complexity += amount
+        if self._frames:
+            self._frames[-1] += amount
+
+    def _visit_field(self, value):
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, ast.AST):
+                    self.visit(item)
+        elif isinstance(value, ast.AST):
+            self.visit(value)
 
     def visit_FunctionDef(self, node):
-        func_visitor = AdvancedComplexityVisitor()
-        for child in node.body:
-            func_visitor.visit(child)
-        
-        self.functions.append({
-            "name": node.name,
-            "lineno": node.lineno,
-            "complexity": func_visitor.complexity,
-            "args": [arg.arg for arg in node.args.args]
-        })
-        self.generic_visit(node)
+        record = FunctionInfo(node.name, node.lineno, 1, tuple(arg.arg for arg in node.args.args))
+        self.functions.append(record)
+
+        # Walk fields in generic_visit order so findings keep their order,
+        # but only the body counts towards this function's own complexity.
+        # Nested bodies are folded into the parent frame when they close,
+        # so every node is visited exactly once.
+        for field, value in ast.iter_fields(node):
+            if field != "body":
+                self._visit_field(value)
+                continue
+            self._frames.append(0)
+            self._visit_field(value)
+            inner = self._frames.pop()
+            record.complexity += inner
+            if self._frames:
+                self._frames[-1] += inner
 
     def visit_AsyncFunctionDef(self, node):
         self.visit_FunctionDef(node)
 
     def visit_ClassDef(self, node):
+        self.classes.append(ClassInfo(
+            node.name, node.lineno, tuple(base.id for base in node.bases if isinstance(base, ast.Name))
+        ))
         self.generic_visit(node)
 
     # Complexity increasers
-    def visit_If(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_For(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_AsyncFor(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_While(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_ExceptHandler(self, node): self.complexity += 1; self.generic_visit(node)
-    def visit_Assert(self, node): self.complexity += 1; self.generic_visit(node)
-    
+    def visit_If(self, node): self._branch(); self.generic_visit(node)
+    def visit_For(self, node): self._branch(); self.generic_visit(node)
+    def visit_AsyncFor(self, node): self._branch(); self.generic_visit(node)
+    def visit_While(self, node): self._branch(); self.generic_visit(node)
+    def visit_ExceptHandler(self, node): self._branch(); self.generic_visit(node)
+    def visit_Assert(self, node): self._branch(); self.generic_visit(node)
+
     # Boolean operators (and/or) increase complexity
     def visit_BoolOp(self, node):
-        self.complexity += len(node.values) - 1
-        self.generic_visit(node)
-
-class SecurityVisitor(ast.NodeVisitor):
-    def __init__(self):
-        self.issues = []
-
-    def visit_Call(self, node):
-        if isinstance(node.func, ast.Name):
-            if node.func.id in ['eval', 'exec']:
-                self.issues.append({
-                    "severity": "CRITICAL",
-                    "type": "Code Injection",
-                    "message": f"Use of '{node.func.id}' detected. This is a major security risk.",
-                    "lineno": node.lineno
-                })
+        self._branch(len(node.values) - 1)
         self.generic_visit(node)
 
+    # Security findings come from the rule table in visit()
     def visit_Import(self, node):
         for name in node.names:
-            if name.name in ['subprocess', 'os', 'sys']:
-                self.issues.append({
-                    "severity": "WARNING",
-                    "type": "Dangerous Import",
-                    "message": f"Import of '{name.name}' detected. Ensure inputs are sanitized.",
-                    "lineno": node.lineno
-                })
+            self.imports.append(name.name)
         self.generic_visit(node)
-    
+
     def visit_ImportFrom(self, node):
-        if node.module in ['subprocess', 'os', 'sys']:
-             self.issues.append({
-                    "severity": "WARNING",
-                    "type": "Dangerous Import",
-                    "message": f"Import from '{node.module}' detected.",
-                    "lineno": node.lineno
-                })
+        if node.module:
+            self.imports.append(node.module)
         self.generic_visit(node)
 
-class StructureVisitor(ast.NodeVisitor):
+class _CountingVisitor(AnalysisVisitor):
+    """AnalysisVisitor that also counts visited nodes; only used when timing."""
+
+    def __init__(self, rules=None):
+        super().__init__(rules)
+        self.nodes = 0
+
+    def visit(self, node):
+        self.nodes += 1
+        return super().visit(node)
+
+def analyze(code: str, max_ast_size: Optional[int] = None,
+            rules: Optional[Dict[type, _RuleSet]] = None,
+            timings: Optional[Timings] = None) -> AnalysisResult:
+    """
+    Analyze Python source and return the compact result model.
+
+    Sources above max_ast_size characters (default MAX_AST_SOURCE_SIZE), or
+    that fail to parse, are analyzed by the tokenize scanner instead; the
+    result's mode says which one produced it. rules is a compile_rules() map
+    (default: SECURITY_RULES). Pass a Timings to record per-phase durations
+    and the node count; without one nothing is measured.
+    """
+    limit = MAX_AST_SOURCE_SIZE if max_ast_size is None else max_ast_size
+    if len(code) > limit:
+        return _analyze_fallback(code, None, rules, timings)
+    try:
+        if timings is None:
+            tree = ast.parse(code)
+
+            # Complexity, security and structure are gathered in a single pass
+            visitor = AnalysisVisitor(rules)
+            visitor.visit(tree)
+        else:
+            start = time.perf_counter()
+            tree = ast.parse(code)
+            parsed = time.perf_counter()
+            visitor = _CountingVisitor(rules)
+            visitor.visit(tree)
+            timings.record("parse", parsed - start)
+            timings.record("visit", time.perf_counter() - parsed, nodes=visitor.nodes)
+
+        return AnalysisResult(visitor.complexity, len(code.splitlines()), visitor.issues,
+                              visitor.functions, visitor.classes, visitor.imports)
+    except SyntaxError as e:
+        return _analyze_fallback(code, f"Syntax error at line {e.lineno}: {e.msg}", rules, timings)
+    except (RecursionError, MemoryError) as e:
+        return _analyze_fallback(code, f"AST analysis failed: {type(e).__name__}", rules, timings)
+    except Exception as e:
+        return AnalysisResult(error=str(e))
+
+def _analyze_fallback(code, syntax_error, rules, timings):
+    if timings is None:
+        return analyze_tokens(io.StringIO(code).readline, syntax_error=syntax_error, rules=rules)
+    start = time.perf_counter()
+    result = analyze_tokens(io.StringIO(code).readline, syntax_error=syntax_error, rules=rules)
+    timings.record("tokenize", time.perf_counter() - start)
+    return result
+
+def analyze_code(code: str) -> Dict[str, Any]:
+    return analyze(code).to_dict()
+
+
+# ============================================================
+# Tokenize fallback
+# ============================================================
+
+# Statement keywords the AST visitor counts as decision points
+_DECISION_STATEMENTS = frozenset(['if', 'elif', 'for', 'while', 'except', 'assert'])
+_OPEN_BRACKETS = frozenset('([{')
+_CLOSE_BRACKETS = frozenset(')]}')
+
+class _TokenFrame:
+    __slots__ = ("record", "indent", "decisions", "inline")
+
+    def __init__(self, record, indent):
+        self.record = record
+        self.indent = indent      # indentation level of the def statement
+        self.decisions = 0
+        self.inline = False       # body is on the same line as the header
+
+class TokenAnalyzer:
+    """
+    Approximate analysis from the token stream alone.
+
+    Never builds an AST and only holds the current line plus the output
+    records, so it works on multi-megabyte or syntactically broken sources.
+    Decision points are counted on statement keywords and and/or, which
+    matches the AST visitor for well-formed code except for and/or inside
+    f-string replacement fields (one STRING token before Python 3.12);
+    function args, class bases and imports are recovered from header tokens.
+    """
+
+    def __init__(self, rules: Optional[Dict[type, _RuleSet]] = None):
+        rules = DEFAULT_RULES if rules is None else rules
+        # Only name based rules can be evaluated without an AST
+        self._call_rules = _rules_by_name(rules, ast.Call)
+        self._import_rules = _rules_by_name(rules, ast.Import)
+        self._from_rules = _rules_by_name(rules, ast.ImportFrom)
+        self.result = AnalysisResult(mode="tokenize")
+        self.lines = 0
+        self._frames = []
+        self._indent = 0
+        self._depth = 0
+        self._statement_start = True
+        self._prev = ""
+        self._header = None        # "def", "class", "import" or "from" while parsing one
+        self._header_depth = 0
+        self._header_record = None
+        self._import_line = 0
+        self._kwonly = False
+        self._params_closed = False  # past the ')' ending a def's parameter list
+        self._in_lambda = False      # inside a lambda in a def's default value
+        self._candidate = None     # class base name awaiting ',' or ')'
+        self._dotted = []          # name being assembled in an import statement
+        self._import_as = False
+        self._chain = None         # dotted name that may be called next
+
+    def readline(self, readline):
+        def counting_readline():
+            line = readline()
+            if line:
+                self.lines += 1
+            return line
+        return counting_readline
+
+    def run(self, readline) -> AnalysisResult:
+        import tokenize
+        handlers = {
+            tokenize.NAME: self._name,
+            tokenize.OP: self._op,
+            tokenize.NEWLINE: self._newline,
+            tokenize.INDENT: self._indent_token,
+            tokenize.DEDENT: self._dedent,
+        }
+        ignored = (tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER)
+        try:
+            for token in tokenize.generate_tokens(self.readline(readline)):
+                handler = handlers.get(token.type)
+                if handler is not None:
+                    handler(token)
+                elif token.type not in ignored:
+                    self._other(token)
+        except (tokenize.TokenError, SyntaxError) as e:
+            if self.result.syntax_error is None:
+                self.result.syntax_error = f"Tokenize stopped early: {e.args[0] if e.args else e}"
+        self._newline(None)
+        while self._frames:
+            self._close_frame()
+        self.result.loc = self.lines
+        return self.result
+
+    # -- helpers --------------------------------------------------------
+
+    def _branch(self, amount=1):
+        self.result.complexity += amount
+        if self._frames:
+            self._frames[-1].decisions += amount
+
+    def _close_frame(self):
+        frame = self._frames.pop()
+        frame.record.complexity += frame.decisions
+        if self._frames:
+            self._frames[-1].decisions += frame.decisions
+
+    def _report(self, by_name, subject, lineno):
+        for rule in by_name.get(subject, ()):
+            self.result.issues.append(Issue(rule.severity, rule.type, rule.message, subject, lineno))
+
+    def _finish_import_name(self):
+        if self._dotted:
+            name = ".".join(self._dotted)
+            self._report(self._import_rules, name, self._import_line)
+            self.result.imports.append(name)
+        self._dotted = []
+        self._import_as = False
+
+    def _finish_from_module(self):
+        module = ".".join(self._dotted) or None
+        if module:
+            self._report(self._from_rules, module, self._import_line)
+            self.result.imports.append(module)
+        self._dotted = []
+        self._header = "from-names"
+
+    def _significant(self, token):
+        """Bookkeeping shared by every significant token."""
+        if self._frames and self._frames[-1].inline is None:
+            self._frames[-1].inline = True
+        self._statement_start = False
+
+    # -- token handlers -------------------------------------------------
+
+    def _name(self, token):
+        text = token.string
+        start = self._statement_start
+        header = self._header
+        self._significant(token)
+
+        if header == "def":
+            if self._header_record is None:
+                self._header_record = FunctionInfo(text, token.start[0], 1, ())
+                self.result.functions.append(self._header_record)
+            elif self._depth != self._header_depth + 1 or self._params_closed:
+                pass
+            elif text == "lambda":
+                self._in_lambda = True
+            elif not self._kwonly and not self._in_lambda and self._prev in ("(", ","):
+                self._header_record.args += (text,)
+        elif header == "class":
+            if self._header_record is None:
+                self._header_record = ClassInfo(text, token.start[0], ())
+                self.result.classes.append(self._header_record)
+            elif (self._depth == self._header_depth + 1 and self._prev in ("(", ",")
+                  and text not in ("None", "True", "False")):
+                # Constants are not ast.Name bases
+                self._candidate = text
+        elif header == "import":
+            if self._import_as:
+                pass
+            elif text == "as":
+                self._import_as = True
+            else:
+                self._dotted.append(text)
+        elif header == "from":
+            if text == "import":
+                self._finish_from_module()
+            else:
+                self._dotted.append(text)
+
+        if start and text == "async":
+            self._statement_start = True
+        elif start and text in _DECISION_STATEMENTS:
+            self._branch()
+        elif start and text in ("def", "class"):
+            self._header = text
+            self._header_depth = self._depth
+            self._header_record = None
+            self._kwonly = False
+            self._params_closed = False
+            self._in_lambda = False
+        elif start and text in ("import", "from"):
+            self._header = text
+            self._import_line = token.start[0]
+            self._dotted = []
+            self._import_as = False
+        elif text in ("and", "or"):
+            self._branch()
+        if self._prev == ".":
+            # Attribute of something that is not a plain dotted name
+            if self._chain is not None:
+                self._chain.append(text)
+        elif self._prev in ("def", "class"):
+            self._chain = None
+        else:
+            self._chain = [text]
+        self._prev = text
+
+    def _op(self, token):
+        text = token.string
+        self._significant(token)
+        header = self._header
+
+        if self._candidate is not None:
+            if text in (",", ")"):
+                self._header_record.bases += (self._candidate,)
+            self._candidate = None
+        if text == "(" and self._chain:
+            self._report(self._call_rules, ".".join(self._chain), token.start[0])
+        if text != ".":
+            self._chain = None
+
+        if text in _OPEN_BRACKETS:
+            self._depth += 1
+        elif text in _CLOSE_BRACKETS:
+            self._depth = max(0, self._depth - 1)
+            if header == "def" and self._depth == self._header_depth:
+                # The return annotation follows; its names are not args
+                self._params_closed = True
+        elif text == ";":
+            self._newline(None)
+        elif header == "def" and self._depth == self._header_depth + 1 and self._in_lambda:
+            # The lambda's own parameters end at its ':'
+            self._in_lambda = text != ":"
+        elif header == "def" and self._depth == self._header_depth + 1 and self._prev in ("(", ","):
+            # Only a parameter may start after '(' or ','; elsewhere these
+            # are operators in a default value
+            if text in ("*", "**"):
+                self._kwonly = True
+            elif text == "/" and self._header_record is not None:
+                # Everything before '/' is positional-only, not args.args
+                self._header_record.args = ()
+        elif header == "import" and text == ",":
+            self._finish_import_name()
+
+        if text == ":" and header in ("def", "class") and self._depth == self._header_depth:
+            if header == "def" and self._header_record is not None:
+                frame = _TokenFrame(self._header_record, self._indent)
+                frame.inline = None  # decided by the next token
+                self._frames.append(frame)
+            self._header = None
+            self._header_record = None
+        if text == ":" and self._depth == 0:
+            # A simple statement may follow a compound header on the same line
+            self._statement_start = True
+        self._prev = text
+
+    def _other(self, token):
+        self._significant(token)
+        self._candidate = None
+        self._chain = None
+        self._prev = token.string
+
+    def _newline(self, token):
+        if self._header == "import":
+            self._finish_import_name()
+        elif self._header == "from":
+            self._finish_from_module()
+        self._header = None
+        self._header_record = None
+        self._chain = None
+        self._candidate = None
+        self._statement_start = True
+        self._prev = ""
+        # One-line function bodies end with their logical line
+        while self._frames and self._frames[-1].inline:
+            self._close_frame()
+        if self._frames and self._frames[-1].inline is None:
+            self._frames[-1].inline = False
+
+    def _indent_token(self, token):
+        self._indent += 1
+
+    def _dedent(self, token):
+        self._indent -= 1
+        while self._frames and self._frames[-1].indent >= self._indent:
+            self._close_frame()
+
+def _rules_by_name(rules: Dict[type, _RuleSet], node_type: type) -> Dict[str, list]:
+    ruleset = rules.get(node_type)
+    return ruleset.by_name if ruleset is not None else {}
+
+def analyze_tokens(readline: Callable[[], str], syntax_error: Optional[str] = None,
+                   rules: Optional[Dict[type, _RuleSet]] = None) -> AnalysisResult:
+    """Run the tokenize scanner over a readline callable (file.readline, StringIO.readline)."""
+    analyzer = TokenAnalyzer(rules)
+    analyzer.result.syntax_error = syntax_error
+    return analyzer.run(readline)
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache of analyze_code results.
+
+    Keys are a SHA-256 of the analyzer version plus the source, so a hit
+    skips ast.parse entirely. Recent results live in a bounded in-memory
+    LRU; when db_path is given they are also written to SQLite and survive
+    restarts. Cached results are shared between callers and must not be
+    mutated.
+    """
+
+    def __init__(self, max_entries: int = 1024, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            import sqlite3
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis (key TEXT PRIMARY KEY, result TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key_for(code: str) -> str:
+        import hashlib
+        digest = hashlib.sha256(ANALYZER_VERSION.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(code.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return result
+            if self._db is not None:
+                row = self._db.execute("SELECT result FROM analysis WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    self.stats["disk_hits"] += 1
+                    return result
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis (key, result) VALUES (?, ?)",
+                    (key, json.dumps(result, separators=(",", ":"))),
+                )
+                self._db.commit()
+
+    def analyze(self, code: str, analyzer: Callable[[str], Dict[str, Any]] = None) -> Dict[str, Any]:
+        key = self.key_for(code)
+        result = self.get(key)
+        if result is None:
+            result = (analyzer or analyze_code)(code)
+            self.put(key, result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM analysis")
+                self._db.commit()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), max_entries=self.max_entries,
+                        persistent=self._db is not None)
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def default_cache() -> AnalysisCache:
+    """Process-wide cache configured by ANALYZER_CACHE_SIZE / ANALYZER_CACHE_DB."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = AnalysisCache(
+                    max_entries=int(os.environ.get("ANALYZER_CACHE_SIZE", "1024")),
+                    db_path=os.environ.get("ANALYZER_CACHE_DB") or None,
+                )
+    return _default_cache
+
+def analyze_code_cached(code: str, timings: Optional[Timings] = None) -> Dict[str, Any]:
+    """analyze_code through default_cache(); a Timings also records the cache lookup."""
+    cache = default_cache()
+    if timings is None:
+        return cache.analyze(code)
+    start = time.perf_counter()
+    key = cache.key_for(code)
+    result = cache.get(key)
+    timings.record("cache", time.perf_counter() - start, cache_hits=int(result is not None))
+    if result is None:
+        model = analyze(code, timings=timings)
+        start = time.perf_counter()
+        result = model.to_dict()
+        timings.record("to_dict", time.perf_counter() - start)
+        cache.put(key, result)
+    return result
+
+
+# ============================================================
+# Timing instrumentation
+# ============================================================
+
+class Timings:
+    """
+    Per-call phase durations (seconds) and counters, in recording order.
+
+    Callers create one only when instrumentation is wanted; every
+    instrumented code path checks for None first, so the disabled cost is
+    a single comparison per phase.
+    """
+    __slots__ = ("phases", "counts")
+
     def __init__(self):
-        self.stats = {
-            "classes": [],
-            "imports": [],
+        self.phases = {}
+        self.counts = {}
+
+    def record(self, phase: str, seconds: float, **counts: int) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        for name, value in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def timer(self, phase: str) -> "_PhaseTimer":
+        """Context manager recording the duration of its block under phase."""
+        return _PhaseTimer(self, phase)
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in self.phases.items()},
+            "total_ms": round(self.total * 1000, 3),
+            **self.counts,
         }
 
-    def visit_ClassDef(self, node):
-        self.stats["classes"].append({
-            "name": node.name,
-            "lineno": node.lineno,
-            "bases": [base.id for base in node.bases if isinstance(base, ast.Name)]
-        })
-        self.generic_visit(node)
+    def server_timing(self) -> str:
+        """Value for an HTTP Server-Timing header."""
+        return ", ".join(f"{phase};dur={seconds * 1000:.3f}" for phase, seconds in self.phases.items())
 
-    def visit_Import(self, node):
-        for alias in node.names:
-            self.stats["imports"].append(alias.name)
-        self.generic_visit(node)
+class _PhaseTimer:
+    __slots__ = ("timings", "phase", "start")
 
-    def visit_ImportFrom(self, node):
-        if node.module:
-            self.stats["imports"].append(node.module)
-        self.generic_visit(node)
+    def __init__(self, timings, phase):
+        self.timings = timings
+        self.phase = phase
 
-def analyze_code(code: str) -> Dict[str, Any]:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.record(self.phase, time.perf_counter() - self.start)
+        return False
+
+# Upper bounds in seconds, Prometheus client defaults plus finer sub-millisecond buckets
+TIMING_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                  0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class PhaseHistograms:
+    """
+    In-process aggregation of Timings: one latency histogram per phase and
+    a running total per counter, dumpable in Prometheus text format.
+    """
+
+    def __init__(self, buckets: Iterable[float] = TIMING_BUCKETS, prefix: str = "analyzer"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._phases = {}   # phase -> [per-bucket counts..., +Inf count], sum
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def observe(self, timings: Timings) -> None:
+        import bisect
+        with self._lock:
+            for phase, seconds in timings.phases.items():
+                entry = self._phases.get(phase)
+                if entry is None:
+                    entry = self._phases[phase] = [[0] * (len(self.buckets) + 1), 0.0]
+                entry[0][bisect.bisect_left(self.buckets, seconds)] += 1
+                entry[1] += seconds
+            for name, value in timings.counts.items():
+                self._counts[name] = self._counts.get(name, 0) + value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._phases.clear()
+            self._counts.clear()
+
+    def to_prometheus(self) -> str:
+        name = f"{self.prefix}_phase_seconds"
+        lines = [f"# HELP {name} Time spent in each analysis phase.",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            for phase in sorted(self._phases):
+                counts, total = self._phases[phase]
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{phase="{phase}",le="{bound:g}"}} {cumulative}')
+                cumulative += counts[-1]
+                lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {cumulative}')
+                lines.append(f'{name}_sum{{phase="{phase}"}} {total:.9g}')
+                lines.append(f'{name}_count{{phase="{phase}"}} {cumulative}')
+            for counter in sorted(self._counts):
+                metric = f"{self.prefix}_{counter}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {self._counts[counter]}")
+        return "\n".join(lines) + "\n"
+
+_default_histograms = PhaseHistograms()
+
+def default_histograms() -> PhaseHistograms:
+    return _default_histograms
+
+# ============================================================
+# Incremental analysis
+# ============================================================
+
+# Everything that can hide a line break from the statement splitter: comments,
+# strings, backslash continuations and brackets. Line breaks at bracket depth
+# 0 end a logical line.
+_SCAN_RE = re.compile(r'''
+      \#[^\r\n]*
+    | """(?:\\.|[^\\])*?"""
+    | \'\'\'(?:\\.|[^\\])*?\'\'\'
+    | "(?:\\.|[^\\"\r\n])*"
+    | \'(?:\\.|[^\\\'\r\n])*\'
+    | \\(?:\r\n|\n)
+    | (?P<open>[(\[{])
+    | (?P<close>[)\]}])
+    | (?P<newline>\r?\n)
+''', re.VERBOSE | re.DOTALL)
+# Column-0 keywords that continue the previous compound statement
+_CONTINUATION_RE = re.compile(r'(?:else|elif|except|finally)\b')
+# Separators str.splitlines() honours but the Python tokenizer does not
+_EXOTIC_LINE_BREAKS = ('\x0b', '\x0c', '\x1c', '\x1d', '\x1e', '\x85', '\u2028', '\u2029')
+
+def split_top_level(code: str) -> Optional[List[tuple]]:
+    """
+    Split source into (first_line_index, text) segments, one per top-level
+    statement (decorators included). Leading comments and blank lines stay
+    with the previous statement. A wrong split can only come from malformed
+    source and leaves a segment that fails to parse, so callers fall back to
+    a full parse then. Returns None for line endings the splitter does not
+    number the same way as the tokenizer.
+    """
+    if '\r' in code and code.count('\r') != code.count('\r\n'):
+        return None
+    if any(sep in code for sep in _EXOTIC_LINE_BREAKS):
+        return None
+
+    segments = []
+    start_offset = start_line = 0
+    line = 0
+    counted_to = 0
+    depth = 0
+    decorated = code[:1] == '@'
+    for match in _SCAN_RE.finditer(code):
+        kind = match.lastgroup
+        if kind == 'open':
+            depth += 1
+        elif kind == 'close':
+            depth = max(0, depth - 1)
+        elif kind == 'newline' and depth == 0:
+            offset = match.end()
+            head = code[offset:offset + 1]
+            if not head or head in ' \t\r\n#' or _CONTINUATION_RE.match(code, offset):
+                continue
+            if not decorated:
+                line += code.count('\n', counted_to, offset)
+                counted_to = offset
+                segments.append((start_line, code[start_offset:offset]))
+                start_offset, start_line = offset, line
+            decorated = head == '@'
+    segments.append((start_line, code[start_offset:]))
+    return segments
+
+def analyze_segment(text: str) -> Optional[tuple]:
+    """
+    (decisions, issues, functions, classes, imports) of one segment from
+    split_top_level, with line numbers relative to the segment; None if it
+    does not parse on its own.
+    """
     try:
-        tree = ast.parse(code)
-        
-        # 1. Complexity Analysis
-        complexity_visitor = AdvancedComplexityVisitor()
-        complexity_visitor.visit(tree)
-        
-        # 2. Security Analysis
-        security_visitor = SecurityVisitor()
-        security_visitor.visit(tree)
-        
-        # 3. Structure Analysis
-        structure_visitor = StructureVisitor()
-        structure_visitor.visit(tree)
-        
-        # 4. Global Stats
-        total_complexity = complexity_visitor.complexity
-        functions = complexity_visitor.functions
-        
-        # Calculate Maintainability (Simple Heuristic for now)
-        # 100 base, minus complexity * 2, len * 0.1
-        lines = len(code.splitlines())
-        maintainability = max(0, 100 - (total_complexity * 1.5) - (lines * 0.05))
+        visitor = AnalysisVisitor()
+        visitor.visit(ast.parse(text))
+    except Exception:
+        return None
+    return (visitor.complexity - 1, visitor.issues, visitor.functions,
+            visitor.classes, visitor.imports)
+
+def _segment_key(text: str) -> bytes:
+    import hashlib
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+class IncrementalAnalyzer:
+    """
+    Re-analyzes only the top-level statements whose source changed.
+
+    Per-segment results are remembered under a hash of the segment text with
+    line numbers relative to the segment, so unchanged definitions are reused
+    even when edits above them shift their position. The merged output is
+    identical to analyze_code(code); anything the segment splitter cannot
+    handle falls back to a full run.
+
+    The segments can be analyzed elsewhere, e.g. in a worker process: pass
+    the texts from missing_segments() through analyze_segment() and hand
+    the results to analyze_result() as `analyzed`. Only this instance has to
+    see every version of a file.
+    """
+
+    def __init__(self, max_segments: int = 4096):
+        self.max_segments = max_segments
+        self.stats = {"segments_reused": 0, "segments_analyzed": 0, "fallbacks": 0}
+        self._segments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, code: str, analyzed: Optional[Dict[str, Optional[tuple]]] = None) -> Dict[str, Any]:
+        return self.analyze_result(code, analyzed).to_dict()
+
+    def missing_segments(self, code: str) -> Optional[List[str]]:
+        """
+        The segment texts of code that analyze_result() would analyze, or
+        None when code takes the full-run path instead.
+        """
+        segments = split_top_level(code) if len(code) <= MAX_AST_SOURCE_SIZE else None
+        if segments is None:
+            return None
+        with self._lock:
+            return list(dict.fromkeys(text for _, text in segments
+                                      if _segment_key(text) not in self._segments))
+
+    def analyze_result(self, code: str, analyzed: Optional[Dict[str, Optional[tuple]]] = None) -> AnalysisResult:
+        """analyzed maps segment texts to analyze_segment() results computed by the caller."""
+        # Oversized sources go to the tokenize scanner, exactly as in analyze()
+        segments = split_top_level(code) if len(code) <= MAX_AST_SOURCE_SIZE else None
+        if segments is None:
+            self.stats["fallbacks"] += 1
+            return analyze(code)
+
+        complexity = 1
+        issues, functions, classes, imports = [], [], [], []
+        for start, text in segments:
+            partial = self._analyze_segment(text, analyzed)
+            if partial is None:
+                self.stats["fallbacks"] += 1
+                return analyze(code)
+            decisions, seg_issues, seg_functions, seg_classes, seg_imports = partial
+            complexity += decisions
+            # Records are immutable once cached; shifting copies them
+            issues.extend(issue.shifted(start) for issue in seg_issues)
+            functions.extend(function.shifted(start) for function in seg_functions)
+            classes.extend(cls.shifted(start) for cls in seg_classes)
+            imports.extend(seg_imports)
+        return AnalysisResult(complexity, len(code.splitlines()), issues, functions, classes, imports)
+
+    def _analyze_segment(self, text: str, analyzed: Optional[Dict[str, Optional[tuple]]]) -> Optional[tuple]:
+        key = _segment_key(text)
+        with self._lock:
+            partial = self._segments.get(key)
+            if partial is not None:
+                self._segments.move_to_end(key)
+                self.stats["segments_reused"] += 1
+                return partial
+        partial = analyzed[text] if analyzed and text in analyzed else analyze_segment(text)
+        if partial is None:
+            return None
+        with self._lock:
+            self.stats["segments_analyzed"] += 1
+            self._segments[key] = partial
+            while len(self._segments) > self.max_segments:
+                self._segments.popitem(last=False)
+        return partial
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, segments=len(self._segments), max_segments=self.max_segments)
+
+
+# ============================================================
+# Repository-wide analysis
+# ============================================================
 
+SKIP_DIRS = {'.git', '.hg', '.svn', '__pycache__', 'node_modules', '.venv', 'venv',
+             '.tox', '.nox', '.mypy_cache', '.pytest_cache', 'build', 'dist'}
+
+def iter_python_files(root: str) -> Iterator[str]:
+    """Yield .py files under root lazily, skipping VCS, cache and virtualenv dirs."""
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith('.py'):
+                yield os.path.join(dirpath, filename)
+
+def analyze_file(path: str) -> tuple:
+    """Return (path, AnalysisResult); unreadable files become error results."""
+    import tokenize
+    try:
+        # tokenize.open honours PEP 263 encoding cookies
+        with tokenize.open(path) as f:
+            if os.fstat(f.fileno()).st_size > MAX_AST_SOURCE_SIZE:
+                # Stream oversized files line by line instead of reading them whole
+                return path, analyze_tokens(f.readline)
+            code = f.read()
+    except (OSError, SyntaxError, UnicodeDecodeError) as e:
+        return path, AnalysisResult(error=f"Cannot read file: {e}")
+    return path, analyze(code)
+
+def analyze_files(paths: List[str]) -> List[tuple]:
+    return [analyze_file(path) for path in paths]
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def iter_parallel(func: Callable[[list], list], items: Iterable, workers: Optional[int] = None,
+                  chunk_size: int = 16) -> Iterator[Any]:
+    """
+    Run func over chunks of items on a process pool and yield results as
+    chunks complete (not in input order). At most two chunks per worker are
+    in flight, so memory stays flat no matter how many items there are.
+    workers=1 runs inline without spawning processes.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunked(items, max(1, chunk_size))
+    if workers == 1:
+        for chunk in chunks:
+            yield from func(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(func, chunk))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+def iter_repository(root: str, workers: Optional[int] = None, chunk_size: int = 16) -> Iterator[tuple]:
+    yield from iter_parallel(analyze_files, iter_python_files(root), workers, chunk_size)
+
+class RepositorySummary:
+    """Running totals over per-file results; holds no per-file data."""
+
+    def __init__(self):
+        self.files = 0
+        self.errors = 0
+        self.loc = 0
+        self.complexity = 0
+        self.functions = 0
+        self.classes = 0
+        self.issues = 0
+        self.max_complexity = None
+
+    def add(self, path: str, result: AnalysisResult) -> None:
+        self.files += 1
+        if result.error is not None:
+            self.errors += 1
+            return
+        self.loc += result.loc
+        self.complexity += result.complexity
+        self.functions += len(result.functions)
+        self.classes += len(result.classes)
+        self.issues += len(result.issues)
+        if self.max_complexity is None or result.complexity > self.max_complexity["complexity"]:
+            self.max_complexity = {"path": path, "complexity": result.complexity}
+
+    def to_dict(self) -> Dict[str, Any]:
+        analyzed = self.files - self.errors
         return {
-            "metrics": {
-                "complexity": total_complexity,
-                "maintainability_index": round(maintainability, 2),
-                "loc": lines
-            },
-            "security": {
-                "issues": security_visitor.issues,
-                "score": 100 - (len(security_visitor.issues) * 10)
-            },
-            "structure": {
-                "functions": functions,
-                "classes": structure_visitor.stats["classes"],
-                "imports": structure_visitor.stats["imports"]
-            }
+            "files": self.files,
+            "errors": self.errors,
+            "loc": self.loc,
+            "complexity": self.complexity,
+            "avg_complexity": round(self.complexity / analyzed, 2) if analyzed else 0,
+            "functions": self.functions,
+            "classes": self.classes,
+            "issues": self.issues,
+            "max_complexity": self.max_complexity,
         }
-    except SyntaxError as e:
-        return {"error": f"Syntax error at line {e.lineno}: {e.msg}"}
-    except Exception as e:
-        return {"error": str(e)}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Analyze every Python file under a directory and stream JSON lines."
+    )
+    parser.add_argument("root", help="directory (or single file) to analyze")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: CPU count, 1 = no pool)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=16,
+                        help="files handed to a worker per task (default: 16)")
+    args = parser.parse_args(argv)
+
+    summary = RepositorySummary()
+    out = sys.stdout
+    for path, result in iter_repository(args.root, args.workers, args.chunk_size):
+        summary.add(path, result)
+        out.write(json.dumps({"type": "file", "path": path, "analysis": result.to_dict()},
+                             separators=(",", ":")))
+        out.write("\n")
+        out.flush()
+    out.write(json.dumps({"type": "summary", **summary.to_dict()}, separators=(",", ":")))
+    out.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Process pool for CPU-bound MCP tool bodies.
+
+The server's event loop only awaits: a 2 MB file analyzed in a worker
+process does not hold up other tool calls. Each call has a timeout, and a
+call that times out or is cancelled by the client is withdrawn from the
+queue, or, if a worker is already running it, the pool's processes are
+killed and replaced (a running task cannot be interrupted any other way).
+Calls that were running on the replaced pool are resubmitted once.
+
+Configuration (environment):
+    MCP_POOL_WORKERS    worker processes (default: CPU count)
+    MCP_TOOL_TIMEOUT    seconds per call (default: 60, 0 = none)
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+POOL_WORKERS = int(os.environ.get("MCP_POOL_WORKERS", "0")) or os.cpu_count() or 1
+TOOL_TIMEOUT = float(os.environ.get("MCP_TOOL_TIMEOUT", "60"))
+# Recent calls whose latencies are kept for percentiles
+LATENCY_WINDOW = 1024
+
+# Imported by each worker in warm(), before its first call (tasks pulls in
+# the analyzer and the text utilities)
+PRELOAD_MODULES = ("tasks",)
+
+class ToolTimeout(Exception):
+    pass
+
+def _timed(func: Callable, args: tuple) -> tuple:
+    """Worker side: (result, perf_counter at start, seconds spent)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, start, time.perf_counter() - start
+
+def _preload(modules: tuple) -> None:
+    import importlib
+    for module in modules:
+        importlib.import_module(module)
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+class ToolPool:
+    """
+    A ProcessPoolExecutor with per-call timeouts, cancellation and metrics.
+    Processes are started on the first call, or ahead of time by warm().
+    """
+
+    def __init__(self, workers: int = POOL_WORKERS, timeout: float = TOOL_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout or None
+        self.stats = {"calls": 0, "completed": 0, "errors": 0, "timeouts": 0, "cancelled": 0,
+                      "retried": 0, "recycles": 0}
+        self.in_flight = 0
+        # (total, queued, running) seconds per completed call
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._pool = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _executor(self) -> tuple:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._generation += 1
+            return self._pool, self._generation
+
+    def _recycle(self, generation: int) -> None:
+        """Kill the pool's processes, unless another call already replaced it."""
+        with self._lock:
+            if self._pool is None or generation != self._generation:
+                return
+            pool, self._pool = self._pool, None
+            self.stats["recycles"] += 1
+        terminate = getattr(pool, "terminate_workers", None)
+        if terminate is not None:
+            terminate()
+        else:
+            for process in list((pool._processes or {}).values()):
+                process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def warm(self, wait: bool = True) -> None:
+        """
+        Start every worker process now and have each import the tool
+        modules. With wait=False this returns once the workers are forked;
+        the server process itself imports nothing.
+        """
+        pool, _ = self._executor()
+        futures = [pool.submit(_preload, PRELOAD_MODULES) for _ in range(self.workers)]
+        if wait:
+            for future in futures:
+                future.result()
+
+    async def run(self, func: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        func(*args) in a worker process. Raises ToolTimeout after timeout
+        seconds (default: the pool's); cancelling the awaiting task cancels
+        the call.
+        """
+        timeout = self.timeout if timeout is None else timeout or None
+        self.stats["calls"] += 1
+        self.in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            for attempt in (0, 1):
+                pool, generation = self._executor()
+                future = pool.submit(_timed, func, args)
+                try:
+                    result, started, seconds = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+                except BrokenProcessPool:
+                    if attempt == 0 and generation != self._generation:
+                        # Killed to stop another call's task; this one was innocent
+                        self.stats["retried"] += 1
+                        continue
+                    self._recycle(generation)
+                    self.stats["errors"] += 1
+                    raise
+                except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+                    # A queued call is simply withdrawn; a running one takes its worker down
+                    if not future.cancel() and not future.done():
+                        self._recycle(generation)
+                    if isinstance(exc, asyncio.TimeoutError):
+                        self.stats["timeouts"] += 1
+                        raise ToolTimeout(f"Tool call timed out after {timeout:g}s") from None
+                    self.stats["cancelled"] += 1
+                    raise
+                except Exception:
+                    self.stats["errors"] += 1
+                    raise
+                break
+        finally:
+            self.in_flight -= 1
+        # perf_counter is system-wide on Linux, so worker and server readings compare
+        self._latencies.append((time.perf_counter() - submitted, max(0.0, started - submitted), seconds))
+        self.stats["completed"] += 1
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = list(self._latencies)
+        latency_ms = {}
+        for index, name in enumerate(("total", "queue", "run")):
+            values = [sample[index] for sample in samples]
+            latency_ms[name] = {
+                "p50": round(_percentile(values, 50) * 1000, 3),
+                "p99": round(_percentile(values, 99) * 1000, 3),
+                "max": round(max(values, default=0.0) * 1000, 3),
+            }
+        return dict(
+            self.stats,
+            workers=self.workers,
+            started=self._pool is not None,
+            in_flight=self.in_flight,
+            queued=max(0, self.in_flight - self.workers),
+            latency_ms=latency_ms,
+        )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+_default_pool = None
+
+def default_pool() -> ToolPool:
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = ToolPool()
+    return _default_pool
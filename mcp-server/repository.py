@@ -0,0 +1,131 @@
+"""
+Whole-repository analysis for the analyze_repository tool.
+
+Files are listed on a thread, analyzed in chunks on the tool pool (a few
+chunks per worker in flight), and folded into a RepositoryReport as each
+chunk returns, so the server holds aggregates, not per-file results. The
+caller gets a progress callback after every chunk.
+"""
+import asyncio
+import bisect
+import heapq
+import itertools
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from core_analyzer import AnalysisResult, RepositorySummary, analyze_files, iter_python_files
+from pool import ToolPool
+
+CHUNK_SIZE = 16
+# Upper bounds of the distribution buckets
+FUNCTION_COMPLEXITY_BOUNDS = (5, 10, 20, 50)
+MAINTAINABILITY_BOUNDS = (20, 40, 60, 80)
+# Unreadable files listed in the report, at most
+MAX_ERRORS = 20
+
+def _bucket_labels(bounds) -> List[str]:
+    labels, low = [], 0
+    for bound in bounds:
+        labels.append(f"{low}-{bound}")
+        low = bound + 1
+    return labels + [f">{bounds[-1]}"]
+
+class RepositoryReport:
+    """Totals (RepositorySummary), hotspots and distributions over per-file results."""
+
+    def __init__(self, root: str, top_n: int = 10):
+        self.root = root
+        self.top_n = top_n
+        self.summary = RepositorySummary()
+        # Min-heaps of the top_n largest so far
+        self._files = []
+        self._functions = []
+        self._issues = []
+        self._errors = []
+        self._function_complexity = [0] * (len(FUNCTION_COMPLEXITY_BOUNDS) + 1)
+        self._maintainability = [0] * (len(MAINTAINABILITY_BOUNDS) + 1)
+        self._issue_types = {}
+        self._issue_severities = {}
+        self._modes = {}
+
+    def _push(self, heap: list, entry: tuple) -> None:
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def add(self, path: str, result: AnalysisResult) -> None:
+        path = os.path.relpath(path, self.root) if os.path.isdir(self.root) else os.path.basename(path)
+        self.summary.add(path, result)
+        if result.error is not None:
+            if len(self._errors) < MAX_ERRORS:
+                self._errors.append({"path": path, "error": result.error})
+            return
+        self._modes[result.mode] = self._modes.get(result.mode, 0) + 1
+        self._maintainability[bisect.bisect_left(MAINTAINABILITY_BOUNDS, result.maintainability_index)] += 1
+        self._push(self._files, (result.complexity, result.loc, path, result.maintainability_index))
+        if result.issues:
+            self._push(self._issues, (len(result.issues), path))
+        for function in result.functions:
+            self._function_complexity[bisect.bisect_left(FUNCTION_COMPLEXITY_BOUNDS, function.complexity)] += 1
+            self._push(self._functions, (function.complexity, path, function.lineno, function.name))
+        for issue in result.issues:
+            self._issue_types[issue.type] = self._issue_types.get(issue.type, 0) + 1
+            self._issue_severities[issue.severity] = self._issue_severities.get(issue.severity, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "root": self.root,
+            "totals": self.summary.to_dict(),
+            "hotspots": {
+                "files": [{"path": path, "complexity": complexity, "loc": loc, "maintainability_index": mi}
+                          for complexity, loc, path, mi in sorted(self._files, reverse=True)],
+                "functions": [{"path": path, "name": name, "lineno": lineno, "complexity": complexity}
+                              for complexity, path, lineno, name in sorted(self._functions, reverse=True)],
+                "issues": [{"path": path, "issues": count}
+                           for count, path in sorted(self._issues, reverse=True)],
+            },
+            "distributions": {
+                "function_complexity": dict(zip(_bucket_labels(FUNCTION_COMPLEXITY_BOUNDS),
+                                                self._function_complexity)),
+                "file_maintainability": dict(zip(_bucket_labels(MAINTAINABILITY_BOUNDS),
+                                                 self._maintainability)),
+                "issue_types": dict(sorted(self._issue_types.items(), key=lambda item: -item[1])),
+                "issue_severities": self._issue_severities,
+                "modes": self._modes,
+            },
+            "errors": self._errors,
+        }
+
+async def analyze_repository(root: str, pool: ToolPool, top_n: int = 10,
+                             progress: Optional[Callable[[int, int], Awaitable[None]]] = None) -> Dict[str, Any]:
+    """Analyze every Python file under root; progress(done, total) after each chunk."""
+    start = time.perf_counter()
+    paths = await asyncio.to_thread(lambda: list(iter_python_files(root)))
+    report = RepositoryReport(root, top_n)
+    chunks = iter([paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)])
+    # Two chunks per worker keep the pool busy without queueing the whole tree
+    limit = pool.workers * 2
+    in_flight = set()
+    done = 0
+    try:
+        while True:
+            for chunk in itertools.islice(chunks, limit - len(in_flight)):
+                in_flight.add(asyncio.ensure_future(pool.run(analyze_files, chunk)))
+            if not in_flight:
+                break
+            finished, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in finished:
+                results = future.result()
+                for path, result in results:
+                    report.add(path, result)
+                done += len(results)
+            if progress is not None:
+                await progress(done, len(paths))
+    finally:
+        for future in in_flight:
+            future.cancel()
+    result = report.to_dict()
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
@@ -0,0 +1,192 @@
+"""
+Structured tool results for the MCP server.
+
+Each tool declares an output schema (the TypedDicts below) and returns the
+result twice, as the protocol asks: as structuredContent for clients that
+read it, and as compact JSON text for those that do not. Large analyses are
+trimmed before either is built: `fields` keeps only the named sections
+(dotted paths such as "structure.functions") and `min_complexity` drops
+functions below a complexity threshold.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+from mcp.types import CallToolResult, TextContent
+from typing_extensions import TypedDict
+
+# --- Output schemas ---
+# total=False: field selection can leave out any section.
+
+class Metrics(TypedDict, total=False):
+    complexity: int
+    maintainability_index: float
+    loc: int
+
+class SecurityIssue(TypedDict):
+    severity: str
+    type: str
+    message: str
+    lineno: int
+
+class Security(TypedDict, total=False):
+    issues: List[SecurityIssue]
+    score: int
+
+class FunctionInfo(TypedDict):
+    name: str
+    lineno: int
+    complexity: int
+    args: List[str]
+
+class ClassInfo(TypedDict):
+    name: str
+    lineno: int
+    bases: List[str]
+
+class Structure(TypedDict, total=False):
+    functions: List[FunctionInfo]
+    classes: List[ClassInfo]
+    imports: List[str]
+
+class CodeAnalysis(TypedDict, total=False):
+    uri: str
+    mode: str
+    metrics: Metrics
+    security: Security
+    structure: Structure
+    syntax_error: str
+    error: str
+
+class TextStats(TypedDict):
+    words: int
+    sentences: int
+    characters: int
+    avg_word_length: float
+    reading_time_seconds: int
+
+class TextResult(TypedDict, total=False):
+    stats: TextStats
+    keywords: List[str]
+    text: str
+    slug: str
+    error: str
+
+class RepositoryTotals(TypedDict):
+    files: int
+    errors: int
+    loc: int
+    complexity: int
+    avg_complexity: float
+    functions: int
+    classes: int
+    issues: int
+    max_complexity: Optional[Dict[str, Any]]
+
+class FileHotspot(TypedDict):
+    path: str
+    complexity: int
+    loc: int
+    maintainability_index: float
+
+class FunctionHotspot(TypedDict):
+    path: str
+    name: str
+    lineno: int
+    complexity: int
+
+class IssueHotspot(TypedDict):
+    path: str
+    issues: int
+
+class Hotspots(TypedDict):
+    files: List[FileHotspot]
+    functions: List[FunctionHotspot]
+    issues: List[IssueHotspot]
+
+class Distributions(TypedDict):
+    function_complexity: Dict[str, int]
+    file_maintainability: Dict[str, int]
+    issue_types: Dict[str, int]
+    issue_severities: Dict[str, int]
+    modes: Dict[str, int]
+
+class FileError(TypedDict):
+    path: str
+    error: str
+
+class RepositoryAnalysis(TypedDict, total=False):
+    root: str
+    totals: RepositoryTotals
+    hotspots: Hotspots
+    distributions: Distributions
+    errors: List[FileError]
+    elapsed_ms: float
+    error: str
+
+class ServerStats(TypedDict):
+    pool: Dict[str, Any]
+    cache: Dict[str, Any]
+
+# --- Selection ---
+
+def select_fields(result: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    The parts of result named by dotted paths ("metrics",
+    "structure.functions"), nested as in the original. None keeps
+    everything; unknown paths are ignored. The input is not modified.
+    """
+    if not fields or "error" in result:
+        return result
+    # The resource URI is kept whatever else is left out
+    selected = {"uri": result["uri"]} if "uri" in result else {}
+    for path in fields:
+        source, target = result, selected
+        keys = path.split(".")
+        for key in keys[:-1]:
+            source = source.get(key) if isinstance(source, dict) else None
+            if not isinstance(source, dict):
+                break
+            target = target.setdefault(key, {})
+        else:
+            if isinstance(source, dict) and keys[-1] in source:
+                target[keys[-1]] = source[keys[-1]]
+    return selected
+
+def filter_functions(result: Dict[str, Any], min_complexity: int) -> Dict[str, Any]:
+    """A copy of result whose structure.functions only has complexity >= min_complexity."""
+    structure = result.get("structure")
+    if min_complexity <= 1 or not structure or "functions" not in structure:
+        return result
+    functions = [f for f in structure["functions"] if f["complexity"] >= min_complexity]
+    return dict(result, structure=dict(structure, functions=functions))
+
+# Sub-parts of an analysis addressable as analysis://<key>/<section>
+SECTIONS = {
+    "metrics": ("metrics",),
+    "security": ("security",),
+    "issues": ("security", "issues"),
+    "structure": ("structure",),
+    "functions": ("structure", "functions"),
+    "classes": ("structure", "classes"),
+    "imports": ("structure", "imports"),
+}
+
+def section(result: Dict[str, Any], name: str) -> Any:
+    """The value of one SECTIONS entry; KeyError for an unknown name."""
+    value = result
+    for key in SECTIONS[name]:
+        value = value[key]
+    return value
+
+# --- Tool results ---
+
+def to_json(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+def tool_result(payload: Dict[str, Any]) -> CallToolResult:
+    """Structured and compact-JSON content for payload; an "error" key marks the call failed."""
+    return CallToolResult(
+        content=[TextContent(type="text", text=to_json(payload))],
+        structuredContent=payload,
+        isError="error" in payload,
+    )
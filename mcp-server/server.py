@@ -1,42 +1,211 @@
-from typing import Any
-import asyncio
-from mcp.server.fastmcp import FastMCP
-from utils import text_stats, extract_keywords, clean_text, generate_slug
-from core_analyzer import analyze_code as analyze_code_logic
+"""
+Prometheus MCP server (stdio).
+
+Agent hosts start one server per session, so startup is kept to what the
+initialize and tools/list responses need: FastMCP and the result schemas.
+The analyzer, the text utilities and the worker pool are imported by the
+first tool call that uses them. With MCP_WARMUP=1 the worker pool is
+forked right away, while the process is still small, and the workers
+import the analyzer in the background.
+"""
+import os
+
+if os.environ.get("MCP_WARMUP", "").lower() in ("1", "true", "yes"):
+    # Before the imports below: forking is cheapest now, and nothing waits on it
+    from pool import default_pool
+    default_pool().warm(wait=False)
+
+import re
+from typing import Annotated, List, Optional
+from urllib.parse import unquote
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.types import CallToolResult
+from results import (SECTIONS, CodeAnalysis, RepositoryAnalysis, ServerStats, TextResult, filter_functions,
+                     section, select_fields, to_json, tool_result)
 
 # Initialize FastMCP server
 mcp = FastMCP("Prometheus Toolkit")
 
+RESOURCE_SCHEME = "analysis"
+HEX_KEY = re.compile(r"[0-9a-f]{64}")
+
+# Inputs shorter than this run on the event loop; IPC to a worker costs more
+INLINE_MAX_CHARS = int(os.environ.get("MCP_INLINE_MAX_CHARS", "4096"))
+
+TEXT_ACTIONS = ("stats", "keywords", "clean", "slug")
+
+async def _run(func, *args) -> dict:
+    if len(args[0]) < INLINE_MAX_CHARS:
+        return func(*args)
+    from pool import ToolTimeout, default_pool
+    try:
+        return await default_pool().run(func, *args)
+    except ToolTimeout as e:
+        return {"error": str(e)}
+
+async def _analyze(code: str) -> dict:
+    """
+    Incremental analysis of code. The segment store and the merge stay in
+    this process, so edits to a file reuse its segments whichever worker
+    ran the last version; only the segments not seen before go to the pool.
+    """
+    import tasks
+    if len(code) < INLINE_MAX_CHARS:
+        return tasks.analyze_source(code)
+    from pool import ToolTimeout, default_pool
+    analyzer = tasks.incremental_analyzer
+    try:
+        texts = analyzer.missing_segments(code)
+        if texts is None:
+            return await default_pool().run(tasks.analyze_full, code)
+        partials = await default_pool().run(tasks.analyze_segments, texts) if texts else []
+        if None in partials:
+            # A segment that does not parse alone needs the whole file
+            return await default_pool().run(tasks.analyze_full, code)
+    except ToolTimeout as e:
+        return {"error": str(e)}
+    return analyzer.analyze(code, dict(zip(texts, partials)))
+
 @mcp.tool()
-def analyze_code(code: str) -> str:
+async def analyze_code(code: str, fields: Optional[List[str]] = None,
+                       min_complexity: int = 0) -> Annotated[CallToolResult, CodeAnalysis]:
     """
     Analyze Python source code structure, complexity, and security.
     Returns:
     - Metrics: Cyclomatic complexity, maintainability index.
     - Security: Potential vulnerabilities (eval, exec, dangerous imports).
     - Structure: Functions, classes, dependencies.
+    Args:
+        code: The Python source to analyze.
+        fields: Only return these parts, as dotted paths: 'mode', 'metrics',
+            'security', 'security.issues', 'structure', 'structure.functions',
+            'structure.classes', 'structure.imports', ... Default: everything.
+        min_complexity: Only list functions at least this complex.
+    The result's uri names the stored analysis: read it, or a part of it
+    (<uri>/metrics, /issues, /functions, /functions/<name>, ...), as a
+    resource instead of sending the source again.
     """
-    result = analyze_code_logic(code)
-    return str(result)
+    from core_analyzer import default_cache
+    cache = default_cache()
+    key = cache.key_for(code)
+    result = cache.get(key)
+    if result is None:
+        result = await _analyze(code)
+        if "error" in result:
+            return tool_result(result)
+        cache.put(key, result)
+    result = filter_functions(dict(result, uri=f"{RESOURCE_SCHEME}://{key}"), min_complexity)
+    return tool_result(select_fields(result, fields))
 
 @mcp.tool()
-def analyze_text(text: str, action: str = "stats") -> str:
+async def analyze_text(text: str, action: str = "stats") -> Annotated[CallToolResult, TextResult]:
     """
     Perform various text processing operations.
     Args:
         text: The input text to process.
         action: One of 'stats', 'keywords', 'clean', 'slug'.
     """
-    if action == "stats":
-        return str(text_stats(text))
-    elif action == "keywords":
-        return str(extract_keywords(text))
-    elif action == "clean":
-        return clean_text(text)
-    elif action == "slug":
-        return generate_slug(text)
-    else:
-        return f"Unknown action: {action}. Supported: stats, keywords, clean, slug"
+    if action not in TEXT_ACTIONS:
+        return tool_result({"error": f"Unknown action: {action}. Supported: {', '.join(TEXT_ACTIONS)}"})
+    import tasks
+    return tool_result(await _run(tasks.analyze_text, text, action))
+
+@mcp.tool()
+async def analyze_repository(path: str, ctx: Context, top_n: int = 10) -> Annotated[CallToolResult, RepositoryAnalysis]:
+    """
+    Analyze every Python file under a local directory, in parallel on the
+    server, and return an aggregate summary instead of per-file results:
+    - Totals: files, lines, complexity, functions, classes, issues.
+    - Hotspots: the top_n most complex files and functions, and the files
+      with the most security issues.
+    - Distributions: function complexity, file maintainability, issue types.
+    Progress notifications are sent as files complete.
+    Args:
+        path: Directory (or single .py file) on the machine running the server.
+        top_n: Length of each hotspot list.
+    """
+    from pool import ToolTimeout, default_pool
+    from repository import analyze_repository as analyze_files
+    root = os.path.abspath(os.path.expanduser(path))
+    if not os.path.exists(root):
+        return tool_result({"error": f"No such file or directory: {path}"})
+
+    async def progress(done: int, total: int) -> None:
+        await ctx.report_progress(done, total, f"{done}/{total} files analyzed")
+
+    try:
+        return tool_result(await analyze_files(root, default_pool(), top_n, progress))
+    except ToolTimeout as e:
+        return tool_result({"error": str(e)})
+
+# --- Stored analyses ---
+# analyze_code results stay in the analysis cache under the SHA-256 key of
+# their source; these resources serve them, or parts of them, by that key.
+
+def _stored(key: str) -> dict:
+    from core_analyzer import default_cache
+    result = default_cache().get(key) if HEX_KEY.fullmatch(key) else None
+    if result is None:
+        raise ValueError(f"No stored analysis {key}; it may have been evicted. Call analyze_code again.")
+    return result
+
+@mcp.resource(f"{RESOURCE_SCHEME}://{{key}}", mime_type="application/json")
+def stored_analysis(key: str) -> str:
+    """A full analyze_code result, by the key in its uri."""
+    return to_json(_stored(key))
+
+@mcp.resource(f"{RESOURCE_SCHEME}://{{key}}/{{part}}", mime_type="application/json")
+def stored_analysis_part(key: str, part: str) -> str:
+    """One part of a stored analysis: metrics, security, issues, structure, functions, classes or imports."""
+    if part not in SECTIONS:
+        raise ValueError(f"Unknown part {part!r}. Supported: {', '.join(SECTIONS)}")
+    return to_json(section(_stored(key), part))
+
+@mcp.resource(f"{RESOURCE_SCHEME}://{{key}}/functions/{{name}}", mime_type="application/json")
+def stored_function(key: str, name: str) -> str:
+    """The functions of a stored analysis with this name (methods can share one)."""
+    name = unquote(name)
+    matches = [f for f in section(_stored(key), "functions") if f["name"] == name]
+    if not matches:
+        raise ValueError(f"No function named {name!r} in analysis {key}")
+    return to_json(matches)
+
+@mcp.tool()
+def server_stats() -> Annotated[CallToolResult, ServerStats]:
+    """
+    Tool execution metrics: worker pool size, calls in flight and queued,
+    completed/timed out/cancelled counts, recent latency percentiles, and
+    analysis cache hit counts.
+    """
+    from core_analyzer import default_cache
+    from pool import default_pool
+    return tool_result({"pool": default_pool().snapshot(), "cache": default_cache().snapshot()})
+
+def run_stdio() -> None:
+    """
+    mcp.run(transport="stdio"), with sys.stdin and sys.stdout swapped out
+    once the transport holds the real streams. Worker processes forked
+    later close sys.stdin as they start (multiprocessing does); closing the
+    stream the transport's reader thread is blocked on would wait on its
+    lock forever. Stray prints go to stderr instead of corrupting the
+    protocol stream.
+    """
+    import sys
+    from io import TextIOWrapper
+    import anyio
+    from mcp.server.stdio import stdio_server
+
+    stdin = anyio.wrap_file(TextIOWrapper(sys.stdin.buffer, encoding="utf-8", errors="replace"))
+    stdout = anyio.wrap_file(TextIOWrapper(sys.stdout.buffer, encoding="utf-8"))
+    sys.stdin = open(os.devnull)
+    sys.stdout = sys.stderr
+
+    async def serve():
+        async with stdio_server(stdin, stdout) as (read_stream, write_stream):
+            server = mcp._mcp_server
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+
+    anyio.run(serve)
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    run_stdio()
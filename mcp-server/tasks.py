@@ -0,0 +1,32 @@
+"""
+Tool bodies that run in the worker processes of pool.ToolPool (or inline
+for small inputs). Everything here is a top-level function of picklable
+arguments returning a plain dict.
+"""
+from utils import text_stats, extract_keywords, clean_text, generate_slug
+from core_analyzer import IncrementalAnalyzer, analyze_code, analyze_segment
+
+TEXT_ACTIONS = {
+    "stats": lambda text: {"stats": text_stats(text)},
+    "keywords": lambda text: {"keywords": extract_keywords(text)},
+    "clean": lambda text: {"text": clean_text(text)},
+    "slug": lambda text: {"slug": generate_slug(text)},
+}
+
+# Editors resend the same file after small edits; only changed top-level
+# definitions are re-analyzed. Used in the server process only: it sees
+# every version of a file, while calls spread over the workers. Large
+# inputs send just the segments it lacks to analyze_segments on the pool.
+incremental_analyzer = IncrementalAnalyzer()
+
+def analyze_source(code: str) -> dict:
+    return incremental_analyzer.analyze(code)
+
+def analyze_segments(texts: list) -> list:
+    return [analyze_segment(text) for text in texts]
+
+def analyze_full(code: str) -> dict:
+    return analyze_code(code)
+
+def analyze_text(text: str, action: str) -> dict:
+    return TEXT_ACTIONS[action](text)
@@ -0,0 +1,522 @@
+"""
+Self-hosted server for the Vercel API handlers.
+
+Mounts the unmodified handler classes on one HTTP/1.1 front end:
+
+    /api/explain    api-service/api/explain.py
+    /api/text       api-service/api/text.py
+    /api/summarize  youtube-summarizer/api/summarize.py
+    /healthz        200 while serving, 503 once shutdown has begun
+
+Connections are kept alive between requests and served by a fixed pool of
+threads per process. A connection holds a thread only while it has a
+request to serve: new and idle keep-alive connections wait in a selector
+and go to the pool once the client sends something, so idle clients never
+keep busy ones waiting. --processes forks workers that share the listening
+socket, for CPU-bound analysis the GIL would otherwise serialize. On
+SIGTERM or SIGINT the server stops accepting, closes idle keep-alive
+connections, lets in-flight requests finish (up to --grace seconds) and
+exits.
+
+Usage:
+    python serve.py --port 8000 --threads 16
+    python serve.py --host 0.0.0.0 --processes 4 --threads 8 --access-log
+"""
+import argparse
+import importlib
+import os
+import selectors
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+HANDLER_DIRS = (ROOT / "api-service" / "api", ROOT / "youtube-summarizer" / "api")
+# URL path -> module whose `handler` class serves it
+ROUTES = {
+    "/api/explain": "explain",
+    "/api/text": "text",
+    "/api/summarize": "summarize",
+}
+# Seconds an idle keep-alive connection is held open
+KEEPALIVE_TIMEOUT = 15
+
+
+class _BodyReader:
+    """
+    The connection's input stream, limited to one request body so a handler
+    can neither read into the next request nor leave part of its body
+    behind unnoticed.
+    """
+
+    def __init__(self, raw, length: int):
+        self._raw = raw
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self._raw.read(size) if size else b""
+        self.remaining -= len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer)[:self.remaining]
+        count = self._raw.readinto(view) if len(view) else 0
+        self.remaining -= count or 0
+        return count
+
+    def readline(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self._raw.readline(size) if size else b""
+        self.remaining -= len(data)
+        return data
+
+
+class _Mounted:
+    """
+    Mixed into each mounted handler class. A response without
+    Content-Length (a streamed body) can only end by closing the
+    connection, so it is marked to close, as is every response while the
+    server is draining.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def send_response(self, code, message=None):
+        self._status = code
+        self._framed = False
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == "content-length":
+            self._framed = True
+        super().send_header(keyword, value)
+
+    def end_headers(self):
+        if getattr(self, "_status", 200) not in (204, 304) and not getattr(self, "_framed", True):
+            self.close_connection = True
+        if self.server.draining:
+            self.close_connection = True
+        if self.close_connection:
+            super().send_header("Connection", "close")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        self.router.log_message(format, *args)
+
+
+def load_routes():
+    """{path: mounted handler class}, importing each handler module once."""
+    for directory in HANDLER_DIRS:
+        if str(directory) not in sys.path:
+            sys.path.insert(0, str(directory))
+    mounted = {}
+    for path, module_name in ROUTES.items():
+        handler_cls = importlib.import_module(module_name).handler
+        mounted[path] = type(f"{module_name}_mounted", (_Mounted, handler_cls), {})
+    return mounted
+
+
+class Router(BaseHTTPRequestHandler):
+    """
+    Parses each request on a kept-alive connection and hands it to the
+    mounted handler. Once no further request has arrived the handler is
+    parked: it returns its thread and the server resumes it when the
+    connection is readable again.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body go out in separate writes; without this the body
+    # waits out the client's delayed ACK (~40 ms per request on Linux)
+    disable_nagle_algorithm = True
+    routes = {}
+    access_log = False
+    parked = False
+
+    def setup(self):
+        super().setup()
+        self.server.track(self, busy=False)
+
+    def handle(self):
+        # Called when the connection is readable: a request, or end of input, is there
+        self.close_connection = False
+        self.handle_one_request()
+        while not self.close_connection:
+            if not self._input_pending():
+                self.parked = True
+                self.server.untrack(self)
+                return
+            self.handle_one_request()
+
+    def resume(self):
+        """Serve a parked connection that has become readable, as __init__ serves a new one."""
+        self.parked = False
+        self.server.track(self, busy=False)
+        try:
+            self.handle()
+        finally:
+            self.finish()
+
+    def finish(self):
+        if self.parked:
+            # The connection stays open in the server's selector
+            return
+        self.server.untrack(self)
+        super().finish()
+
+    def _input_pending(self) -> bool:
+        """Whether the client has already sent more (a pipelined request), without waiting."""
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def handle_one_request(self):
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+        except (TimeoutError, OSError):
+            self.close_connection = True
+            return
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        self.server.track(self, busy=True)
+        try:
+            if len(self.raw_requestline) > 65536:
+                self.send_error(414)
+                return
+            if not self.parse_request():
+                return
+            self._dispatch()
+            self.wfile.flush()
+        finally:
+            if self.server.draining:
+                self.close_connection = True
+            self.server.track(self, busy=False)
+
+    def _dispatch(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            self._health()
+            return
+        mounted = self.routes.get(path.rstrip("/"))
+        if mounted is None:
+            self.send_error(404, "No API at this path")
+            return
+        if not hasattr(mounted, "do_" + self.command):
+            self.send_error(405 if self.command in ("GET", "POST", "PUT", "DELETE", "PATCH") else 501)
+            return
+
+        if self.headers.get("Transfer-Encoding", "").strip().lower() not in ("", "identity"):
+            # Only the handler knows where a chunked body ends; do not reuse
+            # the connection after it
+            body = self.rfile
+            self.close_connection = True
+        else:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.send_error(400, "Invalid Content-Length")
+                return
+            body = _BodyReader(self.rfile, length)
+
+        delegate = mounted.__new__(mounted)
+        delegate.router = self
+        delegate.server = self.server
+        delegate.request = delegate.connection = self.connection
+        delegate.client_address = self.client_address
+        delegate.rfile = body
+        delegate.wfile = self.wfile
+        delegate.raw_requestline = self.raw_requestline
+        delegate.requestline = self.requestline
+        delegate.request_version = self.request_version
+        delegate.command = self.command
+        delegate.path = self.path
+        delegate.headers = self.headers
+        delegate.close_connection = self.close_connection or self.server.draining
+        getattr(delegate, "do_" + self.command)()
+        self.close_connection = delegate.close_connection
+        if isinstance(body, _BodyReader) and body.remaining:
+            # Unread body bytes would be parsed as the next request
+            self.close_connection = True
+
+    def _health(self):
+        status, body = (503, b"draining\n") if self.server.draining else (200, b"ok\n")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        if self.server.draining:
+            self.close_connection = True
+            self.send_header("Connection", "close")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.access_log:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer whose connections are handled on a fixed thread pool rather
+    than a thread each, with the bookkeeping graceful shutdown needs.
+
+    Connections that have nothing to read wait in a selector on a thread of
+    their own (the watcher) instead of in a pool thread; they are handed to
+    the pool when readable and closed after the keep-alive timeout.
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, address, handler_cls, threads: int, bind_and_activate: bool = True):
+        super().__init__(address, handler_cls, bind_and_activate)
+        self.threads = threads
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="serve")
+        self.draining = False
+        # Readable connections waiting for a pool thread
+        self.backlog = 0
+        # Handlers running on a pool thread -> whether a request is in progress
+        self._connections = {}
+        # Connections in the selector: socket -> (client_address, handler or None if new, deadline)
+        self._idle = {}
+        # Connections handed to the watcher, not yet in the selector
+        self._parking = []
+        self._lock = threading.Lock()
+        self._selector = None
+        self._wakeup = None
+        self._stopped = False
+
+    def serve_forever(self, poll_interval=0.5):
+        # Started here rather than in __init__, so forked workers get their own
+        self._start_watcher()
+        super().serve_forever(poll_interval)
+
+    def process_request(self, request, client_address):
+        # No thread until the client sends its first request
+        self._park(request, client_address, None)
+
+    def _process(self, request, client_address, handler):
+        with self._lock:
+            self.backlog -= 1
+        try:
+            if handler is None:
+                handler = self.RequestHandlerClass(request, client_address, self)
+            else:
+                handler.resume()
+            if handler.parked:
+                self._park(request, client_address, handler)
+                return
+        except Exception:
+            self.handle_error(request, client_address)
+        self.shutdown_request(request)
+
+    def _submit(self, request, client_address, handler) -> None:
+        with self._lock:
+            self.backlog += 1
+        try:
+            self.pool.submit(self._process, request, client_address, handler)
+        except RuntimeError:
+            # The pool has been shut down
+            with self._lock:
+                self.backlog -= 1
+            self._close(request, handler)
+
+    # --- Idle connections ---
+
+    def _start_watcher(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, wakeup_send = socket.socketpair()
+        wakeup_send.setblocking(False)
+        self._wakeup_send = wakeup_send
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        threading.Thread(target=self._watch, name="serve-idle", daemon=True).start()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            try:
+                self._wakeup_send.send(b"\0")
+            except OSError:
+                # Full: the watcher has wake-ups pending anyway
+                pass
+
+    def _park(self, request, client_address, handler) -> None:
+        with self._lock:
+            self._parking.append((request, client_address, handler))
+        self._wake()
+
+    def _watch(self) -> None:
+        """The watcher: owns the selector, so only this thread registers sockets."""
+        selector = self._selector
+        while not self._stopped:
+            for key, _ in selector.select(1.0):
+                if key.fileobj is self._wakeup:
+                    self._wakeup.recv(4096)
+                    continue
+                selector.unregister(key.fileobj)
+                with self._lock:
+                    client_address, handler, _ = self._idle.pop(key.fileobj)
+                self._submit(key.fileobj, client_address, handler)
+            with self._lock:
+                parking, self._parking = self._parking, []
+            deadline = time.monotonic() + self.RequestHandlerClass.timeout
+            for request, client_address, handler in parking:
+                with self._lock:
+                    self._idle[request] = (client_address, handler, deadline)
+                selector.register(request, selectors.EVENT_READ)
+            now = time.monotonic()
+            with self._lock:
+                expired = [(request, handler) for request, (_, handler, deadline) in self._idle.items()
+                           if self.draining or deadline <= now]
+                for request, _ in expired:
+                    del self._idle[request]
+            for request, handler in expired:
+                selector.unregister(request)
+                self._close(request, handler)
+        for request, (_, handler, _) in list(self._idle.items()):
+            self._close(request, handler)
+        self._idle.clear()
+        selector.close()
+        self._wakeup.close()
+        self._wakeup_send.close()
+
+    def _close(self, request, handler) -> None:
+        if handler is not None:
+            handler.parked = False
+            try:
+                handler.finish()
+            except Exception:
+                pass
+        self.shutdown_request(request)
+
+    # --- Shutdown ---
+
+    def track(self, handler, busy: bool) -> None:
+        with self._lock:
+            self._connections[handler] = busy
+
+    def untrack(self, handler) -> None:
+        with self._lock:
+            self._connections.pop(handler, None)
+
+    @staticmethod
+    def _close_idle(handler) -> None:
+        # Wakes a handler blocked reading its next request line
+        try:
+            handler.connection.shutdown(socket.SHUT_RD)
+        except OSError:
+            pass
+
+    def drain(self, grace: float) -> bool:
+        """Stop taking new connections, close idle ones, wait for in-flight requests."""
+        self.draining = True
+        # The watcher closes the connections in its selector
+        self._wake()
+        with self._lock:
+            idle = [h for h, busy in self._connections.items() if not busy]
+        for handler in idle:
+            self._close_idle(handler)
+        deadline = time.monotonic() + grace
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not (self._connections or self._idle or self._parking):
+                    break
+            time.sleep(0.05)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            return not self._connections
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._stopped = True
+        self._wake()
+
+
+def serve(server: PooledHTTPServer, grace: float) -> int:
+    """Run until SIGTERM/SIGINT, then shut down gracefully; 0 when nothing was cut off."""
+    stop = threading.Event()
+
+    def on_signal(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.2}, daemon=True)
+    thread.start()
+    while not stop.wait(0.5):
+        pass
+    server.shutdown()
+    clean = server.drain(grace)
+    server.server_close()
+    return 0 if clean else 1
+
+
+def run_workers(server: PooledHTTPServer, processes: int, grace: float) -> int:
+    """Fork processes that serve the already-bound socket; relay signals to them."""
+    children = []
+    for _ in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            # The pool's threads do not survive fork; give each child its own
+            server.pool = ThreadPoolExecutor(max_workers=server.threads, thread_name_prefix="serve")
+            os._exit(serve(server, grace))
+        children.append(pid)
+
+    def forward(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    status = 0
+    for pid in children:
+        _, code = os.waitpid(pid, 0)
+        status = status or os.waitstatus_to_exitcode(code)
+    server.server_close()
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API handlers over HTTP/1.1 with keep-alive")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="port to bind (default: 8000)")
+    parser.add_argument("--threads", type=int, default=8,
+                        help="connection handler threads per process (default: 8)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes sharing the socket (default: 1, no fork)")
+    parser.add_argument("--grace", type=float, default=30.0,
+                        help="seconds to let in-flight requests finish on shutdown (default: 30)")
+    parser.add_argument("--keepalive", type=float, default=KEEPALIVE_TIMEOUT,
+                        help=f"idle keep-alive timeout in seconds (default: {KEEPALIVE_TIMEOUT})")
+    parser.add_argument("--access-log", action="store_true", help="log every request to stderr")
+    args = parser.parse_args()
+
+    Router.routes = load_routes()
+    Router.timeout = args.keepalive
+    Router.access_log = args.access_log
+    server = PooledHTTPServer((args.host, args.port), Router, args.threads)
+    print(f"Serving {', '.join(Router.routes)} on http://{args.host}:{server.server_address[1]} "
+          f"({args.processes} process(es) x {args.threads} threads)", file=sys.stderr, flush=True)
+    if args.processes > 1:
+        return run_workers(server, args.processes, args.grace)
+    return serve(server, args.grace)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Puts core/, api-service/api/ and serve.py on sys.path, as their entry points do for
+themselves, and drives the API handlers without a server.
+"""
+import gzip
+import http.client
+import io
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in ("core", os.path.join("api-service", "api")):
+    sys.path.insert(0, os.path.join(ROOT, path))
+# serve.py, last so the handler directories come first
+sys.path.append(ROOT)
+
+class _Connection:
+    """A socket stand-in: the request is read from a buffer, the response collected."""
+
+    def __init__(self, raw: bytes):
+        self._raw = raw
+        self.sent = bytearray()
+
+    def makefile(self, mode, buffering=None):
+        return io.BytesIO(self._raw)
+
+    def sendall(self, data):
+        self.sent += data
+
+def http_request(handler_class, method: str, path: str, body: bytes = b"", headers: dict = None):
+    """
+    Run one request through a BaseHTTPRequestHandler subclass without a
+    server; returns (status, headers, body) with the body as sent on the
+    wire (still compressed or chunked if the handler chose so).
+    """
+    headers = dict(headers or {})
+    if body and "Transfer-Encoding" not in headers:
+        headers.setdefault("Content-Length", str(len(body)))
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    connection = _Connection(head.encode("latin-1") + b"\r\n" + body)
+    handler_class(connection, ("127.0.0.1", 0), None)
+    response = http.client.HTTPResponse(_Connection(bytes(connection.sent)))
+    response.begin()
+    # read() undoes chunked framing; the content-coding is left as sent
+    return response.status, response.headers, response.read()
+
+def json_body(headers, body: bytes):
+    encoding = headers.get("Content-Encoding")
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding:
+        raise AssertionError(f"unexpected Content-Encoding {encoding}")
+    return json.loads(body)
@@ -0,0 +1,149 @@
+"""
+The single-pass AnalysisVisitor against the three-visitor analyzer it
+replaced (tests/legacy_analyzer.py), on a fixed corpus of snippets and the
+repository's own Python files.
+"""
+import glob
+import os
+
+import pytest
+
+import analyzer
+import legacy_analyzer
+from conftest import ROOT
+
+SNIPPETS = {
+    "empty": "",
+    "module_statements": "x = 1\nif x and y or z:\n    pass\nwhile x:\n    x -= 1\nassert x, 'done'\n",
+    "function_args": "def f(a, b=2, *args, c, d=4, **kwargs):\n    return a\n",
+    "positional_only": "def f(a, b, /, c, *, d):\n    return a\n",
+    "decorators": (
+        "import functools\n\n"
+        "@functools.lru_cache(maxsize=None)\n"
+        "@staticmethod\n"
+        "def cached(n):\n"
+        "    if n < 2:\n"
+        "        return n\n"
+        "    return cached(n - 1) + cached(n - 2)\n\n"
+        "@dataclass(frozen=True)\n"
+        "class Point(Base, mixins.Mixin):\n"
+        "    @property\n"
+        "    def norm(self):\n"
+        "        return (self.x ** 2 + self.y ** 2) ** 0.5 if self.x or self.y else 0\n"
+    ),
+    "nested_functions": (
+        "def outer(items):\n"
+        "    total = 0\n"
+        "    def inner(x):\n"
+        "        if x > 0 and x < 10:\n"
+        "            return x\n"
+        "        def innermost():\n"
+        "            for i in range(3):\n"
+        "                while i:\n"
+        "                    i -= 1\n"
+        "        return innermost\n"
+        "    for item in items:\n"
+        "        try:\n"
+        "            total += inner(item)\n"
+        "        except (TypeError, ValueError):\n"
+        "            pass\n"
+        "        except Exception:\n"
+        "            raise\n"
+        "    return total\n"
+    ),
+    "async": (
+        "import asyncio\n\n"
+        "async def fetch(session, urls):\n"
+        "    async for url in urls:\n"
+        "        if url or session:\n"
+        "            await asyncio.sleep(0)\n"
+        "    async with session:\n"
+        "        return [await session.get(u) for u in urls if u]\n"
+    ),
+    "methods_and_classes": (
+        "class A:\n"
+        "    class Inner(object):\n"
+        "        def method(self, x):\n"
+        "            return x\n"
+        "    def method(self, y=lambda z: z or 1):\n"
+        "        assert y\n"
+        "        return self.Inner().method(y)\n"
+    ),
+    "security": (
+        "import os, sys as system\n"
+        "import subprocess\n"
+        "from os import path\n"
+        "from . import sibling\n"
+        "from sys import argv\n\n"
+        "def run(code):\n"
+        "    eval(code)\n"
+        "    exec(compile(code, '<x>', 'exec'))\n"
+        "    obj.eval(code)\n"
+        "    return subprocess.call(['ls'])\n"
+    ),
+    "comprehensions_and_lambdas": (
+        "squares = [x * x for x in range(10) if x % 2 and x > 3]\n"
+        "pairs = {k: v for k, v in items if k or v}\n"
+        "key = lambda item: item[0] if item else None\n"
+        "gen = (eval(s) for s in strings)\n"
+    ),
+    "match_statement": (
+        "def handle(command):\n"
+        "    match command:\n"
+        "        case ['go', direction] if direction and direction != 'up':\n"
+        "            return direction\n"
+        "        case _:\n"
+        "            return None\n"
+    ),
+}
+
+SYNTAX_ERRORS = {
+    "unclosed_paren": "def f(a, b:\n    return a\n",
+    "bad_indent": "def f():\nreturn 1\n",
+    "stray_token": "x = = 1\nimport os\neval('1')\n",
+}
+
+REPOSITORY_FILES = sorted(
+    path for pattern in ("core/*.py", "api-service/api/*.py", "mcp-server/*.py", "*.py")
+    for path in glob.glob(os.path.join(ROOT, pattern))
+)
+
+def _without_mode(result):
+    result = dict(result)
+    result.pop("mode", None)
+    return result
+
+@pytest.mark.parametrize("name", sorted(SNIPPETS))
+def test_fused_visitor_matches_legacy_on_snippets(name):
+    code = SNIPPETS[name]
+    result = analyzer.analyze_code(code)
+    assert result["mode"] == "ast"
+    assert _without_mode(result) == legacy_analyzer.analyze_code(code)
+
+@pytest.mark.parametrize("path", REPOSITORY_FILES, ids=lambda path: os.path.relpath(path, ROOT))
+def test_fused_visitor_matches_legacy_on_repository(path):
+    with open(path, encoding="utf-8") as f:
+        code = f.read()
+    assert _without_mode(analyzer.analyze_code(code)) == legacy_analyzer.analyze_code(code)
+
+@pytest.mark.parametrize("name", sorted(SYNTAX_ERRORS))
+def test_syntax_errors_fall_back_to_token_scan(name):
+    # The old path gave up with an error; now metrics come from the token scan
+    code = SYNTAX_ERRORS[name]
+    assert "error" in legacy_analyzer.analyze_code(code)
+    result = analyzer.analyze_code(code)
+    assert result["mode"] == "tokenize"
+    assert "error" not in result
+    assert result["syntax_error"]
+    assert result["metrics"]["loc"] == len(code.splitlines())
+
+def test_syntax_error_keeps_security_findings():
+    result = analyzer.analyze_code(SYNTAX_ERRORS["stray_token"])
+    assert [issue["type"] for issue in result["security"]["issues"]] == ["Dangerous Import", "Code Injection"]
+    assert result["structure"]["imports"] == ["os"]
+
+def test_result_model_round_trips_to_the_same_dict():
+    code = SNIPPETS["nested_functions"]
+    model = analyzer.analyze(code)
+    assert model.to_dict() == analyzer.analyze_code(code)
+    assert [function.name for function in model.functions] == ["outer", "inner", "innermost"]
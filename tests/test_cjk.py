@@ -0,0 +1,87 @@
+"""
+_cjk: compact trie construction, most-probable segmentation, and the
+text and compiled dictionary formats.
+"""
+import pytest
+
+from _cjk import MAGIC, NOT_A_WORD, CompactTrie, is_han, load, patterns, read_frequencies
+
+FREQUENCIES = {
+    "研究": 100, "研究生": 10, "生命": 100, "命": 1, "起源": 100,
+    "中文": 50, "分词": 40, "中": 30, "文": 20, "分": 20, "词": 20,
+    "自然": 60, "自然语言": 30, "语言": 80, "处理": 70,
+}
+
+@pytest.fixture(scope="module")
+def trie():
+    return CompactTrie.build(FREQUENCIES)
+
+@pytest.mark.parametrize("run, words", [
+    # 研究生 is a word, but 研究/生命 is the likelier reading
+    ("研究生命起源", ["研究", "生命", "起源"]),
+    ("研究生", ["研究生"]),
+    ("中文分词", ["中文", "分词"]),
+    ("自然语言处理", ["自然语言", "处理"]),
+    # Characters the dictionary lacks stand alone
+    ("我们研究中文", ["我", "们", "研究", "中文"]),
+    ("的", ["的"]),
+    ("语", ["语"]),
+    ("研", ["研"]),
+])
+def test_segment(trie, run, words):
+    assert trie.segment(run) == words
+
+def test_segmentation_covers_the_run(trie):
+    run = "自然语言处理研究生命起源的中文分词"
+    assert "".join(trie.segment(run)) == run
+
+def test_nodes_are_breadth_first_with_sorted_children(trie):
+    # Root children: the distinct first characters, in code point order
+    first_chars = sorted({ord(word[0]) for word in FREQUENCIES})
+    assert list(trie.labels[trie.first[0]:trie.first[1]]) == first_chars
+    for node in range(len(trie)):
+        children = trie.labels[trie.first[node]:trie.first[node + 1]]
+        assert list(children) == sorted(children)
+    # One node per distinct prefix, plus the root
+    prefixes = {word[:i] for word in FREQUENCIES for i in range(1, len(word) + 1)}
+    assert len(trie) == len(prefixes) + 1
+    assert sum(weight != NOT_A_WORD for weight in trie.weight) == len(FREQUENCIES)
+
+def test_build_skips_empty_and_non_positive_words():
+    trie = CompactTrie.build({"": 5, "中文": 0, "分词": 3})
+    assert trie.segment("中文分词") == ["中", "文", "分词"]
+
+def test_bytes_round_trip(trie):
+    data = trie.to_bytes()
+    assert data.startswith(MAGIC)
+    copy = CompactTrie.from_bytes(data)
+    assert (copy.labels, copy.first, copy.weight, copy.unknown) == (trie.labels, trie.first, trie.weight, trie.unknown)
+    assert copy.segment("研究生命起源") == ["研究", "生命", "起源"]
+
+def test_from_bytes_rejects_other_data():
+    with pytest.raises(ValueError):
+        CompactTrie.from_bytes(b"NOPE" + bytes(12))
+
+def test_read_frequencies(tmp_path):
+    path = tmp_path / "dict.txt"
+    path.write_text("# comment\n\n研究 100 vn\n生命 7\n起源\n", encoding="utf-8")
+    assert read_frequencies(str(path)) == {"研究": 100, "生命": 7, "起源": 1}
+
+def test_load_text_and_compiled_dictionaries(tmp_path, trie):
+    text_path = tmp_path / "dict.txt"
+    text_path.write_text("".join(f"{word} {freq}\n" for word, freq in FREQUENCIES.items()), encoding="utf-8")
+    compiled_path = tmp_path / "dict.dat"
+    compiled_path.write_bytes(trie.to_bytes())
+    for path in (text_path, compiled_path):
+        assert load(str(path)).segment("自然语言处理") == ["自然语言", "处理"]
+
+@pytest.mark.parametrize("ch, han", [
+    ("中", True), ("㐀", True), ("豈", True), ("\U00020000", True),
+    ("a", False), ("。", False), ("ア", False), ("한", False),
+])
+def test_is_han(ch, han):
+    assert is_han(ch) is han
+    assert bool(patterns.han.fullmatch(ch)) is han
+
+def test_han_runs():
+    assert patterns.han_run.findall("Python 是一种编程语言。文本") == ["是一种编程语言", "文本"]
@@ -0,0 +1,90 @@
+"""
+_df_table: write_table() and DFTable round trip, and rejection of files
+that are not tables.
+"""
+import struct
+
+import pytest
+
+from _df_table import DFTable, EMPTY, MAGIC, _HEADER, write_table
+
+DFS = {"performance": 12, "engineering": 3, "自然语言": 7, "café": 1, "a": 40}
+
+@pytest.fixture
+def table_path(tmp_path):
+    path = tmp_path / "df.bin"
+    write_table(str(path), 50, 123.5, DFS)
+    return path
+
+def test_round_trip(table_path):
+    table = DFTable(str(table_path))
+    try:
+        assert (table.doc_count, table.avg_doc_len, table.term_count) == (50, 123.5, len(DFS))
+        assert {term: table.df(term) for term in DFS} == DFS
+    finally:
+        table.close()
+
+@pytest.mark.parametrize("term", ["", "perf", "performances", "Performance", "自然"])
+def test_unknown_term_is_zero(table_path, term):
+    table = DFTable(str(table_path))
+    try:
+        assert table.df(term) == 0
+    finally:
+        table.close()
+
+def test_digest_follows_contents(tmp_path, table_path):
+    same, other = tmp_path / "same.bin", tmp_path / "other.bin"
+    write_table(str(same), 50, 123.5, DFS)
+    write_table(str(other), 50, 123.5, {**DFS, "a": 41})
+    digests = []
+    for path in (table_path, same, other):
+        table = DFTable(str(path))
+        digests.append(table.digest)
+        table.close()
+    assert digests[0] == digests[1] != digests[2]
+
+def test_empty_table(tmp_path):
+    path = tmp_path / "empty.bin"
+    write_table(str(path), 0, 0.0, {})
+    table = DFTable(str(path))
+    assert table.term_count == 0 and table.df("anything") == 0
+    table.close()
+
+def _header(buckets, term_count=1):
+    return _HEADER.pack(MAGIC, 1, 1.0, term_count, buckets)
+
+@pytest.mark.parametrize("name, content", [
+    ("short", MAGIC),
+    ("magic", b"NOPE" + _header(1)[4:] + struct.pack("<4I", EMPTY, 0, 1, 1) + b"x"),
+    ("no_buckets", _header(0)),
+    ("odd_buckets", _header(3)),
+])
+def test_invalid_files_are_rejected(tmp_path, name, content):
+    path = tmp_path / f"{name}.bin"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        DFTable(str(path))
+
+def test_truncated_file_is_rejected(tmp_path, table_path):
+    data = table_path.read_bytes()
+    for size in (_HEADER.size + 4, len(data) - 1):
+        path = tmp_path / f"truncated{size}.bin"
+        path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            DFTable(str(path))
+
+def test_table_without_empty_buckets_ends_the_probe(tmp_path):
+    # Every bucket holds a term; write_table() never does this, other writers may
+    path = tmp_path / "full.bin"
+    path.write_bytes(_header(2, 2) + struct.pack("<2I", 0, 1) + struct.pack("<3I", 0, 1, 2)
+                     + struct.pack("<2I", 5, 6) + b"xy")
+    table = DFTable(str(path))
+    assert (table.df("x"), table.df("y"), table.df("z")) == (5, 6, 0)
+    table.close()
+
+def test_bucket_past_the_last_term_is_unknown(tmp_path):
+    path = tmp_path / "dangling.bin"
+    path.write_bytes(_header(1) + struct.pack("<I", 7) + struct.pack("<2I", 0, 1) + struct.pack("<I", 5) + b"x")
+    table = DFTable(str(path))
+    assert table.df("x") == 0
+    table.close()
@@ -0,0 +1,149 @@
+"""
+Conditional requests and content-addressed GETs: ETags, If-None-Match, and
+GET ?h=<hash> on /api/explain and /api/text.
+"""
+import json
+
+import pytest
+
+import _http
+import explain
+import text
+from conftest import http_request, json_body
+
+CODE = "def add(a, b):\n    return a + b\n"
+
+def _post_text(value, action="slug", headers=None):
+    body = json.dumps({"text": value, "action": action}).encode("utf-8")
+    return http_request(text.handler, "POST", "/api/text", body, headers)
+
+def _post_code(code=CODE, headers=None):
+    return http_request(explain.handler, "POST", "/api/explain?lean=1", json.dumps({"code": code}).encode("utf-8"),
+                        headers)
+
+# --- GET ?h= ---
+
+@pytest.mark.parametrize("handler, path", [
+    (text.handler, "/api/text?h=0123456789abcdef0123456789abcdef"),
+    (explain.handler, "/api/explain?h=" + "ab" * 32),
+])
+@pytest.mark.parametrize("if_none_match", [None, "*", '"guessed"'])
+def test_unknown_hash_is_a_cache_miss_whatever_the_client_holds(handler, path, if_none_match):
+    headers = {"If-None-Match": if_none_match} if if_none_match else {}
+    status, response_headers, body = http_request(handler, "GET", path, headers=headers)
+    assert status == 404
+    assert json_body(response_headers, body)["cache_miss"] is True
+    assert response_headers["Cache-Control"] == "no-store"
+
+@pytest.mark.parametrize("handler, path", [
+    (text.handler, "/api/text?h=zzz"),
+    (text.handler, "/api/text?h=" + "A" * 32),
+    (explain.handler, "/api/explain?h=zzz"),
+])
+def test_malformed_hash_is_rejected(handler, path):
+    status, headers, body = http_request(handler, "GET", path, headers={"If-None-Match": "*"})
+    assert status == 400
+
+@pytest.mark.parametrize("post, handler", [
+    (lambda headers=None: _post_text("Stored for later", headers=headers), text.handler),
+    (lambda headers=None: _post_code(headers=headers), explain.handler),
+])
+def test_stored_result_round_trip(post, handler):
+    status, headers, body = post()
+    assert status == 200
+    location = headers["Content-Location"]
+    status, get_headers, get_body = http_request(handler, "GET", location)
+    assert status == 200
+    assert get_headers["Cache-Control"].endswith("immutable")
+    etag = get_headers["ETag"]
+    status, not_modified, _ = http_request(handler, "GET", location, headers={"If-None-Match": etag})
+    assert status == 304
+    assert not_modified["ETag"] == etag
+
+def test_304_for_uncached_text_has_no_content_location():
+    value = "word " * (text.RESULT_CACHE_MAX_INPUT // 5 + 1)
+    status, headers, _ = _post_text(value)
+    assert status == 200
+    assert "Content-Location" not in headers
+    status, headers, _ = _post_text(value, headers={"If-None-Match": headers["ETag"]})
+    assert status == 304
+    assert "Content-Location" not in headers
+
+def test_304_for_cached_text_keeps_content_location():
+    status, headers, _ = _post_text("Short enough to keep")
+    status, not_modified, _ = _post_text("Short enough to keep", headers={"If-None-Match": headers["ETag"]})
+    assert status == 304
+    assert not_modified["Content-Location"] == headers["Content-Location"]
+
+# --- If-None-Match and content-coding ---
+
+class Request:
+    def __init__(self, **headers):
+        self.headers = {name.replace("_", "-"): value for name, value in headers.items()}
+
+@pytest.mark.parametrize("accept, encoding", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip; q=0.0, identity", None),
+    ("deflate, x-gzip", "gzip"),
+    ("*", "gzip"),
+    ("*;q=0, gzip;q=0.5", "gzip"),
+    ("gzip;q=0, *", None),
+    ("gzip;q=bogus", None),
+])
+def test_negotiate_encoding(accept, encoding, monkeypatch):
+    # brotli is optional; without it br is never chosen
+    monkeypatch.setattr(_http, "_load_brotli", lambda: None)
+    assert _http.negotiate_encoding(accept) == encoding
+    assert _http.negotiate_encoding("br;q=1, " + accept) == encoding
+
+def test_negotiate_encoding_prefers_brotli_when_installed(monkeypatch):
+    monkeypatch.setattr(_http, "_load_brotli", lambda: object())
+    assert _http.negotiate_encoding("gzip, br") == "br"
+    assert _http.negotiate_encoding("gzip, br;q=0") == "gzip"
+    assert _http.negotiate_encoding("*") == "br"
+
+def test_representation_etag_names_the_coding(monkeypatch):
+    monkeypatch.setattr(_http, "_load_brotli", lambda: None)
+    assert _http.representation_etag(Request(), "abc") == '"abc"'
+    assert _http.representation_etag(Request(Accept_Encoding="gzip;q=0"), "abc") == '"abc"'
+    assert _http.representation_etag(Request(Accept_Encoding="gzip"), "abc") == '"abc-gzip"'
+
+@pytest.mark.parametrize("if_none_match, accept, matches", [
+    ('"abc"', "", True),
+    ('W/"abc"', "", True),
+    ('"other", W/"abc"', "", True),
+    ('"other" ,  "abc" ', "", True),
+    ("*", "gzip", True),
+    ('"abc"', "gzip", False),
+    ('"abc-gzip"', "gzip", True),
+    ('W/"abc-gzip"', "gzip", True),
+    ('"abc-gzip"', "", False),
+    ('"abc-gzip"', "gzip;q=0", False),
+    ('"ab"', "", False),
+    ("abc", "", False),
+    ("", "", False),
+])
+def test_etag_matches(if_none_match, accept, matches, monkeypatch):
+    monkeypatch.setattr(_http, "_load_brotli", lambda: None)
+    request = Request(If_None_Match=if_none_match, Accept_Encoding=accept)
+    assert _http.etag_matches(request, "abc") is matches
+
+def test_gzip_and_identity_are_separate_representations(monkeypatch):
+    monkeypatch.setattr(_http, "_load_brotli", lambda: None)
+    value = "Representation " * 100
+    status, plain, plain_body = _post_text(value, "clean", {"Accept-Encoding": "gzip;q=0"})
+    assert status == 200 and "Content-Encoding" not in plain
+    status, zipped, zipped_body = _post_text(value, "clean", {"Accept-Encoding": "gzip"})
+    assert status == 200 and zipped["Content-Encoding"] == "gzip"
+    assert zipped["ETag"] == plain["ETag"][:-1] + '-gzip"'
+    assert json_body(zipped, zipped_body) == json_body(plain, plain_body)
+    # A tag only validates the representation it was sent with
+    status, _, _ = _post_text(value, "clean", {"Accept-Encoding": "gzip", "If-None-Match": plain["ETag"]})
+    assert status == 200
+    status, headers, _ = _post_text(value, "clean", {"Accept-Encoding": "gzip", "If-None-Match": zipped["ETag"]})
+    assert status == 304 and headers["ETag"] == zipped["ETag"]
+    status, headers, _ = _post_text(value, "clean", {"Accept-Encoding": "gzip;q=0",
+                                                     "If-None-Match": f'W/{plain["ETag"]}'})
+    assert status == 304 and headers["ETag"] == plain["ETag"]
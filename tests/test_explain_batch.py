@@ -0,0 +1,115 @@
+"""
+Batch mode of /api/explain: iter_batch() line order, per-item error lines,
+the process pool and its inline fallback, and the NDJSON response.
+"""
+import json
+import uuid
+
+import pytest
+
+import explain
+from analyzer import analyze_code
+from conftest import http_request
+
+def _code(tag):
+    # Unique source per test run, so nothing comes from the shared cache
+    return f"def f_{tag}_{uuid.uuid4().hex}(x):\n    return x if x else eval('0')\n"
+
+def test_lines_come_in_item_order_then_summary():
+    cached = _code("cached")
+    explain.default_cache().analyze(cached)
+    items = [
+        {"id": "a", "code": _code("a")},
+        {"id": "missing"},
+        {"id": "js", "code": "console.log(1)", "language": "javascript"},
+        {"id": "hit", "code": cached},
+        {"id": "b", "code": _code("b"), "language": "python"},
+        "not an object",
+        {"code": ""},
+    ]
+    lines = list(explain.iter_batch(items, workers=1))
+    # Errors, non-Python items and cache hits are answered first, then the analyzed ones
+    assert [line.get("id") for line in lines] == ["missing", "js", "hit", 5, 6, "a", "b", None]
+    assert lines[0] == {"type": "item", "id": "missing", "error": "Missing 'code' parameter"}
+    assert lines[1] == {"type": "item", "id": "js", "language": "javascript", "analysis": explain.NOT_PYTHON}
+    assert lines[5]["analysis"] == analyze_code(items[0]["code"])
+    assert lines[-1] == {"type": "summary", "items": 7, "errors": 3, "cache_hits": 1}
+
+def test_analyzed_items_are_cached():
+    code = _code("cache")
+    list(explain.iter_batch([{"code": code}], workers=1))
+    assert list(explain.iter_batch([{"code": code}], workers=1))[-1]["cache_hits"] == 1
+
+def test_analysis_failure_is_an_error_line(monkeypatch):
+    real = explain.analyze
+
+    def analyze(code):
+        if "boom" in code:
+            raise RuntimeError("analyzer failed")
+        return real(code)
+
+    monkeypatch.setattr(explain, "analyze", analyze)
+    items = [{"id": 1, "code": _code("ok")}, {"id": 2, "code": "import os\nboom = 1\n"}]
+    lines = list(explain.iter_batch(items, workers=1))
+    assert lines[1] == {"type": "item", "id": 2, "error": "analyzer failed"}
+    assert lines[-1]["errors"] == 1
+
+def test_process_pool_answers_every_item_once():
+    count = explain.BATCH_CHUNK_SIZE * 3
+    items = [{"id": i, "code": _code(i)} for i in range(count)]
+    lines = list(explain.iter_batch(items, workers=2))
+    assert lines[-1] == {"type": "summary", "items": count, "errors": 0, "cache_hits": 0}
+    # Chunks come back as they complete, so only the set of ids is fixed
+    by_id = {line["id"]: line for line in lines[:-1]}
+    assert sorted(by_id) == list(range(count))
+    assert all(by_id[i]["analysis"] == analyze_code(items[i]["code"]) for i in range(count))
+
+def test_pool_unavailable_falls_back_to_inline(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise OSError("no /dev/shm")
+        yield
+
+    monkeypatch.setattr(explain, "iter_parallel", no_pool)
+    items = [{"id": i, "code": _code(i)} for i in range(explain.BATCH_CHUNK_SIZE + 1)]
+    lines = list(explain.iter_batch(items, workers=4))
+    assert [line.get("id") for line in lines[:-1]] == list(range(len(items)))
+
+# --- Handler ---
+
+def _post(payload):
+    status, headers, body = http_request(explain.handler, "POST", "/api/explain", json.dumps(payload).encode("utf-8"))
+    return status, headers, body
+
+def test_batch_response_is_ndjson():
+    items = [{"id": "x", "code": _code("x")}, {"id": "y"}]
+    status, headers, body = _post({"items": items})
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    assert [line.get("id") for line in lines] == ["y", "x", None]
+    assert lines[-1]["type"] == "summary"
+
+def test_bare_list_is_a_batch():
+    status, headers, body = _post([{"id": 1, "code": _code("list")}])
+    assert status == 200
+    assert json.loads(body.splitlines()[-1]) == {"type": "summary", "items": 1, "errors": 0, "cache_hits": 0}
+
+@pytest.mark.parametrize("payload, message", [
+    ({"items": "nope"}, "'items' must be an array"),
+    ({"items": [{}] * (explain.BATCH_MAX_ITEMS + 1)}, f"Too many items (max {explain.BATCH_MAX_ITEMS})"),
+])
+def test_invalid_batches_are_refused_before_streaming(payload, message):
+    status, headers, body = _post(payload)
+    assert status == 400
+    assert json.loads(body) == {"error": message}
+
+def test_failure_mid_stream_is_reported_in_stream(monkeypatch):
+    def failing(items):
+        yield {"type": "item", "id": 0, "error": "Missing 'code' parameter"}
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(explain, "iter_batch", failing)
+    status, headers, body = _post({"items": [{}]})
+    assert status == 200
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert lines[-1] == {"type": "error", "error": "worker died"}
@@ -0,0 +1,151 @@
+"""
+Request body framing in _http: read_body() and iter_body() over
+Content-Length and chunked bodies, malformed framing and the size limit.
+"""
+import io
+
+import pytest
+
+from _http import BodyError, InvalidJSON, iter_body, read_body, read_json
+
+class FakeHandler:
+    def __init__(self, body: bytes, **headers):
+        self.headers = {name.replace("_", "-"): value for name, value in headers.items()}
+        self.rfile = io.BytesIO(body)
+        self.close_connection = False
+
+def chunked(body: bytes) -> FakeHandler:
+    return FakeHandler(body, Transfer_Encoding="chunked")
+
+def collect(handler, limit=1024, chunk_size=64 * 1024) -> bytes:
+    return b"".join(iter_body(handler, limit, chunk_size))
+
+def refused(call, handler, *args):
+    with pytest.raises(BodyError) as info:
+        call(handler, *args)
+    assert handler.close_connection
+    return info.value.status, str(info.value)
+
+# --- Content-Length ---
+
+@pytest.mark.parametrize("read", [read_body, collect])
+def test_content_length_body(read):
+    handler = FakeHandler(b"hello world", Content_Length="5")
+    assert bytes(read(handler, 1024)) == b"hello"
+    assert handler.rfile.read() == b" world"
+    assert not handler.close_connection
+
+@pytest.mark.parametrize("read", [read_body, collect])
+def test_missing_content_length_is_an_empty_body(read):
+    assert bytes(read(FakeHandler(b"ignored"), 1024)) == b""
+
+@pytest.mark.parametrize("read", [read_body, collect])
+@pytest.mark.parametrize("value", ["abc", "-1", "+5", "1_0", "0x5", "５", "5, 5"])
+def test_invalid_content_length(read, value):
+    handler = FakeHandler(b"hello", Content_Length=value)
+    assert refused(read, handler, 1024) == (400, "Invalid Content-Length")
+
+@pytest.mark.parametrize("read", [read_body, collect])
+def test_content_length_longer_than_body(read):
+    handler = FakeHandler(b"abcd", Content_Length="5")
+    assert refused(read, handler, 1024) == (400, "Incomplete request body")
+
+def test_iter_body_splits_content_length_body():
+    handler = FakeHandler(b"abcdefghij", Content_Length="10")
+    assert list(iter_body(handler, 1024, 4)) == [b"abcd", b"efgh", b"ij"]
+
+@pytest.mark.parametrize("read", [read_body, collect])
+def test_content_length_over_limit_is_refused_before_reading(read):
+    handler = FakeHandler(b"x" * 11, Content_Length="11")
+    status, message = refused(read, handler, 10)
+    assert status == 413
+    assert "limit 10" in message
+    assert handler.rfile.tell() == 0
+
+@pytest.mark.parametrize("read", [read_body, collect])
+def test_content_length_at_limit(read):
+    assert bytes(read(FakeHandler(b"x" * 10, Content_Length="10"), 10)) == b"x" * 10
+
+# --- Chunked ---
+
+def test_chunked_body():
+    handler = chunked(b"5\r\nhello\r\n6\r\n world\r\n0\r\n\r\nnext request")
+    assert collect(handler) == b"hello world"
+    assert handler.rfile.read() == b"next request"
+    assert not handler.close_connection
+
+def test_chunked_body_with_bare_newlines_and_hex_sizes():
+    assert collect(chunked(b"A\nabcdefghij\na\n0123456789\n0\n\n")) == b"abcdefghij0123456789"
+
+def test_chunk_extensions_are_ignored():
+    handler = chunked(b"5;ext=1\r\nhello\r\n1 ; name=\"quoted;value\"\r\n!\r\n0;last\r\n\r\n")
+    assert collect(handler) == b"hello!"
+
+def test_trailers_are_skipped():
+    handler = chunked(b"3\r\nabc\r\n0\r\nChecksum: 123\r\nX-Other: yes\r\n\r\nnext")
+    assert collect(handler) == b"abc"
+    assert handler.rfile.read() == b"next"
+
+def test_large_chunk_is_yielded_in_pieces():
+    handler = chunked(b"a\r\n0123456789\r\n0\r\n\r\n")
+    assert list(iter_body(handler, 1024, 4)) == [b"0123", b"4567", b"89"]
+
+@pytest.mark.parametrize("size_line", [b"zz", b"-5", b"+5", b"0x5", b"5_0", b" 5", b"", b"; ext", b"1" * 16])
+def test_malformed_chunk_size(size_line):
+    handler = chunked(size_line + b"\r\nhello\r\n0\r\n\r\n")
+    assert refused(collect, handler) == (400, "Invalid chunked request body")
+
+def test_chunk_longer_than_its_size():
+    handler = chunked(b"3\r\nhello\r\n0\r\n\r\n")
+    assert refused(collect, handler) == (400, "Invalid chunked request body")
+
+def test_missing_last_chunk():
+    assert refused(collect, chunked(b"5\r\nhello\r\n")) == (400, "Invalid chunked request body")
+
+def test_chunk_cut_short():
+    assert refused(collect, chunked(b"a\r\nhello")) == (400, "Incomplete request body")
+
+def test_chunked_over_limit_is_refused_at_the_crossing_chunk():
+    handler = chunked(b"6\r\nabcdef\r\n6\r\nghijkl\r\n0\r\n\r\n")
+    pieces = []
+    with pytest.raises(BodyError) as info:
+        for piece in iter_body(handler, 10):
+            pieces.append(piece)
+    assert info.value.status == 413
+    assert pieces == [b"abcdef"]
+    assert handler.close_connection
+
+def test_chunked_at_limit():
+    assert collect(chunked(b"5\r\nabcde\r\n5\r\nfghij\r\n0\r\n\r\n"), 10) == b"abcdefghij"
+
+def test_read_body_refuses_chunked():
+    handler = chunked(b"5\r\nhello\r\n0\r\n\r\n")
+    status, message = refused(read_body, handler, 1024)
+    assert status == 413
+    assert "Content-Length" in message
+
+@pytest.mark.parametrize("encoding", ["gzip", "gzip, chunked"])
+def test_unsupported_transfer_encoding(encoding):
+    handler = FakeHandler(b"", Transfer_Encoding=encoding)
+    assert refused(collect, handler) == (400, f"Unsupported Transfer-Encoding: {encoding}")
+
+def test_identity_transfer_encoding_uses_content_length():
+    assert collect(FakeHandler(b"abc", Transfer_Encoding="Identity", Content_Length="3")) == b"abc"
+
+# --- JSON ---
+
+def test_read_json():
+    body = '{"a": [1, "é"]}'.encode("utf-8")
+    assert read_json(FakeHandler(body, Content_Length=str(len(body))), 1024) == {"a": [1, "é"]}
+
+@pytest.mark.parametrize("body", [b"{", b"\xff\xfe", b"{'a': 1}"])
+def test_read_json_invalid(body):
+    with pytest.raises(InvalidJSON) as info:
+        read_json(FakeHandler(body, Content_Length=str(len(body))), 1024)
+    assert info.value.status == 400
+
+def test_read_json_framing_errors_are_not_invalid_json():
+    with pytest.raises(BodyError) as info:
+        read_json(FakeHandler(b"{}", Content_Length="99"), 10)
+    assert not isinstance(info.value, InvalidJSON)
+    assert info.value.status == 413
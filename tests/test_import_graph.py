@@ -0,0 +1,116 @@
+"""
+core/import_graph.py on a small package: relative import resolution,
+cycles, dependents, and incremental index updates.
+"""
+import os
+
+import pytest
+
+from import_graph import ImportGraphIndex, extract_imports, module_name
+
+FILES = {
+    "pkg/__init__.py": "from . import a\n",
+    "pkg/a.py": "from .b import helper\nimport requests\n",
+    "pkg/b.py": "from . import c\n",
+    "pkg/c.py": "from .a import thing\n",
+    "pkg/sub/__init__.py": "",
+    "pkg/sub/d.py": "from ..a import thing\nfrom .. import b\nimport os.path\nfrom ....beyond import x\n",
+    "tool.py": "import pkg.sub.d\n",
+    "loop.py": "import loop\n",
+}
+
+@pytest.fixture
+def tree(tmp_path):
+    for relpath, code in FILES.items():
+        path = tmp_path / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(code)
+    return tmp_path
+
+@pytest.fixture
+def graph(tree):
+    index = ImportGraphIndex(str(tree))
+    index.update()
+    return index.graph()
+
+def test_extract_imports():
+    code = "import a.b, c\nfrom . import x, y\nfrom ..m import *\nfrom p.q import r as s\n"
+    assert extract_imports(code) == [["a.b", 0, []], ["c", 0, []], ["", 1, ["x", "y"]], ["m", 2, []],
+                                     ["p.q", 0, ["r"]]]
+
+def test_extract_imports_from_unparsable_source_keeps_absolute_names():
+    assert extract_imports("import os\nfrom . import x\ndef broken(:\n") == [["os", 0, []]]
+
+def test_module_names():
+    packages = {"pkg", "pkg/sub"}
+    assert module_name("pkg/sub/d.py", packages) == ("", "pkg.sub.d")
+    assert module_name("pkg/__init__.py", packages) == ("", "pkg")
+    assert module_name("scripts/tool.py", packages) == ("scripts", "tool")
+
+def test_relative_imports_resolve_to_files(graph):
+    assert graph.edges["pkg/__init__.py"] == {"pkg/a.py"}
+    assert graph.edges["pkg/b.py"] == {"pkg/c.py"}
+    assert graph.edges["pkg/c.py"] == {"pkg/a.py"}
+    # from ..a import thing -> the module; from .. import b -> the submodule;
+    # an import above the top-level package is dropped
+    assert graph.edges["pkg/sub/d.py"] == {"pkg/a.py", "pkg/b.py"}
+    assert graph.external["pkg/sub/d.py"] == {"os.path"}
+    assert graph.edges["tool.py"] == {"pkg/sub/d.py"}
+
+def test_cycles(graph):
+    assert graph.cycles() == [["loop.py"], ["pkg/a.py", "pkg/b.py", "pkg/c.py"]]
+
+def test_dependents(graph):
+    assert graph.dependents("pkg/a.py") == ["pkg/__init__.py", "pkg/c.py", "pkg/sub/d.py"]
+    assert graph.dependents("pkg.a", transitive=True) == [
+        "pkg/__init__.py", "pkg/a.py", "pkg/b.py", "pkg/c.py", "pkg/sub/d.py", "tool.py"]
+    assert graph.dependents("pkg.sub.d", transitive=True) == ["tool.py"]
+
+def test_dependents_of_external_modules(graph):
+    assert graph.dependents("requests") == ["pkg/a.py"]
+    assert graph.dependents("os") == ["pkg/sub/d.py"]
+    assert graph.dependents("os.path") == ["pkg/sub/d.py"]
+    assert graph.dependents("numpy") == []
+
+def test_dependencies(graph):
+    assert graph.dependencies(["tool.py"]) == ["pkg/sub/d.py"]
+    assert graph.dependencies(["tool.py"], transitive=True) == ["pkg/a.py", "pkg/b.py", "pkg/c.py", "pkg/sub/d.py"]
+
+def _set_mtime(path, offset_ns):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset_ns))
+
+def test_incremental_updates(tree):
+    index = ImportGraphIndex(str(tree))
+    assert index.update()
+    assert index.stats == {"unchanged": 0, "touched": 0, "parsed": len(FILES), "removed": 0}
+    index.save()
+
+    # A fresh process loads the saved records and finds nothing to do
+    index = ImportGraphIndex(str(tree))
+    assert not index.update()
+    assert index.stats == {"unchanged": len(FILES), "touched": 0, "parsed": 0, "removed": 0}
+    graph = index.graph()
+
+    # Touched but unchanged: re-hashed, not re-parsed, same graph
+    _set_mtime(tree / "pkg/b.py", 10 ** 9)
+    assert index.update()
+    assert index.stats["touched"] == 1 and index.stats["parsed"] == 0
+    assert index.graph().edges == graph.edges
+    assert not index.update()
+
+    # Changed content breaks the cycle
+    (tree / "pkg/c.py").write_text("import json\n")
+    _set_mtime(tree / "pkg/c.py", 2 * 10 ** 9)
+    (tree / "tool.py").unlink()
+    assert index.update()
+    assert index.stats == {"unchanged": len(FILES) - 2, "touched": 0, "parsed": 1, "removed": 1}
+    assert index.graph().cycles() == [["loop.py"]]
+    assert index.graph().dependents("json") == ["pkg/c.py"]
+
+def test_index_for_another_root_is_ignored(tree, tmp_path_factory):
+    index = ImportGraphIndex(str(tree))
+    index.update()
+    index.save()
+    elsewhere = tmp_path_factory.mktemp("elsewhere")
+    assert ImportGraphIndex(str(elsewhere), index.index_path).records == {}
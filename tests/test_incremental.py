@@ -0,0 +1,120 @@
+"""
+IncrementalAnalyzer against a full analyze_code() run, over a sequence of
+edits to one file: each version must give the same result, and unchanged
+top-level statements must come from the segment store.
+"""
+import pytest
+
+import analyzer
+
+BASE = (
+    "import os\n"
+    "from typing import List\n\n"
+    "def load(path):\n"
+    "    if not os.path.exists(path):\n"
+    "        return None\n"
+    "    with open(path) as f:\n"
+    "        return f.read()\n\n"
+    "@decorator(option=True)\n"
+    "def outer(items: List[int]) -> int:\n"
+    "    def inner(x):\n"
+    "        return x * 2 if x and x > 0 else 0\n"
+    "    return sum(inner(i) for i in items)\n\n"
+    "class Store(dict):\n"
+    "    def get(self, key, default=None):\n"
+    "        try:\n"
+    "            return self[key]\n"
+    "        except KeyError:\n"
+    "            return default\n"
+    "    # trailing comment\n\n"
+    "if __name__ == '__main__':\n"
+    "    eval('load(\"x\")')\n"
+)
+
+def _edit(code, old, new):
+    assert old in code
+    return code.replace(old, new, 1)
+
+EDITS = [
+    ("body_change", lambda code: _edit(code, "return x * 2", "return x * 3 if x < 9 else x")),
+    ("line_inserted_at_top", lambda code: "#!/usr/bin/env python\n\n" + code),
+    ("function_deleted", lambda code: _edit(code, code[code.index("def load"):code.index("@decorator")], "")),
+    ("decorator_added", lambda code: _edit(code, "class Store", "@dataclass\nclass Store")),
+    ("syntax_error", lambda code: _edit(code, "def get(self, key, default=None):", "def get(self, key, default=None:")),
+    ("syntax_error_fixed", lambda code: _edit(code, "default=None:", "default=None):")),
+    ("else_at_column_zero", lambda code: code + "else:\n    exec('pass')\n"),
+    ("crlf", lambda code: code.replace("\n", "\r\n")),
+    ("crlf_body_change", lambda code: _edit(code, "return default", "return default or {}")),
+]
+
+def _versions():
+    code = BASE
+    yield "base", code
+    for name, edit in EDITS:
+        code = edit(code)
+        yield name, code
+
+VERSIONS = list(_versions())
+
+def test_every_version_matches_full_analysis():
+    incremental = analyzer.IncrementalAnalyzer()
+    for name, code in VERSIONS:
+        assert incremental.analyze(code) == analyzer.analyze_code(code), name
+
+@pytest.mark.parametrize("index", range(1, len(VERSIONS)), ids=[name for name, _ in VERSIONS[1:]])
+def test_unchanged_segments_are_reused(index):
+    incremental = analyzer.IncrementalAnalyzer()
+    incremental.analyze(VERSIONS[index - 1][1])
+    name, code = VERSIONS[index]
+    before = dict(incremental.stats)
+    assert incremental.analyze(code) == analyzer.analyze_code(code)
+    if name == "syntax_error":
+        # A segment that fails to parse means a full run
+        assert incremental.stats["fallbacks"] > before["fallbacks"]
+    elif name == "crlf":
+        # Every segment's text changed
+        assert incremental.stats["segments_reused"] == before["segments_reused"]
+    else:
+        assert incremental.stats["segments_reused"] > before["segments_reused"]
+
+def test_shifted_segments_keep_absolute_line_numbers():
+    incremental = analyzer.IncrementalAnalyzer()
+    incremental.analyze(BASE)
+    shifted = "\n\n\n" + BASE
+    result = incremental.analyze(shifted)
+    assert incremental.stats["segments_analyzed"] == len(analyzer.split_top_level(BASE)) + 1
+    lines = {function["name"]: function["lineno"] for function in result["structure"]["functions"]}
+    assert lines["load"] == BASE.splitlines().index("def load(path):") + 4
+
+def test_segments_analyzed_by_the_caller_give_the_same_result():
+    # The MCP server's path: missing segments are analyzed in a worker process
+    incremental = analyzer.IncrementalAnalyzer()
+    for name, code in VERSIONS:
+        texts = incremental.missing_segments(code)
+        partials = [analyzer.analyze_segment(text) for text in texts]
+        if None in partials:
+            assert name == "syntax_error"
+            continue
+        assert incremental.analyze(code, dict(zip(texts, partials))) == analyzer.analyze_code(code), name
+        assert incremental.missing_segments(code) == []
+
+def test_missing_segments_lists_only_new_text():
+    incremental = analyzer.IncrementalAnalyzer()
+    incremental.analyze(BASE)
+    edited = _edit(BASE, "return x * 2", "return x * 4")
+    [text] = incremental.missing_segments(edited)
+    assert text.startswith("@decorator(option=True)\ndef outer")
+
+def test_lone_carriage_returns_fall_back_to_full_run():
+    code = BASE.replace("\n", "\r", 3)
+    incremental = analyzer.IncrementalAnalyzer()
+    assert incremental.missing_segments(code) is None
+    assert incremental.analyze(code) == analyzer.analyze_code(code)
+    assert incremental.stats["fallbacks"] == 1
+
+def test_oversized_source_falls_back_to_full_run(monkeypatch):
+    monkeypatch.setattr(analyzer, "MAX_AST_SOURCE_SIZE", len(BASE) - 1)
+    incremental = analyzer.IncrementalAnalyzer()
+    assert incremental.missing_segments(BASE) is None
+    assert incremental.analyze(BASE) == analyzer.analyze_code(BASE)
+    assert incremental.stats["fallbacks"] == 1
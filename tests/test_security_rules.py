@@ -0,0 +1,98 @@
+"""
+Security findings as data: SECURITY_RULES against the hard-coded
+SecurityVisitor it replaced (tests/legacy_analyzer.py), and user-supplied
+rule tables through compile_rules().
+"""
+import ast
+
+import pytest
+
+import analyzer
+import legacy_analyzer
+from analyzer import SECURITY_RULES, SecurityRule, compile_rules
+
+FIXTURE = (
+    "import os, sys as system, json\n"
+    "import subprocess, os.path\n"
+    "from os import path\n"
+    "from . import sibling\n"
+    "from sys import argv\n"
+    "from subprocess import run as sh\n\n"
+    "def run(code, data):\n"
+    "    eval(code)\n"
+    "    exec(compile(code, '<x>', 'exec'))\n"
+    "    obj.eval(code)\n"
+    "    pickle.loads(data)\n"
+    "    subprocess.call(['ls'], shell=True)\n"
+    "    return [eval(line) for line in code.splitlines()]\n"
+)
+
+def _issues(code, rules=None):
+    return [issue.to_dict() for issue in analyzer.analyze(code, rules=rules).issues]
+
+def _legacy_issues(code):
+    visitor = legacy_analyzer.SecurityVisitor()
+    visitor.visit(ast.parse(code))
+    return visitor.issues
+
+def test_default_rules_match_legacy_findings():
+    issues = _issues(FIXTURE)
+    assert issues == _legacy_issues(FIXTURE)
+    assert [(issue["type"], issue["lineno"]) for issue in issues] == [
+        ("Dangerous Import", 1), ("Dangerous Import", 1), ("Dangerous Import", 2),
+        ("Dangerous Import", 3), ("Dangerous Import", 5), ("Dangerous Import", 6),
+        ("Code Injection", 9), ("Code Injection", 10), ("Code Injection", 14),
+    ]
+
+def test_default_rules_are_compiled_security_rules():
+    assert analyzer.analyze(FIXTURE, rules=compile_rules(SECURITY_RULES)).to_dict() == analyzer.analyze_code(FIXTURE)
+
+def _shell_true(node):
+    if any(keyword.arg == "shell" and getattr(keyword.value, "value", None) is True for keyword in node.keywords):
+        yield analyzer._dotted_name(node.func) or "call"
+
+PICKLE = SecurityRule(ast.Call, "CRITICAL", "Deserialization",
+                      "Unpickling with '{name}' can run arbitrary code.", names=["pickle.loads", "pickle.load"])
+SHELL = SecurityRule(ast.Call, "WARNING", "Shell Injection", "'{name}' runs through the shell.", matcher=_shell_true)
+
+def test_user_rules_fire():
+    issues = _issues(FIXTURE, compile_rules([PICKLE, SHELL]))
+    assert issues == [
+        {"severity": "CRITICAL", "type": "Deserialization",
+         "message": "Unpickling with 'pickle.loads' can run arbitrary code.", "lineno": 12},
+        {"severity": "WARNING", "type": "Shell Injection",
+         "message": "'subprocess.call' runs through the shell.", "lineno": 13},
+    ]
+
+def test_user_rules_extend_the_defaults():
+    issues = _issues(FIXTURE, compile_rules(SECURITY_RULES + [PICKLE, SHELL]))
+    assert [issue["type"] for issue in issues] == ["Dangerous Import"] * 6 + [
+        "Code Injection", "Code Injection", "Deserialization", "Shell Injection", "Code Injection"]
+
+def test_rules_on_one_subject_keep_table_order():
+    first = SecurityRule(ast.Call, "CRITICAL", "First", "first {name}", names=["eval"])
+    second = SecurityRule(ast.Call, "INFO", "Second", "second {name}", names=["eval", "exec"])
+    matched = SecurityRule(ast.Call, "INFO", "Matched", "matched {name}", matcher=lambda node: ["any"])
+    code = "exec(eval(x))\n"
+    assert [issue["type"] for issue in _issues(code, compile_rules([second, matched, first]))] == [
+        "Second", "Matched", "Second", "First", "Matched"]
+    assert [issue["type"] for issue in _issues(code, compile_rules([first, second]))] == ["Second", "First", "Second"]
+
+def test_matcher_rule_on_a_node_type_without_subjects():
+    rule = SecurityRule(ast.Assert, "INFO", "Assert", "assert is skipped under -O ({name})",
+                        matcher=lambda node: ["assert"])
+    assert _issues("def f(x):\n    assert x\n    assert not x\n", compile_rules([rule])) == [
+        {"severity": "INFO", "type": "Assert", "message": "assert is skipped under -O (assert)", "lineno": lineno}
+        for lineno in (2, 3)]
+
+def test_token_fallback_applies_name_rules_only():
+    broken = FIXTURE + "def broken(:\n"
+    result = analyzer.analyze(broken, rules=compile_rules([PICKLE, SHELL]))
+    assert result.mode == "tokenize"
+    assert [issue.to_dict()["type"] for issue in result.issues] == ["Deserialization"]
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        SecurityRule(ast.Call, "INFO", "Empty", "{name}")
+    with pytest.raises(ValueError):
+        compile_rules([SecurityRule(ast.Assert, "INFO", "Assert", "{name}", names=["assert"])])
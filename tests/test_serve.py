@@ -0,0 +1,91 @@
+"""
+serve.py's pooled server in-process: idle keep-alive connections must not
+hold the pool's threads, and kept-alive connections must be reused.
+"""
+import http.client
+import socket
+import threading
+import time
+
+import pytest
+
+import serve
+
+@pytest.fixture
+def server():
+    serve.Router.routes = serve.load_routes()
+    server = serve.PooledHTTPServer(("127.0.0.1", 0), serve.Router, threads=2)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    assert server.drain(5)
+    server.server_close()
+
+def _connect(server):
+    return http.client.HTTPConnection(*server.server_address, timeout=5)
+
+def _health(connection):
+    connection.request("GET", "/healthz")
+    response = connection.getresponse()
+    return response.status, response.read(), response.getheader("Connection")
+
+def test_idle_connections_do_not_hold_threads(server):
+    idle = [_connect(server) for _ in range(4)]
+    for connection in idle:
+        assert _health(connection) == (200, b"ok\n", None)
+    silent = [socket.create_connection(server.server_address) for _ in range(4)]
+    started = time.monotonic()
+    assert _health(_connect(server))[0] == 200
+    assert time.monotonic() - started < 2
+    # The idle ones are still open and served
+    for connection in idle:
+        assert _health(connection) == (200, b"ok\n", None)
+    for sock in silent:
+        sock.close()
+
+def test_connections_are_reused_with_more_clients_than_threads(server):
+    opened = []
+
+    def client():
+        connection = _connect(server)
+        opened.append(connection)
+        for _ in range(20):
+            connection.request("POST", "/api/text", b'{"text": "keep me alive", "action": "slug"}',
+                               {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            assert response.read() == b'{"slug":"keep-me-alive"}'
+            assert response.getheader("Connection") is None
+
+    clients = [threading.Thread(target=client) for _ in range(8)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    assert len(opened) == 8
+
+def test_pipelined_requests(server):
+    sock = socket.create_connection(server.server_address)
+    sock.sendall(b"GET /healthz HTTP/1.1\r\nHost: test\r\n\r\n" * 3)
+    received = b""
+    while received.count(b"ok\n") < 3:
+        received += sock.recv(65536)
+    assert received.count(b"HTTP/1.1 200") == 3
+    sock.close()
+
+def test_idle_connections_time_out(server, monkeypatch):
+    monkeypatch.setattr(serve.Router, "timeout", 0.2)
+    connection = _connect(server)
+    _health(connection)
+    connection.sock.settimeout(5)
+    started = time.monotonic()
+    assert connection.sock.recv(1) == b""
+    assert time.monotonic() - started < 3
+
+def test_drain_closes_idle_connections(server):
+    connection = _connect(server)
+    _health(connection)
+    server.shutdown()
+    assert server.drain(5)
+    connection.sock.settimeout(5)
+    assert connection.sock.recv(1) == b""
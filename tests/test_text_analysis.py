@@ -0,0 +1,67 @@
+"""
+TextAnalysis.run() against the standalone text_stats(), extract_keywords(),
+clean_text() and generate_slug() it replaced in combined requests.
+"""
+import pytest
+
+import text
+
+TEXTS = {
+    "empty": "",
+    "blank": " \t\n\r\n  ",
+    "english": (
+        "Performance engineering is the practice of measuring before optimizing. "
+        "Measuring tells you where the time goes! Optimizing without measuring "
+        "is guessing... Is it? Performance, performance, performance."
+    ),
+    "html": "<p>Hello <b>world</b>,</p>\n\n<div class='x'>  spaced   out\ttext </div><br/>end",
+    "unclosed_tag": "a < b and c > d <i>italic</i> <unclosed",
+    "punctuation_only": "?!... .!? ---",
+    "identifiers": "snake_case_names and __dunder__ words mixed with numbers 123 4567 x1y2",
+    "unicode": "Ünïcödé façade naïve café — İstanbul ΟΔΟΣ οδός straße ǅungla ﬁne",
+    "chinese": "我们今天学习自然语言处理。中文分词是自然语言处理的基础！你们觉得怎么样？",
+    "mixed": (
+        "Python 是一种编程语言。Python makes text processing easy; 文本处理很简单。\n"
+        "<em>混合</em> content with URLs like https://example.com/a-b_c?d=1 and emails a@b.co."
+    ),
+    "long_lines": ("word " * 300 + ". ") * 5 + "tail",
+}
+
+def _standalone(text_value, top_n):
+    return {
+        "stats": text.text_stats(text_value),
+        "keywords": text.extract_keywords(text_value, top_n),
+        "cleaned_text": text.clean_text(text_value),
+        "slug": text.generate_slug(text_value),
+    }
+
+@pytest.mark.parametrize("name", sorted(TEXTS))
+@pytest.mark.parametrize("top_n", [1, 5, 50])
+def test_combined_run_matches_standalone_functions(name, top_n):
+    text_value = TEXTS[name]
+    assert text.TextAnalysis(text_value).run(text.TEXT_ACTIONS, top_n) == _standalone(text_value, top_n)
+
+@pytest.mark.parametrize("name", sorted(TEXTS))
+def test_each_action_alone_matches(name):
+    text_value = TEXTS[name]
+    expected = _standalone(text_value, 5)
+    for action, key in zip(text.TEXT_ACTIONS, ("stats", "keywords", "cleaned_text", "slug")):
+        assert text.TextAnalysis(text_value).run([action]) == {key: expected[key]}
+
+def test_run_keeps_the_requested_order():
+    result = text.TextAnalysis(TEXTS["english"]).run(["slug", "stats"])
+    assert list(result) == ["slug", "stats"]
+
+@pytest.mark.parametrize("body, expected", [
+    ({"action": "all"}, list(text.TEXT_ACTIONS)),
+    ({"action": "stats"}, None),
+    ({"actions": "slug,stats"}, ["stats", "slug"]),
+    ({"actions": ["keywords", "clean", "keywords"]}, ["keywords", "clean"]),
+])
+def test_parse_actions(body, expected):
+    assert text.parse_actions(body) == expected
+
+@pytest.mark.parametrize("body", [{"actions": []}, {"actions": 3}, {"actions": ["stats", "translate"]}])
+def test_parse_actions_rejects(body):
+    with pytest.raises(ValueError):
+        text.parse_actions(body)
@@ -0,0 +1,92 @@
+"""
+Streaming mode against TextAnalysis on the whole text: TextStream fed in
+chunks of every size, and stream_text() over str, UTF-8 bytes split inside
+characters, and file objects; and the handler taking streaming mode only
+when asked for.
+"""
+import io
+
+import pytest
+
+import text
+from conftest import http_request, json_body
+from test_text_analysis import TEXTS
+
+ACTIONS = ("stats", "keywords", "clean")
+CHUNK_SIZES = [1, 2, 3, 7, 64, 4096]
+
+def _whole(text_value, top_n=5):
+    return text.TextAnalysis(text_value).run(ACTIONS, top_n)
+
+def _chunks(value, size):
+    return [value[i:i + size] for i in range(0, len(value), size)]
+
+@pytest.mark.parametrize("name", sorted(TEXTS))
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_str_chunks_match_whole_text(name, size):
+    text_value = TEXTS[name]
+    assert text.stream_text(_chunks(text_value, size), ACTIONS) == _whole(text_value)
+
+@pytest.mark.parametrize("name", sorted(TEXTS))
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_bytes_split_inside_characters_match_whole_text(name, size):
+    text_value = TEXTS[name]
+    assert text.stream_text(_chunks(text_value.encode("utf-8"), size), ACTIONS) == _whole(text_value)
+
+@pytest.mark.parametrize("name", ["chinese", "mixed", "html"])
+def test_file_objects_match_whole_text(name):
+    text_value = TEXTS[name]
+    assert text.stream_text(io.BytesIO(text_value.encode("utf-8")), ACTIONS) == _whole(text_value)
+    assert text.stream_text(io.StringIO(text_value), ACTIONS) == _whole(text_value)
+
+def test_clean_text_is_emitted_piece_by_piece():
+    value = TEXTS["html"]
+    stream = text.TextStream(clean=True)
+    pieces = [stream.feed(chunk) for chunk in _chunks(value, 5)]
+    pieces.append(stream.close())
+    assert sum(1 for piece in pieces if piece) > 1
+    assert "".join(pieces) == text.clean_text(value)
+
+def test_sentence_spanning_chunks_is_counted_once():
+    stream = text.TextStream()
+    for chunk in ("One sentence that", " spans ", "chunks", ". Two"):
+        stream.feed(chunk)
+    stream.close()
+    assert stream.stats()["sentences"] == 2
+
+def test_invalid_utf8_becomes_replacement_character():
+    chunks = [b"caf\xc3", b"\xa9 ok \xff end"]
+    assert text.stream_text(chunks, ("clean",)) == {"cleaned_text": "café ok � end"}
+
+def test_stream_text_only_returns_requested_actions():
+    assert list(text.stream_text([TEXTS["english"]], ("keywords",))) == ["keywords"]
+
+# --- Handler: streaming is opt-in ---
+
+def test_text_plain_json_body_takes_the_json_path():
+    # fetch() sends a string body as text/plain unless told otherwise
+    status, headers, body = http_request(text.handler, "POST", "/api/text",
+                                         b'{"text": "Hello Streaming World", "action": "slug"}',
+                                         {"Content-Type": "text/plain;charset=UTF-8"})
+    assert status == 200
+    assert json_body(headers, body) == {"slug": "hello-streaming-world"}
+
+@pytest.mark.parametrize("path, content_type", [
+    ("/api/text?stream=1&action=all", "text/plain"),
+    ("/api/text?action=all", "application/octet-stream"),
+])
+def test_stream_is_taken_when_asked_for(path, content_type):
+    value = TEXTS["mixed"]
+    status, headers, body = http_request(text.handler, "POST", path, value.encode("utf-8"),
+                                         {"Content-Type": content_type})
+    assert status == 200
+    expected = text.TextAnalysis(value).run(("stats", "keywords"))
+    assert json_body(headers, body) == expected
+
+def test_chunked_upload_streams_clean_text():
+    value = TEXTS["html"].encode("utf-8")
+    framed = b"".join(b"%x\r\n%s\r\n" % (len(piece), piece) for piece in _chunks(value, 7)) + b"0\r\n\r\n"
+    status, headers, body = http_request(text.handler, "POST", "/api/text?stream=1&action=clean", framed,
+                                         {"Transfer-Encoding": "chunked"})
+    assert status == 200
+    assert body.decode("utf-8") == text.clean_text(TEXTS["html"])
@@ -0,0 +1,100 @@
+"""
+Build the document-frequency table /api/text ranks keywords with.
+
+Reads a local corpus, counts in how many documents each keyword candidate
+occurs (same tokenization and stopword filter as the text handler), and
+writes the memory-mapped table format of api-service/api/_df_table.py.
+
+Each file is one document, or each blank-line separated paragraph with
+--split paragraph. Markup is stripped the way the clean action strips it.
+
+Usage:
+    python tools/build_df_table.py docs/ notes.md
+    python tools/build_df_table.py corpus/ --split paragraph --min-df 2 --max-terms 200000
+    python tools/build_df_table.py corpus/ -o /tmp/df_table.bin
+"""
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent.parent / "api-service" / "api"
+sys.path.insert(0, str(API_DIR))
+from _df_table import write_table  # noqa: E402
+from text import TextAnalysis, is_keyword_candidate  # noqa: E402
+
+DEFAULT_OUTPUT = API_DIR / "df_table.bin"
+DEFAULT_SUFFIXES = ".txt,.md,.rst,.html,.htm"
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def iter_files(paths, suffixes):
+    for path in map(Path, paths):
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and child.suffix.lower() in suffixes:
+                    yield child
+        elif path.is_file():
+            yield path
+
+
+def iter_documents(files, split):
+    for path in files:
+        text = path.read_text(encoding="utf-8", errors="replace")
+        if split == "paragraph":
+            yield from (p for p in _PARAGRAPH_RE.split(text) if p.strip())
+        else:
+            yield text
+
+
+def count(documents):
+    """(doc_count, total_terms, {term: df}) over documents."""
+    dfs = Counter()
+    doc_count = 0
+    total = 0
+    for document in documents:
+        analysis = TextAnalysis(TextAnalysis(document).clean())
+        terms = analysis.terms
+        if not terms:
+            continue
+        doc_count += 1
+        total += len(terms)
+        dfs.update(term for term in set(terms) if is_keyword_candidate(term))
+    return doc_count, total, dfs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the keyword document-frequency table")
+    parser.add_argument("paths", nargs="+", help="corpus files or directories")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT),
+                        help=f"table file (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--split", choices=("file", "paragraph"), default="file",
+                        help="what counts as a document (default: file)")
+    parser.add_argument("--suffixes", default=DEFAULT_SUFFIXES,
+                        help=f"file suffixes read from directories (default: {DEFAULT_SUFFIXES})")
+    parser.add_argument("--min-df", type=int, default=2,
+                        help="drop terms in fewer documents; they rank as unseen (default: 2)")
+    parser.add_argument("--max-terms", type=int, default=0,
+                        help="keep only the most frequent terms (default: all)")
+    args = parser.parse_args()
+
+    suffixes = {s.strip().lower() for s in args.suffixes.split(",") if s.strip()}
+    start = time.perf_counter()
+    doc_count, total, dfs = count(iter_documents(iter_files(args.paths, suffixes), args.split))
+    if not doc_count:
+        print("No documents found", file=sys.stderr)
+        return 1
+    kept = {term: df for term, df in dfs.items() if df >= args.min_df}
+    if args.max_terms and len(kept) > args.max_terms:
+        kept = dict(Counter(kept).most_common(args.max_terms))
+    size = write_table(args.output, doc_count, total / doc_count, kept)
+    print(f"{doc_count} documents, {len(dfs)} terms ({len(kept)} kept), "
+          f"avg length {total / doc_count:.1f}")
+    print(f"Wrote {args.output} ({size / 1024:.1f} KiB) in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
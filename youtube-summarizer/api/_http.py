@@ -0,0 +1,382 @@
+"""
+Response helpers shared by the JSON handlers.
+
+Bodies are compact JSON unless the client asks for ?pretty=1, and are
+compressed with brotli (when the module is installed) or gzip according to
+Accept-Encoding. The leading underscore keeps Vercel from deploying this
+file as a function of its own. youtube-summarizer/api/_http.py is a copy of
+this file; edit this one and copy it over.
+"""
+import json
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+# Bodies smaller than this go out uncompressed: the framing costs more than it saves
+MIN_COMPRESS_SIZE = 512
+# Levels tuned for per-request compression of small dynamic bodies
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Content-addressed GET responses never change, so caches may keep them
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# A chunk-size line: hex digits, optionally extensions; no sign, prefix or '_' as int() allows
+_CHUNK_SIZE_RE = re.compile(rb'([0-9A-Fa-f]{1,15})[ \t]*(?:;[^\r\n]*)?\r?\n')
+
+_brotli = None
+_brotli_checked = False
+
+def _load_brotli():
+    """The brotli module, imported on first use, or None when it is not installed."""
+    global _brotli, _brotli_checked
+    if not _brotli_checked:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = None
+        _brotli_checked = True
+    return _brotli
+
+class BodyError(Exception):
+    """A request body that is refused before or while it is read."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class InvalidJSON(BodyError):
+    """A body that was read in full but does not parse as JSON."""
+
+    def __init__(self):
+        super().__init__(400, "Invalid JSON")
+
+def _content_length(handler, limit: int) -> int:
+    header = (handler.headers.get('Content-Length') or '0').strip()
+    # Digits only: int() would also take a sign, '_' and non-ASCII digits
+    if not (header.isascii() and header.isdigit()):
+        handler.close_connection = True
+        raise BodyError(400, "Invalid Content-Length")
+    length = int(header)
+    if length > limit:
+        handler.close_connection = True
+        raise BodyError(413, f"Request body too large ({length} bytes, limit {limit})")
+    return length
+
+def _transfer_encoding(handler) -> str:
+    return handler.headers.get('Transfer-Encoding', '').strip().lower()
+
+def read_body(handler, limit: int) -> bytearray:
+    """
+    Read the request body into a buffer preallocated from Content-Length.
+
+    Chunked bodies (no length known up front) and bodies over limit bytes
+    are refused with 413 before anything is read; the connection is then
+    closed rather than drained. Handlers that can work on the body as it
+    arrives use iter_body() instead.
+    """
+    if _transfer_encoding(handler) not in ('', 'identity'):
+        handler.close_connection = True
+        raise BodyError(413, "Chunked request bodies are not accepted; send Content-Length")
+    length = _content_length(handler, limit)
+    buffer = bytearray(length)
+    view = memoryview(buffer)
+    filled = 0
+    while filled < length:
+        count = handler.rfile.readinto(view[filled:])
+        if not count:
+            handler.close_connection = True
+            raise BodyError(400, "Incomplete request body")
+        filled += count
+    return buffer
+
+def iter_body(handler, limit: int, chunk_size: int = 64 * 1024):
+    """
+    Yield the request body in pieces of at most chunk_size bytes, framed by
+    Content-Length or Transfer-Encoding: chunked, so it is never held
+    whole. A body over limit bytes raises BodyError(413): before reading
+    when Content-Length says so, otherwise as soon as it crosses the limit.
+    """
+    rfile = handler.rfile
+    encoding = _transfer_encoding(handler)
+    if encoding in ('', 'identity'):
+        remaining = _content_length(handler, limit)
+        while remaining:
+            data = rfile.read(min(remaining, chunk_size))
+            if not data:
+                handler.close_connection = True
+                raise BodyError(400, "Incomplete request body")
+            remaining -= len(data)
+            yield data
+        return
+    if encoding != 'chunked':
+        handler.close_connection = True
+        raise BodyError(400, f"Unsupported Transfer-Encoding: {encoding}")
+    total = 0
+    while True:
+        match = _CHUNK_SIZE_RE.fullmatch(rfile.readline(1024))
+        if not match:
+            handler.close_connection = True
+            raise BodyError(400, "Invalid chunked request body")
+        size = int(match.group(1), 16)
+        if size == 0:
+            # Skip trailer fields up to the blank line ending the body
+            while rfile.readline(65537) not in (b'\r\n', b'\n', b''):
+                pass
+            return
+        total += size
+        if total > limit:
+            handler.close_connection = True
+            raise BodyError(413, f"Request body too large (over {limit} bytes)")
+        while size:
+            data = rfile.read(min(size, chunk_size))
+            if not data:
+                handler.close_connection = True
+                raise BodyError(400, "Incomplete request body")
+            size -= len(data)
+            yield data
+        if rfile.readline(3) not in (b'\r\n', b'\n'):   # CRLF closing the chunk
+            handler.close_connection = True
+            raise BodyError(400, "Invalid chunked request body")
+
+def read_json(handler, limit: int):
+    """read_body() parsed as JSON straight from the bytes (no str copy of the body)."""
+    body = read_body(handler, limit)
+    try:
+        return json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise InvalidJSON()
+
+def query_flag(handler, name: str, data=None) -> bool:
+    """True when ?name=1|true is in the URL or the JSON body has a truthy name."""
+    if isinstance(data, dict) and data.get(name):
+        return True
+    values = parse_qs(urlparse(handler.path).query, keep_blank_values=True).get(name)
+    return bool(values) and values[-1].lower() in ('', '1', 'true', 'yes')
+
+def dumps(data, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, compact unless pretty."""
+    if pretty:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    else:
+        text = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    try:
+        return text.encode('utf-8')
+    except UnicodeEncodeError:
+        # Lone surrogates (e.g. echoed source) can only travel as \u escapes
+        return json.dumps(data, indent=2 if pretty else None,
+                          separators=None if pretty else (',', ':')).encode('ascii')
+
+def content_hash(*parts) -> str:
+    """Hex digest identifying a response: endpoint, version, options and input."""
+    import hashlib
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def representation_etag(handler, tag: str) -> str:
+    """
+    The quoted ETag send_json() sends for a content_hash() tag: suffixed
+    with the content-coding negotiated from Accept-Encoding, so each
+    encoded representation has its own strong tag.
+    """
+    encoding = negotiate_encoding(handler.headers.get('Accept-Encoding', ''))
+    return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+def etag_matches(handler, tag: str) -> bool:
+    """
+    True when If-None-Match names the representation_etag() of tag. The
+    whole opaque tag is compared, coding suffix included, so a gzip tag
+    never validates an identity body. A W/ prefix is ignored, as RFC 9110
+    specifies for If-None-Match (proxies weaken tags of bodies they alter).
+    """
+    header = handler.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    expected = representation_etag(handler, tag)
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == expected:
+            return True
+    return False
+
+def send_not_modified(handler, tag: str, headers: dict = None) -> None:
+    """304 for tag, carrying the same ETag the 200 would have."""
+    handler.send_response(304)
+    handler.send_header('ETag', representation_etag(handler, tag))
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.send_header('Vary', 'Accept-Encoding')
+    for name, value in (headers or {}).items():
+        handler.send_header(name, value)
+    handler.end_headers()
+
+class ResultCache:
+    """
+    Small thread-safe LRU of response bodies keyed by content_hash().
+
+    With db_path the bodies are also written to SQLite, so GET ?h=<hash>
+    works across processes and instances that share that file (opened on
+    first use, keeping it off the cold-start path). Values must be
+    JSON-serializable.
+    """
+
+    def __init__(self, max_entries: int = 256, db_path: str = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connect(self):
+        if self._db is None and self.db_path:
+            import sqlite3
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+        return self._db
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+            db = self._connect()
+            if db is None:
+                return None
+            row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value = json.loads(row[0])
+            self._remember(key, value)
+            return value
+
+    def put(self, key: str, value) -> None:
+        with self._lock:
+            self._remember(key, value)
+            db = self._connect()
+            if db is not None:
+                db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                           (key, json.dumps(value, separators=(',', ':'))))
+                db.commit()
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+def send_cache_miss(handler, retry: str) -> None:
+    """
+    404 for a GET ?h=<hash> whose result this instance does not hold
+    (never computed here, evicted, or computed by another instance). The
+    body tells the client to repeat the original request: retry names the
+    POST that recomputes it.
+    """
+    send_json(handler, 404, {"error": "Unknown or expired hash", "cache_miss": True, "retry": retry},
+              {'Cache-Control': 'no-store'})
+
+def negotiate_encoding(accept_encoding: str):
+    """Pick 'br', 'gzip' or None from an Accept-Encoding header, honouring q=0."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+    wildcard = weights.get('*', 0.0)
+    if weights.get('br', wildcard) > 0 and _load_brotli() is not None:
+        return 'br'
+    if weights.get('gzip', weights.get('x-gzip', wildcard)) > 0:
+        return 'gzip'
+    return None
+
+def compress(payload: bytes, encoding) -> bytes:
+    if encoding == 'br':
+        return _load_brotli().compress(payload, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        return compressor.compress(payload) + compressor.flush()
+    return payload
+
+def send_json(handler, status: int, data, headers: dict = None,
+              content_type: str = 'application/json; charset=utf-8', etag: str = None) -> None:
+    """
+    Write a complete JSON response. data may be a JSON-serializable value or
+    already serialized bytes (see dumps()). etag is a content_hash(); it is
+    sent as representation_etag(). Tagged bodies are always encoded as
+    negotiated, whatever their size, so that a 304 sent before the body
+    exists carries the same tag.
+    """
+    payload = data if isinstance(data, bytes) else dumps(data, query_flag(handler, 'pretty'))
+    encoding = None
+    if etag or len(payload) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding(handler.headers.get('Accept-Encoding', ''))
+        payload = compress(payload, encoding)
+    handler.send_response(status)
+    handler.send_header('Content-Type', content_type)
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.send_header('Vary', 'Accept-Encoding')
+    if etag:
+        handler.send_header('ETag', representation_etag(handler, etag))
+    if encoding:
+        handler.send_header('Content-Encoding', encoding)
+    handler.send_header('Content-Length', str(len(payload)))
+    for name, value in (headers or {}).items():
+        handler.send_header(name, value)
+    handler.end_headers()
+    handler.wfile.write(payload)
+
+class StreamWriter:
+    """
+    Compressing writer for streamed bodies (NDJSON). Every write() is
+    flushed through the compressor so the client can decode each line as
+    soon as it arrives.
+    """
+
+    def __init__(self, handler, content_type: str = 'application/x-ndjson; charset=utf-8'):
+        self.wfile = handler.wfile
+        self.encoding = negotiate_encoding(handler.headers.get('Accept-Encoding', ''))
+        if self.encoding == 'br':
+            self._compressor = _load_brotli().Compressor(quality=BROTLI_QUALITY)
+        elif self.encoding == 'gzip':
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        else:
+            self._compressor = None
+        handler.send_response(200)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Access-Control-Allow-Origin', '*')
+        handler.send_header('Vary', 'Accept-Encoding')
+        if self.encoding:
+            handler.send_header('Content-Encoding', self.encoding)
+        handler.end_headers()
+
+    def write(self, data: bytes) -> None:
+        if self.encoding == 'br':
+            data = self._compressor.process(data) + self._compressor.flush()
+        elif self.encoding == 'gzip':
+            data = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.wfile.write(data)
+        self.wfile.flush()
+
+    def close(self) -> None:
+        if self.encoding == 'br':
+            self.wfile.write(self._compressor.finish())
+        elif self.encoding == 'gzip':
+            self.wfile.write(self._compressor.flush())
+        self.wfile.flush()
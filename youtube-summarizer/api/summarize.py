@@ -1,9 +1,13 @@
 from http.server import BaseHTTPRequestHandler
-import json
 import re
 import os
-import requests
-from openai import OpenAI
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _http import BodyError, InvalidJSON, query_flag, read_json, send_json
+
+# The request only carries a URL and a language
+MAX_BODY_BYTES = int(os.environ.get("SUMMARIZE_MAX_BODY_BYTES", str(16 * 1024)))
 
 def extract_video_id(url):
     match = re.search(r"(?:v=|\/)([0-9A-Za-z_-]{11}).*", url)
@@ -14,9 +18,7 @@ def extract_video_id(url):
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            data = json.loads(body)
+            data = read_json(self, MAX_BODY_BYTES)
             
             url = data.get('url', '')
             target_language = data.get('language', '')
@@ -35,6 +37,9 @@ class handler(BaseHTTPRequestHandler):
                 self._send_response(400, {"error": "SYSTEM_NOT_READY: DEEPSEEK_API_KEY is not configured in Vercel Environment Variables. The AI brain is asleep!"})
                 return
 
+            # Deferred so cold starts and rejected requests don't pay for loading requests
+            import requests
+
             # Step 1: Subtitles extraction via RapidAPI
             full_text = ""
             try:
@@ -42,8 +47,6 @@ class handler(BaseHTTPRequestHandler):
                 if not rapidapi_key:
                     raise Exception("SYSTEM_NOT_READY: RAPIDAPI_KEY is not configured in Vercel Environment Variables.")
 
-                import requests
-                
                 # Use new youtube-transcript3.p.rapidapi.com provider API (Premium/High-Score)
                 response_data = None
                 
@@ -175,29 +178,32 @@ class handler(BaseHTTPRequestHandler):
                     
                 ai_reply = response.json()["choices"][0]["message"]["content"]
                 
-                self._send_response(200, {
+                response_body = {
                     "success": True,
                     "video_id": video_id,
                     "transcript": full_text,
                     "ai_summary_html": ai_reply
-                })
+                }
+                # Lean mode ({"lean": true} or ?lean=1) leaves out the (long) transcript
+                if query_flag(self, 'lean', data):
+                    del response_body["transcript"]
+                self._send_response(200, response_body)
 
             except Exception as e:
                 self._send_response(500, {"error": f"AI Generation Failed: {str(e)}"})
 
-        except json.JSONDecodeError:
+        except InvalidJSON:
             self._send_response(400, {"error": "Invalid JSON mapping"})
+        except BodyError as e:
+            self._send_response(e.status, {"error": str(e)})
         except Exception as e:
             self._send_response(500, {"error": str(e)})
 
     def _send_response(self, status, payload):
-        self.send_response(status)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        self.wfile.write(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        send_json(self, status, payload, {
+            'Access-Control-Allow-Methods': 'POST, OPTIONS',
+            'Access-Control-Allow-Headers': 'Content-Type',
+        })
 
     def do_OPTIONS(self):
         self.send_response(204)